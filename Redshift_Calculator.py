@@ -1,21 +1,25 @@
 # Erforderliche Bibliotheken importieren
 import streamlit as st
-import numpy as np
-from scipy.integrate import quad
+import functools
 import math
-
-# --- Konstanten (unverändert) ---
-C_KM_PER_S = 299792.458
-KM_PER_MPC = 3.085677581491367e+19
-KM_PER_AU = 1.495978707e+8
-KM_PER_LY = 9.4607304725808e+12
-KM_PER_LS = C_KM_PER_S
-GYR_PER_YR = 1e9
-
-# --- Standard Kosmologische Parameter (unverändert) ---
-H0_DEFAULT = 67.4
-OMEGA_M_DEFAULT = 0.315
-OMEGA_LAMBDA_DEFAULT = 0.685
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+
+# Rechenkern (ohne Streamlit-Abhängigkeit)
+from redshift_core import (H0_DEFAULT, OMEGA_LAMBDA_DEFAULT, OMEGA_M_DEFAULT,
+                           convert_km_to_au, convert_km_to_ly, convert_km_to_ls,
+                           convert_mpc_to_gly, convert_mpc_to_km, format_large_number,
+                           get_comoving_comparison, get_lookback_comparison,
+                           redshift_from_comoving_distance, redshift_from_lookback_time,
+                           redshift_from_luminosity_distance)
+from redshift_core import DERIVED_OUTPUTS, calculate_lcdm_quantities, instrumentation
+from redshift_core import calculate_lcdm_distances as _calculate_lcdm_distances
+from redshift_core.curves import compute_distance_curves, downsample_curve
+from redshift_core.export import EXPORT_FORMATS, distance_table, export_table
+from redshift_core.units import UNIT_FACTORS
+from redshift_core.result_cache import cache_from_environment
+from redshift_core.uncertainty import propagate_uncertainty_gaussian
 
 # --- Übersetzungsdaten (Erweitert um Beispiele/Erklärungen) ---
 translations = {
@@ -23,11 +27,77 @@ translations = {
         "lang_select": "Sprache wählen",
         "input_params": "Eingabeparameter",
         "redshift_z": "Rotverschiebung (z)",
+        "input_mode": "Eingabe über",
+        "input_mode_redshift": "Rotverschiebung",
+        "input_mode_comoving": "Mitbewegte Distanz",
+        "input_mode_luminosity": "Leuchtkraftdistanz",
+        "input_mode_lookback": "Rückblickzeit",
+        "input_comoving_mpc": "Mitbewegte Distanz [Mpc]",
+        "input_luminosity_mpc": "Leuchtkraftdistanz [Mpc]",
+        "input_lookback_gyr": "Rückblickzeit [Gyr]",
+        "derived_redshift": "Abgeleitete Rotverschiebung: z = {z:.6f}",
+        "error_inverse_out_of_range": "Für diesen Wert existiert im gewählten Modell keine Rotverschiebung.",
+        "error_inverse_ambiguous": "Im gewählten (geschlossenen) Modell gehören zu diesem Wert mehrere Rotverschiebungen.",
+        "uncertainty_mode": "Unsicherheiten (Monte Carlo)",
+        "uncertainty_enable": "Unsicherheiten berechnen",
+        "sigma_h0": "σ(H₀) [km/s/Mpc]",
+        "sigma_omega_m": "σ(Ωm)",
+        "sigma_omega_lambda": "σ(ΩΛ)",
+        "n_samples": "Anzahl Stichproben",
+        "uncertainty_note": "± : {level:.0f}%-Glaubwürdigkeitsintervall um den Median aus {n} Monte-Carlo-Stichproben von (H₀, Ωm, ΩΛ).",
+        "curve_view": "Kurvenansicht: Distanzen und Rückblickzeit über z",
+        "curve_z_max": "Maximale Rotverschiebung (z_max)",
+        "curve_log_scale": "Logarithmische y-Achse",
+        "curve_extra_cosmologies": "Weitere Kosmologien (H₀, Ωm, ΩΛ; …)",
+        "curve_extra_help": "Zum Vergleich überlagern, z.B. '70, 0.3, 0.7; 67.4, 1.0, 0.0'.",
+        "curve_invalid_cosmology": "Ungültige Kosmologie ignoriert: {entry}",
+        "curve_distance_axis": "Distanz [Mpc]",
+        "curve_lookback_axis": "Rückblickzeit [Gyr]",
+        "curve_comoving": "D_C (mitbewegt)",
+        "curve_luminosity": "D_L (Leuchtkraft)",
+        "curve_angular": "D_A (Winkeldurchmesser)",
+        "curve_quantity": "Größe",
+        "curve_cosmology": "Kosmologie",
+        "export_units": "Einheiten der Tabelle",
+        "export_format": "Dateiformat",
+        "export_float32": "float32",
+        "export_float32_help": "Halbiert die Dateigröße; Werte auf etwa 7 signifikante Stellen genau.",
+        "export_text": "km ausgeschrieben",
+        "export_text_help": "Zusätzliche Textspalten mit den ausgeschriebenen Kilometerwerten.",
+        "export_button": "Kurventabelle herunterladen",
+        "derived_quantities": "Abgeleitete Größen",
+        "distance_modulus": "Entfernungsmodul μ [mag]",
+        "kpc_per_arcsec": "Winkelskala [kpc/″]",
+        "diff_comoving_volume": "dV_c/dz/dΩ [Mpc³/sr]",
+        "comoving_volume": "Mitbewegtes Volumen bis z [Gpc³]",
+        "age_at_z": "Alter des Universums bei z [Gyr]",
+        "hubble_at_z": "H(z) [km/s/Mpc]",
+        "debug_panel": "Debug: Instrumentierung",
+        "debug_disabled": "Messung ist aus. Zum Einschalten die App mit der Umgebungsvariablen REDSHIFT_INSTRUMENTATION=1 starten (gilt für alle Sitzungen).",
+        "debug_caches": "Caches",
+        "debug_stages": "Laufzeit pro Stufe",
+        "debug_counters": "Zähler",
+        "debug_export_json": "Export als JSON",
+        "debug_export_prometheus": "Export im Prometheus-Format",
+        "debug_reset": "Zähler zurücksetzen",
+        "debug_result_cache": "Ergebniscache ({shared}): {entries} Einträge, {mb:.2f} von {max_mb:.0f} MB, Werte auf {tolerance:.0e} relativ genau.",
+        "debug_shared": "geteilt",
+        "debug_process": "pro Prozess",
         "cosmo_params": "Kosmologische Parameter",
         "hubble_h0": "Hubble-Konstante (H₀) [km/s/Mpc]",
         "omega_m": "Materiedichte (Ωm)",
         "omega_lambda": "Dunkle Energie (ΩΛ)",
-        "flat_universe_warning": "Ωm + ΩΛ ≉ 1. Berechnungen gehen von flachem Universum aus (Ωk=0).",
+        "flat_universe_warning": "Ωm + ΩΛ + Ωr ≉ 1. Ohne Krümmung gehen die Berechnungen von einem flachen Universum aus (Ωk=0).",
+        "model_params": "Erweitertes Modell",
+        "omega_r": "Strahlungsdichte (Ωr)",
+        "w0": "Zustandsgleichung w₀",
+        "wa": "Zeitentwicklung wₐ",
+        "w_help": "w(a) = w₀ + wₐ(1 − a); w₀ = −1, wₐ = 0 entspricht der kosmologischen Konstante.",
+        "curvature": "Krümmung berücksichtigen (Ωk = 1 − Ωm − ΩΛ − Ωr)",
+        "curvature_info": "Ωk = {omega_k:+.4f}: {geometry} Universum, transversale Distanzen mit {function}.",
+        "geometry_open": "offenes",
+        "geometry_closed": "geschlossenes",
+        "transverse_comoving": "Transversale mitbewegte Distanz [Mpc]",
         "results_for": "Ergebnisse für z = {z:.5f}",
         "error_invalid_input": "Ungültige Eingabe. Bitte Zahlen verwenden.",
         "error_h0_positive": "Hubble-Konstante muss positiv sein.",
@@ -50,7 +120,7 @@ translations = {
         "unit_LJ": "LJ",
         "unit_AE": "AE",
         "unit_Ls": "Ls",
-        "calculation_note": "Berechnung basiert auf dem flachen ΛCDM-Modell unter Vernachlässigung der Strahlungsdichte.",
+        "calculation_note": "Berechnung basiert auf dem ΛCDM-Modell; Krümmung, Strahlungsdichte und w₀/wₐ gemäß „Erweitertes Modell“.",
         "donate_text": "Gefällt Ihnen dieser Rechner? Unterstützen Sie die Entwicklung mit einer kleinen Spende!",
         "donate_button": "Spenden via Ko-fi",
         "bug_report": "Fehler gefunden?",
@@ -76,11 +146,77 @@ translations = {
         "lang_select": "Select Language",
         "input_params": "Input Parameters",
         "redshift_z": "Redshift (z)",
+        "input_mode": "Input by",
+        "input_mode_redshift": "Redshift",
+        "input_mode_comoving": "Comoving Distance",
+        "input_mode_luminosity": "Luminosity Distance",
+        "input_mode_lookback": "Lookback Time",
+        "input_comoving_mpc": "Comoving Distance [Mpc]",
+        "input_luminosity_mpc": "Luminosity Distance [Mpc]",
+        "input_lookback_gyr": "Lookback Time [Gyr]",
+        "derived_redshift": "Derived redshift: z = {z:.6f}",
+        "error_inverse_out_of_range": "No redshift corresponds to this value in the selected model.",
+        "error_inverse_ambiguous": "Several redshifts correspond to this value in the selected (closed) model.",
+        "uncertainty_mode": "Uncertainties (Monte Carlo)",
+        "uncertainty_enable": "Compute uncertainties",
+        "sigma_h0": "σ(H₀) [km/s/Mpc]",
+        "sigma_omega_m": "σ(Ωm)",
+        "sigma_omega_lambda": "σ(ΩΛ)",
+        "n_samples": "Number of samples",
+        "uncertainty_note": "± : {level:.0f}% credible interval around the median from {n} Monte Carlo samples of (H₀, Ωm, ΩΛ).",
+        "curve_view": "Curve view: distances and lookback time over z",
+        "curve_z_max": "Maximum redshift (z_max)",
+        "curve_log_scale": "Logarithmic y-axis",
+        "curve_extra_cosmologies": "Additional cosmologies (H₀, Ωm, ΩΛ; …)",
+        "curve_extra_help": "Overlay for comparison, e.g. '70, 0.3, 0.7; 67.4, 1.0, 0.0'.",
+        "curve_invalid_cosmology": "Invalid cosmology ignored: {entry}",
+        "curve_distance_axis": "Distance [Mpc]",
+        "curve_lookback_axis": "Lookback Time [Gyr]",
+        "curve_comoving": "D_C (comoving)",
+        "curve_luminosity": "D_L (luminosity)",
+        "curve_angular": "D_A (angular diameter)",
+        "curve_quantity": "Quantity",
+        "curve_cosmology": "Cosmology",
+        "export_units": "Table units",
+        "export_format": "File format",
+        "export_float32": "float32",
+        "export_float32_help": "Halves the file size; values accurate to about 7 significant digits.",
+        "export_text": "km written out",
+        "export_text_help": "Additional text columns with the kilometer values written out.",
+        "export_button": "Download curve table",
+        "derived_quantities": "Derived Quantities",
+        "distance_modulus": "Distance Modulus μ [mag]",
+        "kpc_per_arcsec": "Angular Scale [kpc/″]",
+        "diff_comoving_volume": "dV_c/dz/dΩ [Mpc³/sr]",
+        "comoving_volume": "Comoving Volume within z [Gpc³]",
+        "age_at_z": "Age of the Universe at z [Gyr]",
+        "hubble_at_z": "H(z) [km/s/Mpc]",
+        "debug_panel": "Debug: Instrumentation",
+        "debug_disabled": "Measurement is off. Start the app with the environment variable REDSHIFT_INSTRUMENTATION=1 to enable it (applies to all sessions).",
+        "debug_caches": "Caches",
+        "debug_stages": "Wall time per stage",
+        "debug_counters": "Counters",
+        "debug_export_json": "Export as JSON",
+        "debug_export_prometheus": "Export in Prometheus format",
+        "debug_reset": "Reset counters",
+        "debug_result_cache": "Result cache ({shared}): {entries} entries, {mb:.2f} of {max_mb:.0f} MB, values within {tolerance:.0e} relative.",
+        "debug_shared": "shared",
+        "debug_process": "per process",
         "cosmo_params": "Cosmological Parameters",
         "hubble_h0": "Hubble Constant (H₀) [km/s/Mpc]",
         "omega_m": "Matter Density (Ωm)",
         "omega_lambda": "Dark Energy Density (ΩΛ)",
-        "flat_universe_warning": "Ωm + ΩΛ ≉ 1. Calculations assume a flat universe (Ωk=0).",
+        "flat_universe_warning": "Ωm + ΩΛ + Ωr ≉ 1. Without curvature, calculations assume a flat universe (Ωk=0).",
+        "model_params": "Extended Model",
+        "omega_r": "Radiation Density (Ωr)",
+        "w0": "Equation of State w₀",
+        "wa": "Time Evolution wₐ",
+        "w_help": "w(a) = w₀ + wₐ(1 − a); w₀ = −1, wₐ = 0 is a cosmological constant.",
+        "curvature": "Include curvature (Ωk = 1 − Ωm − ΩΛ − Ωr)",
+        "curvature_info": "Ωk = {omega_k:+.4f}: {geometry} universe, transverse distances use {function}.",
+        "geometry_open": "open",
+        "geometry_closed": "closed",
+        "transverse_comoving": "Transverse Comoving Distance [Mpc]",
         "results_for": "Results for z = {z:.5f}",
         "error_invalid_input": "Invalid input. Please use numbers.",
         "error_h0_positive": "Hubble constant must be positive.",
@@ -103,7 +239,7 @@ translations = {
         "unit_LJ": "ly",
         "unit_AE": "AU",
         "unit_Ls": "Ls",
-        "calculation_note": "Calculation based on the flat ΛCDM model, neglecting radiation density.",
+        "calculation_note": "Calculation based on the ΛCDM model; curvature, radiation density and w₀/wₐ as set under “Extended Model”.",
         "donate_text": "Like this calculator? Support its development with a small donation!",
         "donate_button": "Donate via Ko-fi",
         "bug_report": "Found a bug?",
@@ -129,11 +265,77 @@ translations = {
         "lang_select": "Choisir la langue",
         "input_params": "Paramètres d'entrée",
         "redshift_z": "Décalage vers le rouge (z)",
+        "input_mode": "Saisie par",
+        "input_mode_redshift": "Décalage vers le rouge",
+        "input_mode_comoving": "Distance comobile",
+        "input_mode_luminosity": "Distance de luminosité",
+        "input_mode_lookback": "Temps de regard en arrière",
+        "input_comoving_mpc": "Distance comobile [Mpc]",
+        "input_luminosity_mpc": "Distance de luminosité [Mpc]",
+        "input_lookback_gyr": "Temps de regard en arrière [Ga]",
+        "derived_redshift": "Décalage vers le rouge dérivé : z = {z:.6f}",
+        "error_inverse_out_of_range": "Aucun décalage vers le rouge ne correspond à cette valeur dans le modèle choisi.",
+        "error_inverse_ambiguous": "Plusieurs décalages vers le rouge correspondent à cette valeur dans le modèle (fermé) choisi.",
+        "uncertainty_mode": "Incertitudes (Monte Carlo)",
+        "uncertainty_enable": "Calculer les incertitudes",
+        "sigma_h0": "σ(H₀) [km/s/Mpc]",
+        "sigma_omega_m": "σ(Ωm)",
+        "sigma_omega_lambda": "σ(ΩΛ)",
+        "n_samples": "Nombre d'échantillons",
+        "uncertainty_note": "± : intervalle de crédibilité à {level:.0f} % autour de la médiane, à partir de {n} échantillons Monte Carlo de (H₀, Ωm, ΩΛ).",
+        "curve_view": "Vue en courbes : distances et temps de regard en arrière en fonction de z",
+        "curve_z_max": "Décalage vers le rouge maximal (z_max)",
+        "curve_log_scale": "Axe y logarithmique",
+        "curve_extra_cosmologies": "Cosmologies supplémentaires (H₀, Ωm, ΩΛ ; …)",
+        "curve_extra_help": "Superposer pour comparer, p. ex. '70, 0.3, 0.7; 67.4, 1.0, 0.0'.",
+        "curve_invalid_cosmology": "Cosmologie invalide ignorée : {entry}",
+        "curve_distance_axis": "Distance [Mpc]",
+        "curve_lookback_axis": "Temps de regard en arrière [Ga]",
+        "curve_comoving": "D_C (comobile)",
+        "curve_luminosity": "D_L (luminosité)",
+        "curve_angular": "D_A (diamètre angulaire)",
+        "curve_quantity": "Grandeur",
+        "curve_cosmology": "Cosmologie",
+        "export_units": "Unités du tableau",
+        "export_format": "Format de fichier",
+        "export_float32": "float32",
+        "export_float32_help": "Réduit la taille du fichier de moitié ; valeurs précises à environ 7 chiffres significatifs.",
+        "export_text": "km en toutes lettres",
+        "export_text_help": "Colonnes de texte supplémentaires avec les valeurs en kilomètres écrites en entier.",
+        "export_button": "Télécharger le tableau des courbes",
+        "derived_quantities": "Grandeurs dérivées",
+        "distance_modulus": "Module de distance μ [mag]",
+        "kpc_per_arcsec": "Échelle angulaire [kpc/″]",
+        "diff_comoving_volume": "dV_c/dz/dΩ [Mpc³/sr]",
+        "comoving_volume": "Volume comobile jusqu'à z [Gpc³]",
+        "age_at_z": "Âge de l'univers à z [Ga]",
+        "hubble_at_z": "H(z) [km/s/Mpc]",
+        "debug_panel": "Débogage : instrumentation",
+        "debug_disabled": "La mesure est désactivée. Démarrer l'application avec la variable d'environnement REDSHIFT_INSTRUMENTATION=1 pour l'activer (vaut pour toutes les sessions).",
+        "debug_caches": "Caches",
+        "debug_stages": "Durée par étape",
+        "debug_counters": "Compteurs",
+        "debug_export_json": "Exporter en JSON",
+        "debug_export_prometheus": "Exporter au format Prometheus",
+        "debug_reset": "Réinitialiser les compteurs",
+        "debug_result_cache": "Cache de résultats ({shared}) : {entries} entrées, {mb:.2f} sur {max_mb:.0f} Mo, valeurs à {tolerance:.0e} près (relatif).",
+        "debug_shared": "partagé",
+        "debug_process": "par processus",
         "cosmo_params": "Paramètres Cosmologiques",
         "hubble_h0": "Constante de Hubble (H₀) [km/s/Mpc]",
         "omega_m": "Densité de matière (Ωm)",
         "omega_lambda": "Densité d'énergie noire (ΩΛ)",
-        "flat_universe_warning": "Ωm + ΩΛ ≉ 1. Les calculs supposent un univers plat (Ωk=0).",
+        "flat_universe_warning": "Ωm + ΩΛ + Ωr ≉ 1. Sans courbure, les calculs supposent un univers plat (Ωk=0).",
+        "model_params": "Modèle étendu",
+        "omega_r": "Densité de rayonnement (Ωr)",
+        "w0": "Équation d'état w₀",
+        "wa": "Évolution temporelle wₐ",
+        "w_help": "w(a) = w₀ + wₐ(1 − a) ; w₀ = −1, wₐ = 0 correspond à la constante cosmologique.",
+        "curvature": "Prendre en compte la courbure (Ωk = 1 − Ωm − ΩΛ − Ωr)",
+        "curvature_info": "Ωk = {omega_k:+.4f} : univers {geometry}, distances transverses avec {function}.",
+        "geometry_open": "ouvert",
+        "geometry_closed": "fermé",
+        "transverse_comoving": "Distance comobile transverse [Mpc]",
         "results_for": "Résultats pour z = {z:.5f}",
         "error_invalid_input": "Entrée invalide. Veuillez utiliser des chiffres.",
         "error_h0_positive": "La constante de Hubble doit être positive.",
@@ -156,7 +358,7 @@ translations = {
         "unit_LJ": "al",
         "unit_AE": "UA",
         "unit_Ls": "sl",
-        "calculation_note": "Calcul basé sur le modèle ΛCDM plat, négligeant la densité de rayonnement.",
+        "calculation_note": "Calcul basé sur le modèle ΛCDM ; courbure, densité de rayonnement et w₀/wₐ selon « Modèle étendu ».",
         "donate_text": "Vous aimez ce calculateur ? Soutenez son développement avec un petit don !",
         "donate_button": "Faire un don via Ko-fi",
         "bug_report": "Trouvé un bug ?",
@@ -221,84 +423,48 @@ glossary_data = {
 }
 
 
-# --- Hilfsfunktionen für Integration & Berechnung (unverändert) ---
-def hubble_parameter_inv_integrand(z, omega_m, omega_lambda):
-  epsilon = 1e-15
-  denominator = np.sqrt(omega_m * (1 + z)**3 + omega_lambda + epsilon)
-  if denominator < epsilon: return 0.0
-  return 1.0 / denominator
-
-def lookback_time_integrand(z, omega_m, omega_lambda):
-  epsilon = 1e-15
-  term_in_sqrt = omega_m * (1 + z)**3 + omega_lambda
-  term_in_sqrt = max(term_in_sqrt, 0)
-  denominator = (1 + z) * np.sqrt(term_in_sqrt + epsilon)
-  if math.isclose(z, 0):
-      denom_at_zero = np.sqrt(omega_m + omega_lambda + epsilon)
-      if denom_at_zero < epsilon: return 0.0
-      return 1.0 / denom_at_zero
-  if abs(denominator) < epsilon: return 0.0
-  return 1.0 / denominator
-
-@st.cache_data # Ergebnisse cachen für gleiche Eingaben
-def calculate_lcdm_distances(redshift, h0, omega_m, omega_lambda):
-  """Berechnet Distanzen & Zeit, gibt Dict zurück."""
-  if not isinstance(redshift, (int, float)) or \
-     not isinstance(h0, (int, float)) or \
-     not isinstance(omega_m, (int, float)) or \
-     not isinstance(omega_lambda, (int, float)):
-       return {'error_msg': "error_invalid_input"}
-  if redshift < 0:
-     return {'comoving_mpc': 0.0, 'luminosity_mpc': 0.0, 'ang_diam_mpc': 0.0, 'lookback_gyr': 0.0, 'error_msg': "warn_blueshift"}
-  if math.isclose(redshift, 0):
-      return {'comoving_mpc': 0.0, 'luminosity_mpc': 0.0, 'ang_diam_mpc': 0.0, 'lookback_gyr': 0.0, 'error_msg': None}
-  if h0 <= 0: return {'error_msg': "error_h0_positive"}
-  if omega_m < 0 or omega_lambda < 0: return {'error_msg': "error_omega_negative"}
-
-  dh = C_KM_PER_S / h0
-  try:
-    integral_dc, err_dc = quad(hubble_parameter_inv_integrand, 0, redshift, args=(omega_m, omega_lambda), limit=100)
-    comoving_distance_mpc = dh * integral_dc
-    hubble_time_gyr = 977.8 / h0
-    integral_lt, err_lt = quad(lookback_time_integrand, 0, redshift, args=(omega_m, omega_lambda), limit=100)
-    lookback_time_gyr = hubble_time_gyr * integral_lt
-    luminosity_distance_mpc = comoving_distance_mpc * (1 + redshift)
-    angular_diameter_distance_mpc = comoving_distance_mpc / (1 + redshift)
-
-    warning_msg_key = None
-    warning_msg_args = {}
-    integration_warning_threshold = 1e-5
-    if err_dc > integration_warning_threshold or err_lt > integration_warning_threshold:
-       warning_msg_key = "warn_integration_accuracy"
-       warning_msg_args = {'err_dc': err_dc, 'err_lt': err_lt}
-
-    return {'comoving_mpc': comoving_distance_mpc, 'luminosity_mpc': luminosity_distance_mpc,
-            'ang_diam_mpc': angular_diameter_distance_mpc, 'lookback_gyr': lookback_time_gyr,
-            'error_msg': None, 'integration_warning_key': warning_msg_key, 'integration_warning_args': warning_msg_args}
-  except ImportError: return {'error_msg': "error_dep_scipy"}
-  except Exception as e:
-        st.exception(e)
-        return {'error_msg': "error_calc_failed", 'error_args': {'e': e}}
-
-# --- Einheitenumrechnungsfunktionen (unverändert) ---
-def convert_mpc_to_km(d): return d * KM_PER_MPC
-def convert_km_to_au(d): return 0.0 if d == 0 else d / KM_PER_AU
-def convert_km_to_ly(d): return 0.0 if d == 0 else d / KM_PER_LY
-def convert_km_to_ls(d): return 0.0 if d == 0 else d / KM_PER_LS
-def convert_mpc_to_gly(d):
-    if d == 0: return 0.0
-    km_per_gly = KM_PER_LY * 1e9
-    distance_km = convert_mpc_to_km(d)
-    return 0.0 if km_per_gly == 0 else distance_km / km_per_gly
-
-# --- Formatierungsfunktion (unverändert) ---
-def format_large_number(number):
-    if number == 0: return "0"
-    if not np.isfinite(number): return str(number)
-    try:
-        formatted = f"{number:,.0f}".replace(",", " ")
-        return formatted
-    except (ValueError, TypeError): return str(number)
+# --- Instrumentierung (optional, Debug-Panel in der Sidebar) ---
+@st.cache_resource
+def shared_result_cache():
+    """Ein begrenzter Ergebniscache pro Prozess (REDSHIFT_CACHE*); mit REDSHIFT_CACHE teilen ihn alle Prozesse."""
+    cache = cache_from_environment()
+    instrumentation.register_cache('results', cache)
+    return cache
+
+result_cache = shared_result_cache()
+# Instrumentierung ist Prozesskonfiguration (REDSHIFT_INSTRUMENTATION=1 beim Start), nicht pro Sitzung umschaltbar:
+# das Flag gilt für alle Sitzungen des Prozesses
+
+# --- Berechnung (Ergebnisse cachen für gleiche bzw. innerhalb der Toleranz gleiche Eingaben) ---
+calculate_lcdm_distances = result_cache.memoize(_calculate_lcdm_distances)
+
+@result_cache.memoize
+def calculate_derived_quantities(redshift, h0, omega_m, omega_lambda, omega_r, w0, wa, curvature):
+    """Abgeleitete Größen für ein z (ein gemeinsamer Integrationsdurchlauf)."""
+    results = calculate_lcdm_quantities([redshift], h0, omega_m, omega_lambda, outputs=DERIVED_OUTPUTS,
+                                        omega_r=omega_r, w0=w0, wa=wa, curvature=curvature)
+    if results.get('error_msg'): return results
+    return {name: float(results[name][0]) for name in DERIVED_OUTPUTS}
+
+@result_cache.memoize
+def calculate_uncertainty(redshift, h0, omega_m, omega_lambda, model_params, sigmas, n_samples):
+    """Monte-Carlo-Intervalle für ein z (diagonale Kovarianz aus den σ-Werten)."""
+    covariance = [[sigmas[i]**2 if i == j else 0.0 for j in range(3)] for i in range(3)]
+    return propagate_uncertainty_gaussian([redshift], [h0, omega_m, omega_lambda], covariance,
+                                          n_samples=n_samples, seed=0, **dict(model_params))
+
+def parse_cosmologies(text):
+    """Liest 'H0, Ωm, ΩΛ; ...' ein, gibt (gültige Tupel, ungültige Einträge) zurück."""
+    valid, invalid = [], []
+    for entry in (e.strip() for e in text.split(';')):
+        if not entry: continue
+        try:
+            h0, omega_m, omega_lambda = (float(v) for v in entry.split(','))
+        except ValueError:
+            invalid.append(entry)
+            continue
+        valid.append((h0, omega_m, omega_lambda))
+    return valid, invalid
 
 # --- Übersetzungshelfer (unverändert) ---
 if 'lang' not in st.session_state: st.session_state.lang = 'DE'
@@ -311,144 +477,453 @@ def t(key, **kwargs):
         print(f"Warnung: Fehlender Formatierungsschlüssel {e} für Text '{key}' in Sprache {lang}")
         return text
 
-# --- NEUE Hilfsfunktionen für Beispiele ---
-def get_lookback_comparison(gyr):
-    """Gibt einen Vergleich für die Rückblickzeit zurück (als Schlüssel)."""
-    if gyr < 0.001: return "example_lookback_recent"
-    if gyr < 0.05: return "example_lookback_humans"
-    if gyr < 0.3: return "example_lookback_dinos"
-    if gyr < 1.0: return "example_lookback_multicellular"
-    if gyr < 5.0: return "example_lookback_earth"
-    return "example_lookback_early_univ"
-
-def get_comoving_comparison(mpc):
-    """Gibt einen Vergleich für die mitbewegte Distanz zurück (als Schlüssel)."""
-    if mpc < 5: return "example_comoving_local"
-    if mpc < 50: return "example_comoving_virgo"
-    if mpc < 200: return "example_comoving_coma"
-    if mpc < 1000: return "example_comoving_lss"
-    if mpc < 8000: return "example_comoving_quasars"
-    return "example_comoving_cmb"
+# --- Fragmente und Ergebnisse pro Sitzung ---
+# Die Seite besteht aus Fragmenten, die einzeln neu laufen: Eingaben (Sidebar), Ergebnisse, Kurven,
+# Glossar, Fußzeile und Debug-Panel. Eine geänderte Eingabe läuft nur die abhängigen Fragmente neu;
+# kommt während eines Laufs die nächste, bricht Streamlit ihn beim nächsten Element ab (ohne Warten),
+# gerechnet wird nur für die neueste Eingabe, bekannte Kombinationen kommen aus dem Sitzungsspeicher.
+# Ein Sprachwechsel läuft die ganze Seite neu, übersetzt aber nur die in der Sitzung gemerkten
+# Ergebnisse (keine Berechnung, keine Umrechnung, keine Formatierung großer Zahlen).
+RESULT_MEMO_SIZE = 16  # zuletzt benutzte Eingabekombinationen pro Sitzung
+INPUT_DEPENDENT_FRAGMENTS = ['inputs', 'results', 'curves', 'debug']
+INPUT_MODES = ['redshift', 'comoving', 'luminosity', 'lookback']
+INPUT_DEFAULTS = {'input_mode': 'redshift', 'z_input': 0.03403, 'inverse_comoving': 150.0, 'inverse_luminosity': 150.0,
+                  'inverse_lookback': 1.0, 'h0_input': H0_DEFAULT, 'omega_m_input': OMEGA_M_DEFAULT,
+                  'omega_lambda_input': OMEGA_LAMBDA_DEFAULT, 'curvature': False, 'omega_r_input': 0.0, 'w0_input': -1.0,
+                  'wa_input': 0.0, 'uncertainty_on': False, 'sigma_h0': 0.5, 'sigma_omega_m': 0.007,
+                  'sigma_omega_lambda': 0.007, 'n_samples': 5000}
+
+class CalculatorInputs(NamedTuple):
+    """Alle Eingaben eines Durchlaufs (hashbar, Schlüssel der Sitzungsergebnisse)."""
+    input_mode: str
+    value: float  # z oder der Wert der inversen Eingabe
+    h0: float
+    omega_m: float
+    omega_lambda: float
+    omega_r: float
+    w0: float
+    wa: float
+    curvature: bool
+    uncertainty_on: bool
+    sigmas: tuple
+    n_samples: int
+
+    @property
+    def model_params(self):
+        return (('omega_r', self.omega_r), ('w0', self.w0), ('wa', self.wa), ('curvature', self.curvature))
+
+def read_inputs():
+    """Eingaben aus dem Session State (auch in Fragment-Läufen ohne die Eingabe-Widgets)."""
+    def get(key): return st.session_state.get(key, INPUT_DEFAULTS[key])
+    input_mode = get('input_mode')
+    value = get('z_input') if input_mode == 'redshift' else get(f'inverse_{input_mode}')
+    return CalculatorInputs(input_mode, value, get('h0_input'), get('omega_m_input'), get('omega_lambda_input'),
+                            get('omega_r_input'), get('w0_input'), get('wa_input'), get('curvature'),
+                            get('uncertainty_on'), (get('sigma_h0'), get('sigma_omega_m'), get('sigma_omega_lambda')),
+                            int(get('n_samples')))
+
+def on_input_change():
+    """Widget-Callback: nur die abhängigen Fragmente neu laufen lassen."""
+    st.rerun(INPUT_DEPENDENT_FRAGMENTS)
+
+def on_language_change():
+    st.session_state.lang = st.session_state.lang_selector
+
+def page_fragment(key):
+    """st.fragment mit Schlüssel (Ziel von st.rerun); Laufzeit als Stufe 'fragment.<key>' bei aktiver Instrumentierung."""
+    def decorate(render):
+        @functools.wraps(render)
+        def timed():
+            with instrumentation.stage(f'fragment.{key}'): render()
+        return st.fragment(timed, key=key)
+    return decorate
+
+def session_memo(name, key, compute):
+    """Die letzten RESULT_MEMO_SIZE Ergebnisse von compute() pro Sitzung (ohne Hashing der Werte)."""
+    memo = st.session_state.setdefault(f'memo_{name}', {})
+    if key in memo:
+        memo[key] = memo.pop(key)  # zuletzt benutzt ans Ende
+        return memo[key]
+    value = memo[key] = compute()
+    if len(memo) > RESULT_MEMO_SIZE: del memo[next(iter(memo))]
+    return value
+
+def resolve_redshift(inputs):
+    """z zur Eingabe (bei Distanz/Rückblickzeit invers bestimmt); gibt (z, Fehlerschlüssel) zurück."""
+    if inputs.input_mode == 'redshift': return inputs.value, None
+    inverse_fn = {'comoving': redshift_from_comoving_distance, 'luminosity': redshift_from_luminosity_distance,
+                  'lookback': redshift_from_lookback_time}[inputs.input_mode]
+    inverse_result = inverse_fn(inputs.value, inputs.h0, inputs.omega_m, inputs.omega_lambda, **dict(inputs.model_params))
+    if inverse_result.get('error_msg'): return None, inverse_result['error_msg']
+    z = float(inverse_result['redshift'][0])
+    if not math.isfinite(z): return None, "error_inverse_out_of_range"
+    return z, None
+
+def redshift_of(inputs):
+    return session_memo('redshift', inputs, lambda: resolve_redshift(inputs))
+
+def uncertainty_range(uncertainty, name, fmt, convert=lambda v: v):
+    """Asymmetrisches ±-Intervall als Text (leer ohne Unsicherheitsmodus)."""
+    if uncertainty is None: return ""
+    stats = uncertainty[name]
+    median = convert(stats['median'][0])
+    plus = convert(stats['upper'][0]) - median
+    minus = median - convert(stats['lower'][0])
+    return f" (+{plus:{fmt}} / −{minus:{fmt}})"
+
+def compute_results(inputs):
+    """Berechnung, Umrechnungen und Zahlenformate zu einer Eingabe; sprachunabhängig (Texte erst beim Anzeigen)."""
+    z, error_key = redshift_of(inputs)
+    if error_key: return {'error_msg': error_key}
+    results = calculate_lcdm_distances(z, inputs.h0, inputs.omega_m, inputs.omega_lambda,
+                                       inputs.omega_r, inputs.w0, inputs.wa, inputs.curvature)
+    view = {'z': z, 'derived_z': inputs.input_mode != 'redshift', 'results': results,
+            'curved': inputs.curvature and abs(1.0 - inputs.omega_m - inputs.omega_lambda - inputs.omega_r) >= 1e-3}
+    error_key = results.get('error_msg')
+    if error_key and error_key != "warn_blueshift": return view
+
+    # Monte-Carlo-Intervalle (optional)
+    uncertainty = None
+    if inputs.uncertainty_on and not error_key:
+        uncertainty = calculate_uncertainty(z, inputs.h0, inputs.omega_m, inputs.omega_lambda, inputs.model_params,
+                                            inputs.sigmas, inputs.n_samples)
+        if uncertainty.get('error_msg'): uncertainty = None
+    view['uncertainty'] = uncertainty
+    view['ranges'] = {name: uncertainty_range(uncertainty, name, ',.4f') for name in ('comoving_mpc', 'luminosity_mpc', 'ang_diam_mpc')}
+    view['ranges'].update({f'{name}_gly': uncertainty_range(uncertainty, name, ',.4f', convert_mpc_to_gly)
+                           for name in ('comoving_mpc', 'luminosity_mpc', 'ang_diam_mpc')})
+    view['ranges']['lookback_gyr'] = uncertainty_range(uncertainty, 'lookback_gyr', '.4f')
+
+    # Umrechnungen
+    with instrumentation.stage('convert'):
+        comoving_km = convert_mpc_to_km(results['comoving_mpc'])
+        view.update(comoving_gly=convert_mpc_to_gly(results['comoving_mpc']),
+                    luminosity_gly=convert_mpc_to_gly(results['luminosity_mpc']),
+                    ang_diam_gly=convert_mpc_to_gly(results['ang_diam_mpc']), comoving_km=comoving_km,
+                    comoving_ly=convert_km_to_ly(comoving_km), comoving_au=convert_km_to_au(comoving_km),
+                    comoving_ls=convert_km_to_ls(comoving_km))
+    with instrumentation.stage('format'):
+        view['comoving_km_ausgeschrieben'] = format_large_number(comoving_km)
+
+    view['derived'] = calculate_derived_quantities(z, inputs.h0, inputs.omega_m, inputs.omega_lambda,
+                                                   inputs.omega_r, inputs.w0, inputs.wa, inputs.curvature)
+    return view
 
 # --- Streamlit UI Aufbau ---
 st.set_page_config(page_title="Advanced Redshift Calculator", layout="wide")
 st.title("Advanced Redshift Calculator")
 
-# --- Sidebar (unverändert bis auf Tooltip für z) ---
 with st.sidebar:
     st.header(t("input_params"))
-    selected_lang = st.selectbox(label=t("lang_select"), options=['DE', 'EN', 'FR'],
-                                 index=['DE', 'EN', 'FR'].index(st.session_state.lang), key='lang_selector')
-    if selected_lang != st.session_state.lang:
-        st.session_state.lang = selected_lang
-        st.rerun()
-
-    z_input = st.number_input(label=t("redshift_z"), min_value=-0.99, value=0.03403, step=0.1, format="%.5f",
-                              help=t('redshift_z_tooltip', default="Geben Sie die kosmologische Rotverschiebung ein.")) # Tooltip hinzugefügt
-
-    st.markdown("---")
-    st.subheader(t("cosmo_params"))
-    h0_input = st.number_input(label=t("hubble_h0"), min_value=1.0, value=H0_DEFAULT, step=0.1, format="%.1f")
-    omega_m_input = st.number_input(label=t("omega_m"), min_value=0.0, max_value=2.0, value=OMEGA_M_DEFAULT, step=0.01, format="%.3f")
-    omega_lambda_input = st.number_input(label=t("omega_lambda"), min_value=0.0, max_value=2.0, value=OMEGA_LAMBDA_DEFAULT, step=0.01, format="%.3f")
-
-    if not math.isclose(omega_m_input + omega_lambda_input, 1.0, abs_tol=1e-3):
-        st.warning(t("flat_universe_warning"))
+    # Sprachwechsel: ganze Seite neu, Ergebnisse kommen aus dem Sitzungsspeicher
+    st.selectbox(label=t("lang_select"), options=['DE', 'EN', 'FR'], index=['DE', 'EN', 'FR'].index(st.session_state.lang),
+                 key='lang_selector', on_change=on_language_change)
+
+@page_fragment('inputs')
+def render_inputs():
+    """Eingabeparameter in der Sidebar."""
+    with st.sidebar:
+        # Eingabe über Rotverschiebung oder (invers) über Distanz / Rückblickzeit
+        input_mode = st.radio(t("input_mode"), options=INPUT_MODES, format_func=lambda m: t(f"input_mode_{m}"),
+                              horizontal=True, key='input_mode', on_change=on_input_change)
+        if input_mode == 'redshift':
+            st.number_input(label=t("redshift_z"), min_value=-0.99, value=INPUT_DEFAULTS['z_input'], step=0.1, format="%.5f",
+                            help=t('redshift_z_tooltip', default="Geben Sie die kosmologische Rotverschiebung ein."), # Tooltip hinzugefügt
+                            key='z_input', on_change=on_input_change)
+        elif input_mode == 'lookback':
+            st.number_input(label=t("input_lookback_gyr"), min_value=0.0, value=INPUT_DEFAULTS['inverse_lookback'], step=0.1,
+                            format="%.4f", key='inverse_lookback', on_change=on_input_change)
+        else:
+            st.number_input(label=t(f"input_{input_mode}_mpc"), min_value=0.0, value=INPUT_DEFAULTS[f'inverse_{input_mode}'],
+                            step=10.0, format="%.4f", key=f'inverse_{input_mode}', on_change=on_input_change)
+
+        st.markdown("---")
+        st.subheader(t("cosmo_params"))
+        st.number_input(label=t("hubble_h0"), min_value=1.0, value=INPUT_DEFAULTS['h0_input'], step=0.1, format="%.1f",
+                        key='h0_input', on_change=on_input_change)
+        st.number_input(label=t("omega_m"), min_value=0.0, max_value=2.0, value=INPUT_DEFAULTS['omega_m_input'], step=0.01,
+                        format="%.3f", key='omega_m_input', on_change=on_input_change)
+        st.number_input(label=t("omega_lambda"), min_value=0.0, max_value=2.0, value=INPUT_DEFAULTS['omega_lambda_input'],
+                        step=0.01, format="%.3f", key='omega_lambda_input', on_change=on_input_change)
+
+        with st.expander(t("model_params")):
+            st.checkbox(t("curvature"), value=INPUT_DEFAULTS['curvature'], key='curvature', on_change=on_input_change)
+            st.number_input(label=t("omega_r"), min_value=0.0, max_value=0.01, value=INPUT_DEFAULTS['omega_r_input'], step=1e-5,
+                            format="%.6f", key='omega_r_input', on_change=on_input_change)
+            st.number_input(label=t("w0"), min_value=-3.0, max_value=1.0, value=INPUT_DEFAULTS['w0_input'], step=0.05,
+                            format="%.3f", help=t("w_help"), key='w0_input', on_change=on_input_change)
+            st.number_input(label=t("wa"), min_value=-3.0, max_value=3.0, value=INPUT_DEFAULTS['wa_input'], step=0.05,
+                            format="%.3f", help=t("w_help"), key='wa_input', on_change=on_input_change)
+        inputs = read_inputs()
+
+        omega_k = 1.0 - inputs.omega_m - inputs.omega_lambda - inputs.omega_r
+        if inputs.curvature and abs(omega_k) >= 1e-3:
+            st.info(t("curvature_info", omega_k=omega_k, geometry=t("geometry_open" if omega_k > 0 else "geometry_closed"),
+                      function="sinh" if omega_k > 0 else "sin"))
+        elif not inputs.curvature and abs(omega_k) >= 1e-3:
+            st.warning(t("flat_universe_warning"))
+
+        with st.expander(t("uncertainty_mode")):
+            st.checkbox(t("uncertainty_enable"), value=INPUT_DEFAULTS['uncertainty_on'], key='uncertainty_on',
+                        on_change=on_input_change)
+            st.number_input(t("sigma_h0"), min_value=0.0, value=INPUT_DEFAULTS['sigma_h0'], step=0.1, format="%.2f",
+                            key='sigma_h0', on_change=on_input_change)
+            st.number_input(t("sigma_omega_m"), min_value=0.0, value=INPUT_DEFAULTS['sigma_omega_m'], step=0.001, format="%.4f",
+                            key='sigma_omega_m', on_change=on_input_change)
+            st.number_input(t("sigma_omega_lambda"), min_value=0.0, value=INPUT_DEFAULTS['sigma_omega_lambda'], step=0.001,
+                            format="%.4f", key='sigma_omega_lambda', on_change=on_input_change)
+            st.number_input(t("n_samples"), min_value=100, max_value=100_000, value=INPUT_DEFAULTS['n_samples'], step=1000,
+                            key='n_samples', on_change=on_input_change)
+
+        st.markdown("---")
+        st.markdown(f"**{t('bug_report')}**")
+        report_mail = "debrun2005@gmail.com"
+        report_subject = "Bug Report: Advanced Redshift Calculator"
+        input_line = f"z={inputs.value}" if inputs.input_mode == 'redshift' else f"{inputs.input_mode}={inputs.value}"
+        report_body = f"Hallo,\n\nich habe einen Fehler im Advanced Redshift Calculator gefunden:\n\n[Bitte beschreiben Sie den Fehler hier]\n\nParameter:\n{input_line}\nH0={inputs.h0}\nOmega_m={inputs.omega_m}\nOmega_Lambda={inputs.omega_lambda}\nOmega_r={inputs.omega_r}\nw0={inputs.w0}\nwa={inputs.wa}\ncurvature={inputs.curvature}\n\nDanke!"
+        report_body_encoded = report_body.replace("\n", "%0A").replace(" ", "%20")
+        st.link_button(t("bug_report_button"), f"mailto:{report_mail}?subject={report_subject}&body={report_body_encoded}")
+
+def show_results(view):
+    """Übersetzt und zeigt gemerkte Ergebnisse an (rechnet nicht)."""
+    if view.get('z') is None:
+        st.error(t(view['error_msg']))
+        return
+    st.header(t("results_for", z=view['z']))
+    if view['derived_z']: st.caption(t("derived_redshift", z=view['z']))
+
+    results = view['results']
+    error_key = results.get('error_msg')
+    if error_key:
+        error_args = results.get('error_args', {})
+        if 'e' in error_args: st.exception(error_args['e'])
+        error_text = t(error_key, **error_args)
+        if error_key == "warn_blueshift":
+            st.warning(error_text)
+        else:
+            st.error(error_text)
+            return
+
+    warning_key = results.get('integration_warning_key')
+    if warning_key:
+        warning_args = results.get('integration_warning_args', {})
+        st.info(t(warning_key, **warning_args))
+
+    # Ergebnisse extrahieren (nach Fehlerprüfung)
+    comoving_mpc = results['comoving_mpc']
+    luminosity_mpc = results['luminosity_mpc']
+    ang_diam_mpc = results['ang_diam_mpc']
+    lookback_gyr = results['lookback_gyr']
+    ranges = view['ranges']
+
+    # --- Ergebnisse mit Beispielen anzeigen ---
+    st.metric(label=t("lookback_time"), value=f"{lookback_gyr:.4f}{ranges['lookback_gyr']}", delta=t("unit_Gyr"))
+    # NEU: Beispiel für Rückblickzeit
+    lookback_example_key = get_lookback_comparison(lookback_gyr)
+    st.caption(f"*{t(lookback_example_key)}*") # Kursiv als Beispiel markieren
 
     st.markdown("---")
-    st.markdown(f"**{t('bug_report')}**")
-    report_mail = "debrun2005@gmail.com"
-    report_subject = "Bug Report: Advanced Redshift Calculator"
-    report_body = f"Hallo,\n\nich habe einen Fehler im Advanced Redshift Calculator gefunden:\n\n[Bitte beschreiben Sie den Fehler hier]\n\nParameter:\nz={z_input}\nH0={h0_input}\nOmega_m={omega_m_input}\nOmega_Lambda={omega_lambda_input}\n\nDanke!"
-    report_body_encoded = report_body.replace("\n", "%0A").replace(" ", "%20")
-    st.link_button(t("bug_report_button"), f"mailto:{report_mail}?subject={report_subject}&body={report_body_encoded}")
-
-# --- Hauptbereich ---
-results = calculate_lcdm_distances(z_input, h0_input, omega_m_input, omega_lambda_input)
-st.header(t("results_for", z=z_input))
-
-error_key = results.get('error_msg')
-if error_key:
-    error_args = results.get('error_args', {})
-    error_text = t(error_key, **error_args)
-    # Verwende den englischen Text zur Überprüfung, da dieser der Schlüssel ist
-    if error_key == "warn_blueshift":
-        st.warning(error_text)
-    else:
-        st.error(error_text)
-        if error_key != "warn_blueshift": st.stop()
-
-warning_key = results.get('integration_warning_key')
-if warning_key:
-    warning_args = results.get('integration_warning_args', {})
-    st.info(t(warning_key, **warning_args))
-
-# Ergebnisse extrahieren (nach Fehlerprüfung)
-comoving_mpc = results['comoving_mpc']
-luminosity_mpc = results['luminosity_mpc']
-ang_diam_mpc = results['ang_diam_mpc']
-lookback_gyr = results['lookback_gyr']
-
-# Umrechnungen
-comoving_gly = convert_mpc_to_gly(comoving_mpc)
-luminosity_gly = convert_mpc_to_gly(luminosity_mpc)
-ang_diam_gly = convert_mpc_to_gly(ang_diam_mpc)
-comoving_km = convert_mpc_to_km(comoving_mpc)
-comoving_ly = convert_km_to_ly(comoving_km)
-comoving_au = convert_km_to_au(comoving_km)
-comoving_ls = convert_km_to_ls(comoving_km)
-comoving_km_ausgeschrieben = format_large_number(comoving_km)
-
-# --- Ergebnisse mit Beispielen anzeigen ---
-st.metric(label=t("lookback_time"), value=f"{lookback_gyr:.4f}", delta=t("unit_Gyr"))
-# NEU: Beispiel für Rückblickzeit
-lookback_example_key = get_lookback_comparison(lookback_gyr)
-st.caption(f"*{t(lookback_example_key)}*") # Kursiv als Beispiel markieren
-
+    st.subheader(t("cosmo_distances"))
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown(t("comoving_distance_title"))
+        st.text(f"  {comoving_mpc:,.4f} {t('unit_Mpc')}{ranges['comoving_mpc']}")
+        st.text(f"  {view['comoving_gly']:,.4f} {t('unit_Gly')}{ranges['comoving_mpc_gly']}")
+        # NEU: Beispiel für Mitbewegte Distanz
+        comoving_example_key = get_comoving_comparison(comoving_mpc)
+        st.caption(f"*{t(comoving_example_key)}*") # Kursiv als Beispiel markieren
+
+        st.text(f"  {view['comoving_km']:,.3e} {t('unit_km_sci')}")
+        st.text(f"  {view['comoving_km_ausgeschrieben']} {t('unit_km_full')}")
+        st.text(f"  {view['comoving_ly']:,.3e} {t('unit_LJ')}")
+        st.text(f"  {view['comoving_au']:,.3e} {t('unit_AE')}")
+        st.text(f"  {view['comoving_ls']:,.3e} {t('unit_Ls')}")
+
+    with col2:
+        st.markdown(t("luminosity_distance_title"))
+        st.text(f"  {luminosity_mpc:,.4f} {t('unit_Mpc')}{ranges['luminosity_mpc']}")
+        st.text(f"  {view['luminosity_gly']:,.4f} {t('unit_Gly')}{ranges['luminosity_mpc_gly']}")
+        # NEU: Erklärung für Leuchtkraftdistanz
+        st.caption(f"*{t('explanation_luminosity')}*")
+
+        st.markdown(t("angular_diameter_distance_title"), unsafe_allow_html=True) # Markdown für Abstand
+        st.text(f"  {ang_diam_mpc:,.4f} {t('unit_Mpc')}{ranges['ang_diam_mpc']}")
+        st.text(f"  {view['ang_diam_gly']:,.4f} {t('unit_Gly')}{ranges['ang_diam_mpc_gly']}")
+        # NEU: Erklärung für Winkeldurchmesserdistanz
+        st.caption(f"*{t('explanation_angular')}*")
+
+    # Abgeleitete Größen (Entfernungsmodul, Winkelskala, Volumen, Alter, H(z))
+    derived = view['derived']
+    if not derived.get('error_msg'):
+        st.markdown("---")
+        st.subheader(t("derived_quantities"))
+        derived_fields = [('distance_modulus_mag', "distance_modulus", ".4f"), ('kpc_per_arcsec', "kpc_per_arcsec", ".4f"),
+                          ('diff_comoving_volume_mpc3_sr', "diff_comoving_volume", ".4e"),
+                          ('comoving_volume_gpc3', "comoving_volume", ",.4f"), ('age_gyr', "age_at_z", ".4f"),
+                          ('hubble_km_s_mpc', "hubble_at_z", ",.2f")]
+        if view['curved']:
+            derived_fields.append(('transverse_comoving_mpc', "transverse_comoving", ",.4f"))
+        derived_cols = st.columns(3)
+        for i, (name, label_key, fmt) in enumerate(derived_fields):
+            value = derived[name]
+            derived_cols[i % 3].metric(label=t(label_key), value=f"{value:{fmt}}" if math.isfinite(value) else "–")
+
+    uncertainty = view['uncertainty']
+    if uncertainty is not None:
+        st.caption(t("uncertainty_note", level=uncertainty['credible_level'] * 100, n=uncertainty['n_samples']))
+
+@page_fragment('results')
+def render_results():
+    """Ergebnisse zur aktuellen Eingabe; gerechnet nur bei neuer Eingabekombination."""
+    inputs = read_inputs()
+    view = session_memo('results', inputs, lambda: compute_results(inputs))
+    render_timer = instrumentation.start_stage('render')
+    show_results(view)
+    instrumentation.stop_stage(render_timer)
+
+def curve_frames(inputs, curve_z_max, extra_text):
+    """Kurven als DataFrames (übersetzte Legenden); ungültige Einträge werden als Liste zurückgegeben."""
+    extra_cosmologies, invalid_entries = parse_cosmologies(extra_text)
+    curve_labels = {'comoving_mpc': t("curve_comoving"), 'luminosity_mpc': t("curve_luminosity"),
+                    'ang_diam_mpc': t("curve_angular")}
+    distance_frames, lookback_frames = [], []
+    for h0_c, om_c, ol_c in [(inputs.h0, inputs.omega_m, inputs.omega_lambda)] + extra_cosmologies:
+        curves = compute_distance_curves(curve_z_max, h0_c, om_c, ol_c, **dict(inputs.model_params))
+        if curves.get('error_msg'):
+            invalid_entries.append(f"{h0_c:g}, {om_c:g}, {ol_c:g}")
+            continue
+        cosmology_label = f"H₀={h0_c:g}, Ωm={om_c:g}, ΩΛ={ol_c:g}"
+        idx = downsample_curve(curves['z'], [curves[k] for k in curve_labels])
+        for key, label in curve_labels.items():
+            distance_frames.append(pd.DataFrame({'z': curves['z'][idx], 'value': curves[key][idx],
+                                                 'quantity': label, 'cosmology': cosmology_label}))
+        idx = downsample_curve(curves['z'], [curves['lookback_gyr']])
+        lookback_frames.append(pd.DataFrame({'z': curves['z'][idx], 'value': curves['lookback_gyr'][idx],
+                                             'cosmology': cosmology_label}))
+    if not distance_frames: return invalid_entries, None, None
+    return invalid_entries, pd.concat(distance_frames), pd.concat(lookback_frames)
+
+UNIT_LABELS = {'mpc': "Mpc", 'gly': "Gly", 'km': "km", 'ly': "ly", 'au': "AU", 'ls': "Ls"}
+FORMAT_LABELS = {'csv': "CSV", 'parquet': "Parquet", 'arrow': "Arrow (IPC)"}
+
+def curve_export(inputs, curve_z_max, extra_text, units, float32, text, fmt):
+    """Kurventabelle aller gültigen Kosmologien in voller Auflösung als Datei (läuft erst beim Klick auf Download)."""
+    dtype = np.float32 if float32 else np.float64
+    tables = []
+    for h0_c, om_c, ol_c in [(inputs.h0, inputs.omega_m, inputs.omega_lambda)] + parse_cosmologies(extra_text)[0]:
+        curves = compute_distance_curves(curve_z_max, h0_c, om_c, ol_c, **dict(inputs.model_params))
+        if curves.get('error_msg'): continue
+        columns = {name: np.full(curves['z'].size, value, dtype=dtype)
+                   for name, value in (('h0', h0_c), ('omega_m', om_c), ('omega_lambda', ol_c))}
+        tables.append({**columns, **distance_table(curves, units, dtype, text_units=('km',) if text else ())})
+    return export_table({name: np.concatenate([table[name] for table in tables]) for name in tables[0]}, fmt)
+
+def curve_spec(y_title, log_y, z_marker, by_quantity):
+    """Vega-Lite-Spezifikation (Linien je Kosmologie, rote Markierung bei z), ohne Altair-Validierung je Lauf."""
+    encoding = {'x': {'field': 'z', 'type': 'quantitative', 'title': t("redshift_z")},
+                'y': {'field': 'value', 'type': 'quantitative', 'title': y_title,
+                      'scale': {'type': 'symlog'} if log_y else {}},
+                'color': {'field': 'cosmology', 'type': 'nominal', 'title': t("curve_cosmology")}}
+    if by_quantity: encoding['strokeDash'] = {'field': 'quantity', 'type': 'nominal', 'title': t("curve_quantity")}
+    marker = {'data': {'values': [{'z': z_marker}]}, 'mark': {'type': 'rule', 'color': 'red', 'strokeDash': [4, 4]},
+              'encoding': {'x': {'field': 'z', 'type': 'quantitative'}}}
+    return {'layer': [{'mark': 'line', 'encoding': encoding}, marker]}
+
+@page_fragment('curves')
+def render_curves():
+    """Kurvenansicht: alle Kurven aus einer kumulativen Integration (gecacht pro Kosmologie)."""
+    inputs = read_inputs()
+    z_input, _ = redshift_of(inputs)
+    if z_input is None: return
+    with st.expander(t("curve_view")):
+        curve_cols = st.columns(3)
+        curve_z_max = curve_cols[0].number_input(t("curve_z_max"), min_value=0.01, value=3.0, step=0.5, format="%.2f", key='curve_z_max')
+        curve_log_y = curve_cols[1].checkbox(t("curve_log_scale"), value=False, key='curve_log_y')
+        extra_text = curve_cols[2].text_input(t("curve_extra_cosmologies"), value="", help=t("curve_extra_help"), key='curve_extra')
+
+        # Kurven hängen nicht von z ab: ein neues z verschiebt nur die Markierung
+        memo_key = (inputs.h0, inputs.omega_m, inputs.omega_lambda, inputs.model_params, curve_z_max, extra_text,
+                    st.session_state.lang)
+        invalid_entries, distance_frame, lookback_frame = session_memo(
+            'curves', memo_key, lambda: curve_frames(inputs, curve_z_max, extra_text))
+        for entry in invalid_entries:
+            st.warning(t("curve_invalid_cosmology", entry=entry))
+        if distance_frame is not None:
+            st.vega_lite_chart(distance_frame, curve_spec(t("curve_distance_axis"), curve_log_y, z_input, True))
+            st.vega_lite_chart(lookback_frame, curve_spec(t("curve_lookback_axis"), curve_log_y, z_input, False))
+
+            # Download: nur die gewählten Einheiten, Text nur auf Wunsch; die Datei entsteht erst beim Klick
+            export_cols = st.columns(4)
+            export_units = export_cols[0].multiselect(t("export_units"), list(UNIT_FACTORS), default=['mpc', 'gly'],
+                                                      format_func=UNIT_LABELS.get, key='export_units')
+            export_format = export_cols[1].selectbox(t("export_format"), list(EXPORT_FORMATS),
+                                                     format_func=FORMAT_LABELS.get, key='export_format')
+            export_float32 = export_cols[2].checkbox(t("export_float32"), help=t("export_float32_help"), key='export_float32')
+            export_text = export_cols[3].checkbox(t("export_text"), help=t("export_text_help"), key='export_text')
+            extension, mime = EXPORT_FORMATS[export_format]
+            st.download_button(t("export_button"),
+                               functools.partial(curve_export, inputs, curve_z_max, extra_text, tuple(export_units),
+                                                 export_float32, export_text, export_format),
+                               file_name=f"redshift_curves.{extension}", mime=mime, on_click='ignore')
+
+@page_fragment('glossary')
+def render_glossary():
+    with st.expander(t("glossary")):
+        current_glossary = glossary_data.get(st.session_state.lang, glossary_data['EN'])
+        for term, definition in current_glossary.items():
+            st.markdown(f"**{term}:** {definition}")
+
+@page_fragment('footer')
+def render_footer():
+    # Spendenlink (unverändert)
+    st.markdown(f"{t('donate_text')}")
+    st.link_button(t("donate_button"), "https://ko-fi.com/advanceddsofinder")
+    st.caption(t("calculation_note"))
+
+@page_fragment('debug')
+def render_debug_panel():
+    """Debug-Panel (zuletzt, damit die Messwerte dieses Durchlaufs enthalten sind)."""
+    with st.sidebar:
+        with st.expander(t("debug_panel")):
+            if not instrumentation.enabled:
+                st.caption(t("debug_disabled"))
+            else:
+                snapshot = instrumentation.snapshot()
+                st.markdown(f"**{t('debug_caches')}**")
+                st.dataframe(pd.DataFrame.from_dict(snapshot['caches'], orient='index'))
+                cache_stats = result_cache.stats()
+                st.caption(t("debug_result_cache", entries=cache_stats['entries'], mb=cache_stats['bytes'] / 2**20,
+                             max_mb=cache_stats['max_bytes'] / 2**20, tolerance=cache_stats['value_tolerance'],
+                             shared=t("debug_shared") if cache_stats['shared'] else t("debug_process")))
+                stage_rows = [{'stage': o['labels']['stage'], 'n': o['count'], 'total_ms': o['sum'] * 1e3,
+                               'max_ms': o['max'] * 1e3} for o in snapshot['observations'] if o['name'] == 'stage_seconds']
+                if stage_rows:
+                    st.markdown(f"**{t('debug_stages')}**")
+                    st.dataframe(pd.DataFrame(stage_rows).set_index('stage'))
+                counter_rows = [{'name': c['name'], 'labels': ", ".join(f"{k}={v}" for k, v in c['labels'].items()),
+                                 'value': c['value']} for c in snapshot['counters']]
+                counter_rows += [{'name': o['name'] + ' (max)', 'labels': ", ".join(f"{k}={v}" for k, v in o['labels'].items()),
+                                  'value': o['max']} for o in snapshot['observations'] if o['name'] != 'stage_seconds']
+                if counter_rows:
+                    st.markdown(f"**{t('debug_counters')}**")
+                    st.dataframe(pd.DataFrame(counter_rows), hide_index=True)
+                st.download_button(t("debug_export_json"), instrumentation.to_json(), file_name="redshift_metrics.json",
+                                   mime="application/json")
+                st.download_button(t("debug_export_prometheus"), instrumentation.to_prometheus(),
+                                   file_name="redshift_metrics.prom", mime="text/plain")
+                if st.button(t("debug_reset")):
+                    instrumentation.reset()
+                    st.rerun(scope="fragment")
+
+# --- Seite ---
+render_inputs()
+render_results()
 st.markdown("---")
-st.subheader(t("cosmo_distances"))
-
-col1, col2 = st.columns(2)
-
-with col1:
-    st.markdown(t("comoving_distance_title"))
-    st.text(f"  {comoving_mpc:,.4f} {t('unit_Mpc')}")
-    st.text(f"  {comoving_gly:,.4f} {t('unit_Gly')}")
-    # NEU: Beispiel für Mitbewegte Distanz
-    comoving_example_key = get_comoving_comparison(comoving_mpc)
-    st.caption(f"*{t(comoving_example_key)}*") # Kursiv als Beispiel markieren
-
-    st.text(f"  {comoving_km:,.3e} {t('unit_km_sci')}")
-    st.text(f"  {comoving_km_ausgeschrieben} {t('unit_km_full')}")
-    st.text(f"  {comoving_ly:,.3e} {t('unit_LJ')}")
-    st.text(f"  {comoving_au:,.3e} {t('unit_AE')}")
-    st.text(f"  {comoving_ls:,.3e} {t('unit_Ls')}")
-
-with col2:
-    st.markdown(t("luminosity_distance_title"))
-    st.text(f"  {luminosity_mpc:,.4f} {t('unit_Mpc')}")
-    st.text(f"  {luminosity_gly:,.4f} {t('unit_Gly')}")
-    # NEU: Erklärung für Leuchtkraftdistanz
-    st.caption(f"*{t('explanation_luminosity')}*")
-
-    st.markdown(t("angular_diameter_distance_title"), unsafe_allow_html=True) # Markdown für Abstand
-    st.text(f"  {ang_diam_mpc:,.4f} {t('unit_Mpc')}")
-    st.text(f"  {ang_diam_gly:,.4f} {t('unit_Gly')}")
-    # NEU: Erklärung für Winkeldurchmesserdistanz
-    st.caption(f"*{t('explanation_angular')}*")
-
+render_curves()
 st.markdown("---")
-
-# Glossar (unverändert)
-with st.expander(t("glossary")):
-    current_glossary = glossary_data.get(st.session_state.lang, glossary_data['EN'])
-    for term, definition in current_glossary.items():
-        st.markdown(f"**{term}:** {definition}")
-
+render_glossary()
 st.markdown("---")
-
-# Spendenlink (unverändert)
-st.markdown(f"{t('donate_text')}")
-st.link_button(t("donate_button"), "https://ko-fi.com/advanceddsofinder")
-st.caption(t("calculation_note"))
-
+render_footer()
+render_debug_panel()
@@ -0,0 +1,54 @@
+"""Gespeicherte Referenzwerte (Baselines) für die Benchmark-Skripte.
+
+Jede Baseline ist eine flache JSON-Datei ``{metrik: wert}`` in
+``benchmarks/baselines/``. Größere Werte sind schlechter (Laufzeit bzw.
+relativer Fehler); eine Metrik gilt als Regression, wenn sie den gespeicherten
+Wert um mehr als den Faktor ``factor`` überschreitet.
+"""
+import json
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)  # redshift_core ohne Installation importierbar
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+def load_baseline(name):
+    try:
+        with open(baseline_path(name)) as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return {}
+
+def save_baseline(name, metrics):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    with open(baseline_path(name), "w") as handle:
+        json.dump(metrics, handle, indent=2, sort_keys=True)
+        handle.write("\n")
+
+def compare(metrics, baseline, factor, floor=0.0):
+    """Liste der Regressionen als (metrik, wert, grenze); fehlende Baselines werden übersprungen."""
+    regressions = []
+    for key, value in metrics.items():
+        if key not in baseline:
+            continue
+        limit = max(baseline[key] * factor, floor)
+        if not value <= limit:  # NaN zählt ebenfalls als Regression
+            regressions.append((key, value, limit))
+    return regressions
+
+def report(metrics, baseline, regressions, unit=""):
+    """Gibt eine Tabelle aus Messwert, Baseline und Status aus."""
+    failed = {key for key, _, _ in regressions}
+    width = max((len(key) for key in metrics), default=10)
+    for key, value in metrics.items():
+        ref = baseline.get(key)
+        ref_text = f"{ref:.3e}" if ref is not None else "-"
+        status = "REGRESSION" if key in failed else ("neu" if ref is None else "ok")
+        print(f"{key:<{width}}  {value:.3e}{unit}  (Baseline {ref_text})  {status}")
@@ -0,0 +1,215 @@
+"""Genauigkeits-Regression aller schnellen Pfade gegen eine hochgenaue quad-Referenz.
+
+Referenz sind die ursprünglichen skalaren Integranden mit scipy.integrate.quad
+(epsabs=0, epsrel=1e-13) auf einem Gitter von z = 1e-5 bis 1100 und mehreren
+(Ωm, ΩΛ), flach und nicht flach. Für jeden Pfad wird der maximale relative
+Fehler bestimmt und mit ``baselines/accuracy.json`` verglichen.
+
+Aufruf:  python benchmarks/bench_accuracy.py [--factor 4] [--update-baseline]
+"""
+import argparse
+import json
+import math
+import sys
+from fractions import Fraction
+
+import numpy as np
+
+from _baseline import compare, load_baseline, report, save_baseline
+
+from redshift_core import (FLAG_OK, CosmologyGrid, W0WaCDM, age_integral, analytic_flat_integrals,
+                           calculate_lcdm_distances, calculate_lcdm_distances_batch,
+                           calculate_lcdm_quantities,
+                           convert_km_to_au, convert_km_to_ls, convert_km_to_ly,
+                           convert_mpc_to_gly, convert_mpc_to_km, cumulative_lcdm_integrals,
+                           convert_columns, format_large_number, format_large_numbers,
+                           get_cosmology_table, is_flat,
+                           redshift_from_comoving_distance, redshift_from_lookback_time)
+from redshift_core.constants import (C_KM_PER_S, HUBBLE_TIME_GYR_KM_S_MPC, KM_PER_AU, KM_PER_LS,
+                                     KM_PER_LY, KM_PER_MPC)
+from redshift_core.integrands import hubble_parameter_inv_integrand, lookback_time_integrand
+
+BASELINE = "accuracy"
+Z_MIN, Z_MAX, Z_POINTS = 1e-5, 1100.0, 60
+OMEGA_M_GRID = (0.0, 0.05, 0.3, 0.5, 1.0)
+OMEGA_LAMBDA_GRID = (0.0, 0.7, 1.0)
+H0 = 70.0
+QUAD_EPSREL = 1e-13
+ERROR_FLOOR = 1e-14  # darunter liegt die Genauigkeit der Referenz selbst
+# Erweiterte Modelle: (Name, Ωm, ΩΛ, Ωr, w0, wa), jeweils mit Krümmung Ωk = 1 - Ωm - ΩΛ - Ωr
+MODELS = (("open", 0.3, 0.6, 0.0, -1.0, 0.0), ("closed", 0.3, 0.8, 0.0, -1.0, 0.0),
+          ("w0wa", 0.3, 0.65, 9e-5, -0.9, 0.2))
+
+def redshift_grid():
+    return np.concatenate((np.geomspace(Z_MIN, Z_MAX, Z_POINTS), [0.1, 0.5, 1.0, 2.0, 10.0]))
+
+def cosmology_grid():
+    """(Ωm, ΩΛ)-Gitter plus die flachen Gegenstücke 1 - Ωm; ohne das leere Universum."""
+    grid = set()
+    for om in OMEGA_M_GRID:
+        for ol in OMEGA_LAMBDA_GRID + (1.0 - om,):
+            if om + ol > 0:
+                grid.add((om, round(ol, 12)))
+    return sorted(grid)
+
+def reference_integrals(z, omega_m, omega_lambda):
+    """∫dz/E und ∫dz/((1+z)E) mit quad, pro z einzeln (unabhängig von den schnellen Pfaden)."""
+    from scipy.integrate import quad
+    opts = dict(args=(omega_m, omega_lambda), epsabs=0.0, epsrel=QUAD_EPSREL, limit=500)
+    dc = np.array([quad(hubble_parameter_inv_integrand, 0, zi, **opts)[0] for zi in z])
+    lt = np.array([quad(lookback_time_integrand, 0, zi, **opts)[0] for zi in z])
+    return dc, lt
+
+def max_rel_error(values, reference):
+    values = np.asarray(values, dtype=np.float64)
+    reference = np.asarray(reference, dtype=np.float64)
+    return float(np.max(np.abs(values / reference - 1.0)))
+
+def measure_distances(grid=None):
+    """Maximaler relativer Fehler pro Pfad über alle z und Kosmologien."""
+    z = redshift_grid()
+    z_sorted = np.sort(z)
+    dh, th = C_KM_PER_S / H0, HUBBLE_TIME_GYR_KM_S_MPC / H0
+    errors = {}
+    def record(key, value):
+        errors[key] = max(errors.get(key, 0.0), value)
+
+    for om, ol in cosmology_grid():
+        ref_dc, ref_lt = reference_integrals(z, om, ol)
+
+        scalar = [calculate_lcdm_distances(float(zi), H0, om, ol) for zi in z]
+        record("scalar.comoving", max_rel_error([r['comoving_mpc'] for r in scalar], dh * ref_dc))
+        record("scalar.lookback", max_rel_error([r['lookback_gyr'] for r in scalar], th * ref_lt))
+
+        batch = calculate_lcdm_distances_batch(z, H0, om, ol)
+        record("batch.comoving", max_rel_error(batch['comoving_mpc'], dh * ref_dc))
+        record("batch.lookback", max_rel_error(batch['lookback_gyr'], th * ref_lt))
+        record("batch.flagged", float(np.count_nonzero(batch['flags'] != FLAG_OK)))
+
+        order = np.argsort(z)
+        dc, lt, _, _ = cumulative_lcdm_integrals(z_sorted, om, ol)
+        record("cumulative.comoving", max_rel_error(dc, ref_dc[order]))
+        record("cumulative.lookback", max_rel_error(lt, ref_lt[order]))
+
+        dc, lt = get_cosmology_table(om, ol).integrals(z)
+        record("table.comoving", max_rel_error(dc, ref_dc))
+        record("table.lookback", max_rel_error(lt, ref_lt))
+
+        if grid is not None and grid.contains(om, ol):
+            dc, lt = grid.table(om, ol).integrals(z)
+            record("grid.comoving", max_rel_error(dc, ref_dc))
+            record("grid.lookback", max_rel_error(lt, ref_lt))
+
+        if is_flat(om, ol):
+            dc, lt = analytic_flat_integrals(z, om, ol)
+            record("analytic.comoving", max_rel_error(dc, ref_dc))
+            record("analytic.lookback", max_rel_error(lt, ref_lt))
+
+        # Rundreise z -> Distanz/Zeit (Referenz) -> z
+        inv = redshift_from_comoving_distance(dh * ref_dc, H0, om, ol)
+        record("inverse.comoving", max_rel_error(inv['redshift'], z))
+        inv = redshift_from_lookback_time(th * ref_lt, H0, om, ol)
+        record("inverse.lookback", max_rel_error(inv['redshift'], z))
+
+        if om > 0:
+            from scipy.integrate import quad
+            ref_age = quad(lookback_time_integrand, 0, math.inf, args=(om, ol), epsabs=0.0,
+                           epsrel=QUAD_EPSREL, limit=500)[0]
+            record("derived.age", abs(age_integral(om, ol) / ref_age - 1.0))
+    return errors
+
+def measure_models():
+    """Krümmung, Strahlung und w0/wa gegen quad mit dem ausgeschriebenen E(z) und sinh/sin."""
+    from scipy.integrate import quad
+    z = redshift_grid()
+    dh, th = C_KM_PER_S / H0, HUBBLE_TIME_GYR_KM_S_MPC / H0
+    errors = {}
+    def record(key, value):
+        errors[key] = max(errors.get(key, 0.0), value)
+
+    for name, om, ol, orad, w0, wa in MODELS:
+        ok = 1.0 - om - ol - orad
+        def e_of_z(zi):
+            return math.sqrt(orad * (1 + zi)**4 + om * (1 + zi)**3 + ok * (1 + zi)**2
+                             + ol * (1 + zi)**(3 * (1 + w0 + wa)) * math.exp(-3 * wa * zi / (1 + zi)))
+        opts = dict(epsabs=0.0, epsrel=QUAD_EPSREL, limit=500)
+        ref_dc = np.array([quad(lambda x: 1 / e_of_z(x), 0, zi, **opts)[0] for zi in z])
+        ref_lt = np.array([quad(lambda x: 1 / ((1 + x) * e_of_z(x)), 0, zi, **opts)[0] for zi in z])
+        root = math.sqrt(abs(ok))
+        ref_dm = np.sinh(root * ref_dc) / root if ok > 0 else np.sin(root * ref_dc) / root
+        params = dict(omega_r=orad, w0=w0, wa=wa, curvature=True)
+
+        for path, use_table in (("batch", False), ("table", True)):
+            batch = calculate_lcdm_quantities(z, H0, om, ol, outputs=("comoving_mpc", "luminosity_mpc", "lookback_gyr"),
+                                              use_table=use_table, **params)
+            record(f"model.{path}.comoving", max_rel_error(batch['comoving_mpc'], dh * ref_dc))
+            record(f"model.{path}.luminosity", max_rel_error(batch['luminosity_mpc'], dh * ref_dm * (1 + z)))
+            record(f"model.{path}.lookback", max_rel_error(batch['lookback_gyr'], th * ref_lt))
+        scalar = [calculate_lcdm_distances(float(zi), H0, om, ol, **params) for zi in z]
+        record("model.scalar.luminosity", max_rel_error([r['luminosity_mpc'] for r in scalar], dh * ref_dm * (1 + z)))
+        ref_age = quad(lambda x: 1 / ((1 + x) * e_of_z(x)), 0, math.inf, **opts)[0]
+        record("model.age", abs(W0WaCDM(om, ol, orad, w0, wa).age_integral() / ref_age - 1.0))
+    return errors
+
+def measure_units():
+    """Umrechnungen (skalar und spaltenweise in float64/float32) gegen exakte rationale Arithmetik,
+    Formatierung gegen ganzzahlige Rundung und Massenformatierung gegen die skalare."""
+    values = [1e-3, 0.5, 1.0, 67.4, 1951.386986, 4.2e3, 1.3e4, 1e6]
+    conversions = {
+        "units.mpc_to_km": (convert_mpc_to_km, lambda d: d * Fraction(KM_PER_MPC)),
+        "units.mpc_to_gly": (convert_mpc_to_gly, lambda d: d * Fraction(KM_PER_MPC) / (Fraction(KM_PER_LY) * 10**9)),
+        "units.km_to_ly": (convert_km_to_ly, lambda d: d / Fraction(KM_PER_LY)),
+        "units.km_to_au": (convert_km_to_au, lambda d: d / Fraction(KM_PER_AU)),
+        "units.km_to_ls": (convert_km_to_ls, lambda d: d / Fraction(KM_PER_LS)),
+    }
+    errors = {}
+    for key, (fn, exact) in conversions.items():
+        errors[key] = max(abs(float(Fraction(float(fn(v))) / exact(Fraction(v)) - 1)) for v in values)
+
+    from_mpc = {'mpc': lambda d: d, 'gly': conversions["units.mpc_to_gly"][1], 'km': conversions["units.mpc_to_km"][1],
+                'ly': lambda d: d * Fraction(KM_PER_MPC) / Fraction(KM_PER_LY),
+                'au': lambda d: d * Fraction(KM_PER_MPC) / Fraction(KM_PER_AU),
+                'ls': lambda d: d * Fraction(KM_PER_MPC) / Fraction(KM_PER_LS)}
+    for dtype in (np.float64, np.float32):
+        columns = convert_columns(values, tuple(from_mpc), dtype)
+        errors[f"units.columns_{np.dtype(dtype).name}"] = max(
+            abs(float(Fraction(float(c)) / from_mpc[unit](Fraction(v)) - 1)) for unit, column in columns.items()
+            for c, v in zip(column, values))
+
+    numbers = [v * KM_PER_MPC for v in values] + [1.0, 999.5, 1234567.0, -7654321.25]
+    mismatches = sum(format_large_number(n).replace(" ", "") != str(round(n)) for n in numbers)
+    errors["units.format_mismatches"] = float(mismatches)
+    rng = np.random.default_rng(3)
+    bulk = np.concatenate([numbers, 10.0 ** rng.uniform(-3, 40, 10_000) * rng.choice([-1, 1], 10_000),
+                           [0.0, -0.0, -0.4, 2.5, 2.0**53 + 2, 1e308, np.nan, np.inf, -np.inf]])
+    errors["units.format_bulk_mismatches"] = float(sum(
+        text != format_large_number(n) for text, n in zip(format_large_numbers(bulk).tolist(), bulk)))
+    return errors
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--factor", type=float, default=4.0,
+                        help="Erlaubter Faktor gegenüber dem gespeicherten Fehler")
+    parser.add_argument("--update-baseline", action="store_true", help="Aktuelle Werte als Baseline speichern")
+    parser.add_argument("--json", action="store_true", help="Messwerte als JSON ausgeben")
+    parser.add_argument("--grid", default=None, help="Gitterdatei zusätzlich prüfen (grid.*)")
+    args = parser.parse_args(argv)
+
+    grid = CosmologyGrid(args.grid) if args.grid else None
+    metrics = {**measure_distances(grid), **measure_models(), **measure_units()}
+    if args.update_baseline:
+        save_baseline(BASELINE, metrics)
+        print(f"Baseline gespeichert ({len(metrics)} Metriken).")
+        return 0
+    baseline = load_baseline(BASELINE)
+    regressions = compare(metrics, baseline, args.factor, floor=ERROR_FLOOR)
+    if args.json:
+        print(json.dumps(metrics, indent=2))
+    else:
+        report(metrics, baseline, regressions)
+    for key, value, limit in regressions:
+        print(f"FEHLER: {key} = {value:.3e} > {limit:.3e}", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""Ergebniscache: Toleranz, Trefferquote, Grenzen und Teilen zwischen Prozessen.
+
+Prüft, dass gecachte Werte (berechnet mit auf ``digits`` Stellen gerundeten
+Eingaben) relativ höchstens VALUE_TOLERANCE von der Rechnung mit den exakten
+Eingaben abweichen, dass nahezu gleiche Eingaben Treffer sind, dass
+max_entries/max_bytes/TTL eingehalten werden und dass ein zweiter Prozess die
+Einträge einer SQLite-Datei sieht. Misst außerdem Treffer- und Fehlzugriffszeiten.
+
+Aufruf:  python benchmarks/bench_cache.py [--samples 1000]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import _baseline  # noqa: F401  (macht redshift_core importierbar)
+from redshift_core import DISTANCE_OUTPUTS, calculate_lcdm_distances
+from redshift_core.result_cache import VALUE_TOLERANCE, DiskStore, MemoryStore, ResultCache
+
+MIN_DUPLICATE_HIT_RATE = 0.99  # Fehlzugriffe nur, wo eine Rundungsgrenze zwischen beiden Eingaben liegt
+
+def random_inputs(samples, seed=0):
+    """(z, H0, Ωm, ΩΛ, Ωr, w0, wa, Krümmung) mit krummen Nachkommastellen."""
+    rng = np.random.default_rng(seed)
+    curved = rng.random(samples) < 0.5
+    return [(float(10.0 ** rng.uniform(-4, 3)), float(rng.uniform(50, 90)), float(rng.uniform(0.05, 0.6)),
+             float(rng.uniform(0.0, 1.0)), float(rng.uniform(0, 1e-4)) if c else 0.0,
+             float(rng.uniform(-1.2, -0.8)) if c else -1.0, float(rng.uniform(-0.3, 0.3)) if c else 0.0, bool(c))
+            for c in curved]
+
+def measure_tolerance(samples):
+    """Größte relative Abweichung gecachter von exakten Werten und Trefferquote nahezu gleicher Eingaben."""
+    cache = ResultCache(MemoryStore())
+    cached = cache.memoize(calculate_lcdm_distances)
+    worst = {name: 0.0 for name in DISTANCE_OUTPUTS}
+    duplicates = duplicate_hits = 0
+    for args in random_inputs(samples):
+        exact = calculate_lcdm_distances(*args)
+        if exact.get('error_msg'): continue
+        value = cached(*args)
+        for name in DISTANCE_OUTPUTS:
+            if exact[name] != 0:
+                worst[name] = max(worst[name], abs(value[name] / exact[name] - 1.0))
+        hits = cache.hits
+        cached(args[0] * (1 + 1e-12), *args[1:])  # nahezu gleiche Eingabe
+        duplicates, duplicate_hits = duplicates + 1, duplicate_hits + cache.hits - hits
+    return worst, duplicate_hits / max(duplicates, 1)
+
+def measure_latency(store, repeat=2000):
+    cache = ResultCache(store)
+    cached = cache.memoize(calculate_lcdm_distances)
+    start = time.perf_counter()
+    for i in range(repeat):
+        cached(0.001 * (i + 1), 70.0, 0.3, 0.7)
+    miss = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for i in range(repeat):
+        cached(0.001 * (i + 1), 70.0, 0.3, 0.7)
+    hit = (time.perf_counter() - start) / repeat
+    return {'miss_us': miss * 1e6, 'hit_us': hit * 1e6}
+
+def check_limits(store_factory):
+    """max_entries, max_bytes und TTL; gibt die Liste der Verstöße zurück."""
+    problems = []
+    cache = ResultCache(store_factory(max_entries=50, max_bytes=2**30, ttl=0))
+    for i in range(200): cache.get_or_compute('f', (i,), lambda i: i)
+    if len(cache) != 50 or cache.evictions != 150: problems.append(f"max_entries: {cache.stats()}")
+    cache = ResultCache(store_factory(max_entries=10**6, max_bytes=20_000, ttl=0))
+    for i in range(200): cache.get_or_compute('f', (i,), lambda i: bytes(1000))
+    if cache.usage()[1] > 20_000: problems.append(f"max_bytes: {cache.stats()}")
+    cache = ResultCache(store_factory(max_entries=10, max_bytes=2**30, ttl=0.2))
+    cache.get_or_compute('f', (1,), lambda i: i)
+    time.sleep(0.3)
+    cache.get_or_compute('f', (1,), lambda i: i)
+    if cache.expirations != 1 or cache.misses != 2: problems.append(f"ttl: {cache.stats()}")
+    return problems
+
+def _fill(path, count):
+    cache = ResultCache(DiskStore(path))
+    for i in range(count):
+        cache.get_or_compute('distances', (0.01 * (i + 1), 70.0, 0.3, 0.7), calculate_lcdm_distances)
+
+def check_sharing(directory, count=200):
+    """Ein Kindprozess füllt die Datei, dieser Prozess liest: Anteil der Treffer."""
+    path = os.path.join(directory, 'shared.sqlite')
+    child = multiprocessing.get_context('spawn').Process(target=_fill, args=(path, count))
+    child.start()
+    child.join()
+    cache = ResultCache(DiskStore(path))
+    for i in range(count):
+        cache.get_or_compute('distances', (0.01 * (i + 1), 70.0, 0.3, 0.7), calculate_lcdm_distances)
+    return cache.hits / count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    worst, duplicate_hit_rate = measure_tolerance(args.samples)
+    with tempfile.TemporaryDirectory() as directory:
+        disk = lambda **limits: DiskStore(os.path.join(directory, f"limits_{time.perf_counter_ns()}.sqlite"), **limits)
+        problems = check_limits(MemoryStore) + check_limits(disk)
+        shared_hit_rate = check_sharing(directory)
+        latency = {'memory': measure_latency(MemoryStore()),
+                   'disk': measure_latency(DiskStore(os.path.join(directory, 'latency.sqlite')))}
+    report = {'max_rel_deviation': worst, 'value_tolerance': VALUE_TOLERANCE,
+              'duplicate_hit_rate': duplicate_hit_rate, 'shared_hit_rate': shared_hit_rate, 'latency': latency,
+              'limit_problems': problems}
+    print(json.dumps(report, indent=2))
+
+    failures = [f"{name}: {value:.2e} > {VALUE_TOLERANCE:.0e}" for name, value in worst.items() if value > VALUE_TOLERANCE]
+    if duplicate_hit_rate < MIN_DUPLICATE_HIT_RATE:
+        failures.append(f"nahezu gleiche Eingaben nur zu {duplicate_hit_rate:.1%} Treffer")
+    if shared_hit_rate < 1.0: failures.append(f"zweiter Prozess nur zu {shared_hit_rate:.1%} Treffer")
+    failures += problems
+    for failure in failures:
+        print(f"FEHLER: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""Durchsatz und Latenz der Distanzberechnung (skalar, Batch, Cache, Parameter-Sweeps).
+
+Misst skalare Aufrufe über alle Pfade (analytisch, Tabelle warm/kalt, quad),
+Batches von 10 bis 10^7 Rotverschiebungen, H0- und Ωm-Sweeps sowie die
+Einheiten-Hilfsfunktionen (skalar und spaltenweise) sowie ein gekrümmtes Modell mit Strahlung und w0/wa. Alle Metriken sind Laufzeiten in Sekunden (Median
+über Wiederholungen) und werden mit ``baselines/speed.json`` verglichen.
+Die Baseline ist maschinenabhängig und sollte auf dem Referenzrechner mit
+``--update-baseline`` erzeugt werden.
+
+Aufruf:  python benchmarks/bench_distances.py [--max-size 10000000] [--factor 2] [--update-baseline]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from _baseline import compare, load_baseline, report, save_baseline
+
+from redshift_core import (DISTANCE_OUTPUTS, H0_DEFAULT, OMEGA_LAMBDA_DEFAULT, OMEGA_M_DEFAULT,
+                           TABLE_Z_MAX, calculate_lcdm_distances, calculate_lcdm_distances_batch,
+                           calculate_lcdm_quantities,
+                           UNIT_FACTORS, convert_columns, convert_mpc_to_gly, format_large_number,
+                           format_large_numbers, table_cache)
+
+BASELINE = "speed"
+NONFLAT = (0.3, 0.6)
+MODEL_PARAMS = dict(omega_r=9e-5, w0=-0.9, wa=0.2, curvature=True)
+BATCH_Z_MAX = 10.0
+SWEEP_POINTS = 50
+
+def timed(fn, repeat, setup=None):
+    """Median der Laufzeit von fn() in Sekunden; setup() läuft vor jeder Messung ungemessen."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def per_call(fn, calls, repeat):
+    """Mittlere Laufzeit eines Aufrufs, gemessen über ``calls`` Aufrufe pro Wiederholung."""
+    def loop():
+        for _ in range(calls):
+            fn()
+    return timed(loop, repeat) / calls
+
+def measure_scalar(repeat):
+    flat = (H0_DEFAULT, OMEGA_M_DEFAULT, OMEGA_LAMBDA_DEFAULT)
+    nonflat = (H0_DEFAULT,) + NONFLAT
+    calculate_lcdm_distances(0.5, *nonflat)  # Tabelle aufwärmen
+    return {
+        "scalar.analytic": per_call(lambda: calculate_lcdm_distances(0.5, *flat), 200, repeat),
+        "scalar.table_warm": per_call(lambda: calculate_lcdm_distances(0.5, *nonflat), 200, repeat),
+        "scalar.table_cold": timed(lambda: calculate_lcdm_distances(0.5, *nonflat), repeat,
+                                   setup=table_cache.clear),
+        "scalar.quad": per_call(lambda: calculate_lcdm_distances(2 * TABLE_Z_MAX, *nonflat), 5, repeat),
+    }
+
+def measure_grid(path, repeat):
+    """Kalte Tabelle aus dem gemappten Gitter statt Live-Integration."""
+    from redshift_core import load_grid, unload_grid
+    load_grid(path)
+    try:
+        return {"scalar.grid_cold": timed(lambda: calculate_lcdm_distances(0.5, H0_DEFAULT, *NONFLAT), repeat,
+                                          setup=table_cache.clear)}
+    finally:
+        unload_grid()
+
+def measure_batch(max_size, repeat):
+    rng = np.random.default_rng(0)
+    metrics = {}
+    size = 10
+    while size <= max_size:
+        z = rng.uniform(0.0, BATCH_Z_MAX, size)
+        reps = repeat if size < 1_000_000 else 1
+        for label, (om, ol) in (("flat", (OMEGA_M_DEFAULT, OMEGA_LAMBDA_DEFAULT)), ("nonflat", NONFLAT)):
+            metrics[f"batch.{label}.{size:.0e}"] = timed(
+                lambda: calculate_lcdm_distances_batch(z, H0_DEFAULT, om, ol), reps)
+        size *= 10
+    return metrics
+
+def measure_sweeps(repeat):
+    h0_values = np.linspace(50.0, 90.0, SWEEP_POINTS)
+    om_values = np.linspace(0.1, 0.5, SWEEP_POINTS)
+    z = np.random.default_rng(1).uniform(0.0, BATCH_Z_MAX, 1000)
+    def h0_sweep():  # gleiche Tabelle, nur H0 ändert sich
+        for h0 in h0_values:
+            calculate_lcdm_distances(1.0, float(h0), *NONFLAT)
+    def omega_m_sweep():  # jede Kosmologie baut ihre Tabelle neu
+        for om in om_values:
+            calculate_lcdm_distances(1.0, H0_DEFAULT, float(om), NONFLAT[1])
+    def omega_m_sweep_batch():
+        for om in om_values:
+            calculate_lcdm_distances_batch(z, H0_DEFAULT, float(om), NONFLAT[1])
+    calculate_lcdm_distances(1.0, H0_DEFAULT, *NONFLAT)
+    return {
+        "sweep.h0_scalar": timed(h0_sweep, repeat),
+        "sweep.omega_m_scalar_cold": timed(omega_m_sweep, repeat, setup=table_cache.clear),
+        "sweep.omega_m_batch_1e3": timed(omega_m_sweep_batch, repeat),
+    }
+
+def measure_models(repeat):
+    """Erweitertes Modell auf denselben schnellen Pfaden (Tabelle, kumulative Integration)."""
+    z = np.random.default_rng(2).uniform(0.0, BATCH_Z_MAX, 100_000)
+    calculate_lcdm_distances(0.5, H0_DEFAULT, *NONFLAT, **MODEL_PARAMS)  # Tabelle aufwärmen
+    return {
+        "model.scalar_table_warm": per_call(lambda: calculate_lcdm_distances(0.5, H0_DEFAULT, *NONFLAT, **MODEL_PARAMS),
+                                            200, repeat),
+        "model.batch.1e+05": timed(lambda: calculate_lcdm_quantities(z, H0_DEFAULT, *NONFLAT, outputs=DISTANCE_OUTPUTS,
+                                                                     **MODEL_PARAMS), repeat),
+    }
+
+def measure_units(repeat):
+    """Skalare Hilfsfunktionen je Aufruf, spaltenweise Umrechnung (alle Einheiten) und Massenformatierung je Block."""
+    mpc = np.random.default_rng(3).uniform(0.0, 1e4, 1_000_000)
+    km = mpc[:100_000] * UNIT_FACTORS['km']
+    return {
+        "units.convert_mpc_to_gly": per_call(lambda: convert_mpc_to_gly(1951.39), 10_000, repeat),
+        "units.format_large_number": per_call(lambda: format_large_number(6.02e22), 10_000, repeat),
+        "units.convert_columns.1e+06": timed(lambda: convert_columns(mpc, tuple(UNIT_FACTORS)), repeat),
+        "units.convert_columns_float32.1e+06": timed(lambda: convert_columns(mpc, tuple(UNIT_FACTORS), np.float32), repeat),
+        "units.format_large_numbers.1e+05": timed(lambda: format_large_numbers(km), repeat),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-size", type=int, default=10_000_000, help="Größter Batch (Zehnerpotenzen ab 10)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--factor", type=float, default=2.0,
+                        help="Erlaubter Faktor gegenüber der gespeicherten Laufzeit")
+    parser.add_argument("--update-baseline", action="store_true", help="Aktuelle Werte als Baseline speichern")
+    parser.add_argument("--json", action="store_true", help="Messwerte als JSON ausgeben")
+    parser.add_argument("--grid", default=None, help="Gitterdatei (python -m redshift_core.grid precompute)")
+    args = parser.parse_args(argv)
+
+    metrics = {**measure_scalar(args.repeat), **measure_batch(args.max_size, args.repeat),
+               **measure_sweeps(args.repeat), **measure_models(args.repeat), **measure_units(args.repeat)}
+    if args.grid:
+        metrics.update(measure_grid(args.grid, args.repeat))
+    if args.update_baseline:
+        save_baseline(BASELINE, metrics)
+        print(f"Baseline gespeichert ({len(metrics)} Metriken).")
+        return 0
+    baseline = load_baseline(BASELINE)
+    regressions = compare(metrics, baseline, args.factor)
+    if args.json:
+        print(json.dumps(metrics, indent=2))
+    else:
+        report(metrics, baseline, regressions, unit=" s")
+        for key, value in metrics.items():
+            if key.startswith("batch."):
+                size = float(key.rsplit(".", 1)[1])
+                print(f"{key:<24}  {size / value:,.0f} z/s")
+    for key, value, limit in regressions:
+        print(f"FEHLER: {key} = {value:.3e} s > {limit:.3e} s", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
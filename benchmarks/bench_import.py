@@ -0,0 +1,64 @@
+"""Import-Zeit des Rechenkerns (Startlatenz von Batch-Workern).
+
+Startet für jede Wiederholung einen frischen Interpreter, misst die Zeit für
+``import redshift_core`` und prüft, dass dabei weder scipy noch streamlit
+geladen werden.
+
+Aufruf:  python benchmarks/bench_import.py [--repeat 20] [--max-ms 500]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("scipy", "streamlit")
+
+_PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import {module}
+t1 = time.perf_counter()
+heavy = sorted({{m.split('.')[0] for m in sys.modules}} & set({heavy!r}))
+print(json.dumps({{'ms': (t1 - t0) * 1e3, 'heavy': heavy}}))
+"""
+
+def measure(module="redshift_core", repeat=20):
+    """Misst die Import-Zeit in ms in frischen Prozessen, gibt Dict mit Statistik zurück."""
+    code = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+    samples = []
+    heavy = set()
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True,
+                             capture_output=True, text=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        samples.append(result['ms'])
+        heavy.update(result['heavy'])
+    samples.sort()
+    return {'module': module, 'repeat': repeat,
+            'median_ms': statistics.median(samples),
+            'p90_ms': samples[min(len(samples) - 1, int(0.9 * len(samples)))],
+            'min_ms': samples[0], 'heavy_modules': sorted(heavy)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="redshift_core")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="Fehlschlag, wenn der Median diese Grenze überschreitet")
+    args = parser.parse_args(argv)
+
+    stats = measure(args.module, args.repeat)
+    print(json.dumps(stats, indent=2))
+    if stats['heavy_modules']:
+        print(f"FEHLER: beim Import geladen: {', '.join(stats['heavy_modules'])}", file=sys.stderr)
+        return 1
+    if args.max_ms is not None and stats['median_ms'] > args.max_ms:
+        print(f"FEHLER: Median {stats['median_ms']:.1f} ms > {args.max_ms:.1f} ms", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
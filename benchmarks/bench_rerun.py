@@ -0,0 +1,85 @@
+"""Rerun-Latenz der Streamlit-Seite beim Tippen ins z-Feld und beim Sprachwechsel.
+
+Spielt die Seite mit ``streamlit.testing`` (AppTest) ab und tippt Zahlen Ziffer
+für Ziffer ins z-Feld; jede Ziffer ist ein eigener Lauf der abhängigen
+Fragmente. Gemessen wird die Laufzeit der Fragmente in der Seite selbst
+(Instrumentierungsstufen ``fragment.*``), ohne den Übersetzungsaufwand von
+AppTest. Ein Sprachwechsel darf nichts neu berechnen.
+
+Aufruf:  python benchmarks/bench_rerun.py [--budget-ms 50]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+
+from _baseline import REPO_ROOT
+
+RERUN_BUDGET_MS = 50.0  # p95 eines Tipp-Laufs (Eingaben, Ergebnisse, Kurven)
+TYPED_VALUES = ["1.2345", "0.0567", "3.25", "0.8", "10.125", "2.75", "0.04321", "6.5"]
+
+def fragment_seconds(instrumentation):
+    """Summierte Laufzeit der Fragmente bisher; das Debug-Panel zählt nicht (ohne Instrumentierung leer)."""
+    return sum(o['sum'] for o in instrumentation.snapshot()['observations']
+               if o['name'] == 'stage_seconds' and o['labels']['stage'].startswith('fragment.')
+               and o['labels']['stage'] != 'fragment.debug')
+
+def cache_calls(instrumentation):
+    return instrumentation.snapshot()['caches'].get('results', {}).get('misses', 0)
+
+def run(at):
+    # AppTest vergleicht Radio-Werte mit den angezeigten Texten (format_func); der Lauf bleibt bei der
+    # ersten Option (Eingabe über Rotverschiebung)
+    for radio in at.sidebar.radio:
+        if radio.value not in radio.options: radio.set_value(radio.options[0])
+    at.run()
+    if at.exception: raise SystemExit(f"Seite wirft: {at.exception[0].value}")
+
+def measure():
+    from streamlit.testing.v1 import AppTest
+    from redshift_core import instrumentation
+    instrumentation.enable()
+    at = AppTest.from_file(os.path.join(REPO_ROOT, "Redshift_Calculator.py"), default_timeout=60)
+    at.run()
+
+    typing = []
+    for text in TYPED_VALUES:
+        for end in range(1, len(text) + 1):
+            if text[:end].endswith('.'): continue  # Zwischenstand ohne neuen Wert
+            at.sidebar.number_input(key='z_input').set_value(float(text[:end]))
+            before = fragment_seconds(instrumentation)
+            run(at)
+            typing.append((fragment_seconds(instrumentation) - before) * 1e3)
+
+    run(at)  # voller Lauf, danach Sprachwechsel
+    language = []
+    recomputed = 0
+    for lang in ['EN', 'FR', 'DE', 'EN']:
+        at.sidebar.selectbox(key='lang_selector').set_value(lang)
+        before, calls = fragment_seconds(instrumentation), cache_calls(instrumentation)
+        run(at)
+        language.append((fragment_seconds(instrumentation) - before) * 1e3)
+        recomputed += cache_calls(instrumentation) - calls
+    typing.sort()
+    return {'typing_runs': len(typing), 'typing_p50_ms': statistics.median(typing),
+            'typing_p95_ms': typing[min(len(typing) - 1, int(0.95 * len(typing)))], 'typing_max_ms': typing[-1],
+            'language_median_ms': statistics.median(language), 'language_recomputations': recomputed}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=RERUN_BUDGET_MS, help="Grenze für p95 eines Tipp-Laufs")
+    args = parser.parse_args(argv)
+
+    stats = measure()
+    print(json.dumps(stats, indent=2))
+    if stats['language_recomputations']:
+        print(f"FEHLER: Sprachwechsel rechnet neu ({stats['language_recomputations']} Aufrufe)", file=sys.stderr)
+        return 1
+    if stats['typing_p95_ms'] > args.budget_ms:
+        print(f"FEHLER: p95 {stats['typing_p95_ms']:.1f} ms > Budget {args.budget_ms:.1f} ms", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
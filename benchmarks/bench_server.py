@@ -0,0 +1,138 @@
+"""Lasttest des JSON-HTTP-Dienstes: Latenz (p50/p99) und Anfragen pro Sekunde.
+
+Startet den Dienst als Unterprozess (oder verwendet ``--url`` eines laufenden
+Dienstes) und schickt von ``--concurrency`` Keep-Alive-Verbindungen aus
+Einzelanfragen (bzw. Batches mit ``--batch-size``) für einige Kosmologien.
+Am Ende werden die Zähler des Dienstes ausgegeben, darunter wie viele Anfragen
+zusammengefasst wurden.
+
+Aufruf:  python benchmarks/bench_server.py [--concurrency 64] [--duration 10] [--cosmologies 4]
+"""
+import argparse
+import asyncio
+import json
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from _baseline import REPO_ROOT
+
+async def request(reader, writer, method, path, payload=None):
+    """Eine Anfrage auf einer Keep-Alive-Verbindung; gibt (Status, Body) zurück."""
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length': length = int(value)
+    return status, await reader.readexactly(length)
+
+async def client(host, port, deadline, cosmologies, batch_size, latencies, failures, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            h0, omega_m, omega_lambda = rng.choice(cosmologies)
+            if batch_size:
+                method, path = 'POST', '/v1/distances/batch'
+                z = [rng.uniform(0.0, 10.0) for _ in range(batch_size)]
+            else:
+                method, path = 'POST', '/v1/distances'
+                z = rng.uniform(0.0, 10.0)
+            payload = {'z': z, 'h0': h0, 'omega_m': omega_m, 'omega_lambda': omega_lambda}
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, method, path, payload)
+            latencies.append(time.perf_counter() - start)
+            if status != 200: failures.append(status)
+    finally:
+        writer.close()
+
+async def load(host, port, concurrency, duration, cosmologies, batch_size):
+    latencies, failures = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, start + duration, cosmologies, batch_size, latencies, failures, i)
+                           for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    reader, writer = await asyncio.open_connection(host, port)
+    _, stats = await request(reader, writer, 'GET', '/stats')
+    writer.close()
+    return latencies, failures, elapsed, json.loads(stats)
+
+def start_server(workers, coalesce_ms):
+    """Startet den Dienst auf einem freien Port; gibt (Prozess, Port) zurück."""
+    command = [sys.executable, '-m', 'redshift_core.server', '--port', '0', '--coalesce-ms', str(coalesce_ms)]
+    if workers: command += ['--workers', str(workers)]
+    process = subprocess.Popen(command, cwd=REPO_ROOT, stderr=subprocess.PIPE, text=True)
+    line = process.stderr.readline()  # "Lauscht auf http://host:port (...)"
+    if not line.startswith("Lauscht auf"):
+        process.kill()
+        raise SystemExit(f"Dienst startet nicht: {line}{process.stderr.read()}")
+    return process, int(line.split(':')[2].split()[0])
+
+def stop_server(process, timeout=30.0):
+    """SIGINT und warten, bis der Dienst seine Worker heruntergefahren hat; False, wenn hart beendet werden musste."""
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        return False
+    return True
+
+def percentile(values, q):
+    return statistics.quantiles(values, n=1000, method='inclusive')[int(q * 10) - 1] if len(values) > 1 else values[0]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="Laufender Dienst, z. B. http://127.0.0.1:8750")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0, help="Sekunden")
+    parser.add_argument("--cosmologies", type=int, default=4, help="Anzahl verschiedener (H0, Ωm, ΩΛ)")
+    parser.add_argument("--batch-size", type=int, default=0, help="0 = Einzelanfragen")
+    parser.add_argument("--workers", type=int, default=None, help="Worker des gestarteten Dienstes")
+    parser.add_argument("--coalesce-ms", type=float, default=1.0)
+    parser.add_argument("--max-p99", type=float, default=None, help="Fehlschlag, wenn p99 (ms) darüber liegt")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    cosmologies = [(70.0, 0.3, 0.7)] + [(round(rng.uniform(60, 80), 2), round(rng.uniform(0.1, 0.5), 3),
+                                         round(rng.uniform(0.4, 0.9), 3)) for _ in range(args.cosmologies - 1)]
+    process, clean_shutdown = None, True
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port
+    else:
+        process, port = start_server(args.workers, args.coalesce_ms)
+        host = '127.0.0.1'
+    try:
+        latencies, failures, elapsed, stats = asyncio.run(
+            load(host, port, args.concurrency, args.duration, cosmologies, args.batch_size))
+    finally:
+        if process is not None:
+            clean_shutdown = stop_server(process)
+
+    p50, p99 = percentile(latencies, 50) * 1e3, percentile(latencies, 99) * 1e3
+    print(f"Anfragen: {len(latencies):,} in {elapsed:.1f} s ({len(latencies) / elapsed:,.0f} req/s"
+          + (f", {len(latencies) * args.batch_size / elapsed:,.0f} z/s" if args.batch_size else "") + ")")
+    print(f"Latenz:   p50 {p50:.2f} ms, p99 {p99:.2f} ms, max {max(latencies) * 1e3:.2f} ms")
+    print(f"Fehler:   {len(failures)}")
+    print(f"Dienst:   {stats['evaluations']:,} Auswertungen, {stats['coalesced_requests']:,} zusammengefasste "
+          f"Anfragen, max. {stats['max_requests_per_evaluation']} pro Auswertung")
+    if not clean_shutdown:
+        print("FEHLER: Dienst hat sich nicht geordnet beendet", file=sys.stderr)
+        return 1
+    if failures or (args.max_p99 is not None and p99 > args.max_p99):
+        print(f"FEHLER: {len(failures)} Fehler, p99 {p99:.2f} ms", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""Skalierung des parallelen Parameter-Sweeps mit der Anzahl der Prozesse.
+
+Misst Zellen/s (Ωm × ΩΛ × z, ohne H0-Broadcast) für 1, 2, 4, ... Prozesse bis
+zur Anzahl der Kerne und die Effizienz relativ zu linearer Skalierung.
+
+Aufruf:  python benchmarks/bench_sweep.py [--omega-points 120] [--z-points 1000]
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+import _baseline  # noqa: F401  (macht redshift_core importierbar)
+from redshift_core.sweep import run_sweep
+
+def measure(omega_points, z_points, max_workers):
+    omega_m = np.linspace(0.05, 0.6, omega_points)
+    omega_lambda = np.linspace(0.4, 1.0, omega_points)
+    z = np.linspace(0.0, 10.0, z_points)
+    counts = sorted({2 ** k for k in range(max_workers.bit_length()) if 2 ** k <= max_workers} | {max_workers})
+    results = []
+    for workers in counts:
+        stats = run_sweep([70.0], omega_m, omega_lambda, z, workers=workers, progress=False).stats
+        results.append({'workers': workers, 'cells_per_s': stats['cells_per_s'], 'seconds': stats['seconds']})
+    base = results[0]['cells_per_s']
+    for entry in results:
+        entry['efficiency'] = entry['cells_per_s'] / (base * entry['workers'])
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--omega-points", type=int, default=120)
+    parser.add_argument("--z-points", type=int, default=1000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--min-efficiency", type=float, default=None,
+                        help="Fehlschlag, wenn die Effizienz bei maximaler Prozesszahl darunter liegt")
+    args = parser.parse_args(argv)
+
+    results = measure(args.omega_points, args.z_points, args.max_workers)
+    print(json.dumps(results, indent=2))
+    if args.min_efficiency is not None and results[-1]['efficiency'] < args.min_efficiency:
+        print(f"FEHLER: Effizienz {results[-1]['efficiency']:.2f} < {args.min_efficiency:.2f}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""Rechenkern des Advanced Redshift Calculator (ohne Streamlit).
+
+Nur numpy wird beim Import geladen; scipy wird erst bei Bedarf importiert.
+"""
+from . import instrumentation
+from .comparisons import get_comoving_comparison, get_lookback_comparison
+from .constants import (C_KM_PER_S, GYR_PER_YR, H0_DEFAULT, HUBBLE_TIME_GYR_KM_S_MPC,
+                        KM_PER_AU, KM_PER_LS, KM_PER_LY, KM_PER_MPC,
+                        OMEGA_LAMBDA_DEFAULT, OMEGA_M_DEFAULT, OMEGA_R_DEFAULT, W0_DEFAULT,
+                        WA_DEFAULT)
+from .curves import compute_distance_curves, downsample_curve
+from .distances import (DERIVED_OUTPUTS, DISTANCE_OUTPUTS, FLAG_AMBIGUOUS, FLAG_BLUESHIFT, FLAG_INTEGRATION,
+                        FLAG_INVALID, FLAG_OK, INTEGRATION_WARNING_THRESHOLD, QUANTITY_OUTPUTS,
+                        calculate_lcdm_distances, calculate_lcdm_distances_batch,
+                        calculate_lcdm_quantities)
+from .grid import (CosmologyGrid, GridError, active_grid, load_grid, precompute_grid,
+                   unload_grid)
+from .integrands import hubble_parameter_inv_integrand, lookback_time_integrand
+from .inverse import (redshift_from_comoving_distance, redshift_from_lookback_time,
+                      redshift_from_luminosity_distance)
+from .integration import (FLAT_TOLERANCE, age_integral, age_integral_of, analytic_flat_integrals,
+                          cumulative_integrals, cumulative_integrals_for_parameters,
+                          cumulative_integrals_for_sets, cumulative_lcdm_integrals, is_flat)
+from .models import ExpansionModel, LambdaCDM, W0WaCDM, cosmology_model
+from .tables import (TABLE_CACHE_SIZE, TABLE_INTERVALS, TABLE_Z_MAX, CosmologyTable,
+                     CosmologyTableCache, dimensionless_integrals, get_cosmology_table,
+                     get_model_table, model_integrals, table_cache)
+from .uncertainty import (propagate_uncertainty, propagate_uncertainty_gaussian,
+                          sample_cosmology)
+from .units import (UNIT_FACTORS, convert_columns, convert_km_to_au, convert_km_to_ly, convert_km_to_ls,
+                    convert_mpc_to_gly, convert_mpc_to_km, format_large_number, format_large_numbers)
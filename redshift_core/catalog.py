@@ -0,0 +1,234 @@
+"""Streaming-Verarbeitung von Katalogen (CSV/Parquet) in festen Blöcken.
+
+Liest eine Rotverschiebungsspalte blockweise, berechnet die Distanzen (und auf
+Wunsch abgeleitete Größen) pro Block mit calculate_lcdm_quantities (optional in einem Prozesspool) und schreibt
+die Blöcke in Eingabereihenfolge wieder heraus. Es sind nie mehr als
+``workers * 2`` Blöcke gleichzeitig im Speicher.
+
+Aufruf:  python -m redshift_core.catalog katalog.csv -o ergebnis.csv --z-column z
+"""
+import argparse
+import csv
+import itertools
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .constants import H0_DEFAULT, OMEGA_LAMBDA_DEFAULT, OMEGA_M_DEFAULT
+from .distances import DERIVED_OUTPUTS, DISTANCE_OUTPUTS, calculate_lcdm_quantities
+from .export import ExportError, _import_pyarrow, distance_table, write_csv
+from .units import UNIT_FACTORS
+
+DEFAULT_CHUNK_SIZE = 100_000
+DTYPES = {'float64': np.float64, 'float32': np.float32}
+
+class CatalogError(Exception):
+    """Fehler beim Lesen oder Verarbeiten eines Katalogs."""
+
+def compute_chunk(z, h0, omega_m, omega_lambda, units=('mpc',), derived=(), dtype='float64'):
+    """Berechnet die Ausgabespalten für einen Block von Rotverschiebungen (Einheitenspalten im dtype)."""
+    results = calculate_lcdm_quantities(z, h0, omega_m, omega_lambda, outputs=DISTANCE_OUTPUTS + tuple(derived))
+    if results.get('error_msg'):
+        raise CatalogError(results['error_msg'])
+    return distance_table(results, units, DTYPES[dtype], derived=derived)
+
+# --- Lesen/Schreiben ---
+def _is_parquet(path):
+    return path.lower().endswith(('.parquet', '.pq'))
+
+def _parse_float(value):
+    try: return float(value)
+    except (TypeError, ValueError): return np.nan
+
+def _coerce_float(values):
+    """Spalte als float64; nicht lesbare Einträge (Text, leer, null) werden wie beim CSV-Lesen NaN (FLAG_INVALID)."""
+    try: return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError): return np.array([_parse_float(v) for v in values], dtype=np.float64)
+
+def iter_csv_chunks(path, z_column, chunk_size):
+    """Liefert (Header, Zeilen, z-Array) pro Block einer CSV-Datei."""
+    with open(path, newline='') as handle:
+        reader = csv.reader(handle)
+        header = next(reader, None)
+        if header is None:
+            return
+        if z_column not in header:
+            raise CatalogError(f"Spalte '{z_column}' nicht gefunden.")
+        z_idx = header.index(z_column)
+        def z_of(rows): return np.array([_parse_float(r[z_idx]) if len(r) > z_idx else np.nan for r in rows])
+        rows = []
+        for row in reader:
+            rows.append(row)
+            if len(rows) == chunk_size:
+                yield header, rows, z_of(rows)
+                rows = []
+        if rows:
+            yield header, rows, z_of(rows)
+
+def iter_parquet_chunks(path, z_column, chunk_size):
+    """Liefert (Schema, RecordBatch, z-Array) pro Block einer Parquet-Datei."""
+    _, pq = _import_pyarrow()
+    parquet_file = pq.ParquetFile(path)
+    if z_column not in parquet_file.schema_arrow.names:
+        raise CatalogError(f"Spalte '{z_column}' nicht gefunden.")
+    for batch in parquet_file.iter_batches(batch_size=chunk_size):
+        z = _coerce_float(batch.column(z_column).to_numpy(zero_copy_only=False))
+        yield parquet_file.schema_arrow, batch, z
+
+def _input_columns(header, rows):
+    """Eingabespalten eines Blocks: Arrow-Arrays (Parquet) oder Text-Arrays (CSV, kurze Zeilen mit '' aufgefüllt)."""
+    if hasattr(rows, 'schema'):
+        return dict(zip(rows.schema.names, rows.columns))
+    columns = list(itertools.zip_longest(*rows, fillvalue='')) if rows else [() for _ in header]
+    if len(columns) > len(header):
+        raise CatalogError("CSV-Zeile mit mehr Feldern als die Kopfzeile.")
+    columns += [('',) * len(rows)] * (len(header) - len(columns))
+    return {name: np.array(col, dtype=str) for name, col in zip(header, columns)}
+
+def _check_output_names(input_names, columns):
+    """Ergebnisspalten dürfen keine Eingabespalte überschreiben (z.B. beim erneuten Verarbeiten einer Ausgabe)."""
+    clash = [name for name in columns if name in input_names]
+    if clash:
+        raise CatalogError(f"Ausgabespalte(n) bereits in der Eingabe: {', '.join(clash)}")
+
+class CsvSink:
+    """Schreibt Eingabe- und Ergebnisspalten blockweise über export.write_csv (spaltenweise, ohne Zeilenobjekte)."""
+
+    def __init__(self, path):
+        self._handle = sys.stdout.buffer if path == '-' else open(path, 'wb')
+        self._header_written = False
+
+    def write(self, header, rows, columns):
+        table = _input_columns(header, rows)
+        _check_output_names(table, columns)
+        write_csv({**table, **columns}, self._handle, header=not self._header_written)
+        self._header_written = True
+
+    def close(self):
+        if self._handle is sys.stdout.buffer: self._handle.flush()
+        else: self._handle.close()
+
+class ParquetSink:
+    def __init__(self, path, z_column='z'):
+        self._pa, self._pq = _import_pyarrow()
+        self._path = path
+        self._z_column = z_column
+        self._writer = None
+
+    def write(self, schema, batch, columns):
+        pa = self._pa
+        table_in = _input_columns(schema, batch)
+        _check_output_names(table_in, columns)
+        if not isinstance(batch, pa.RecordBatch):
+            # CSV-Eingabe: Eingabespalten als Text übernehmen (wie bei CsvSink aufgefüllt), nur z als float64
+            table_in = {name: pa.array(_coerce_float(col), pa.float64()) if name == self._z_column
+                        else pa.array(col, pa.string()) for name, col in table_in.items()}
+        arrays = list(table_in.values()) + [pa.array(col) for col in columns.values()]
+        table = pa.Table.from_arrays(arrays, names=list(table_in) + list(columns))
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+# --- Verarbeitung ---
+class _Progress:
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.rows = 0
+        self.start = time.perf_counter()
+
+    def update(self, rows):
+        self.rows += rows
+        if self.enabled:
+            elapsed = max(time.perf_counter() - self.start, 1e-9)
+            print(f"\r{self.rows:,} Zeilen, {self.rows / elapsed:,.0f} Zeilen/s", end='', file=sys.stderr)
+
+    def finish(self):
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        if self.enabled:
+            print(f"\rFertig: {self.rows:,} Zeilen in {elapsed:.2f} s ({self.rows / elapsed:,.0f} Zeilen/s)",
+                  file=sys.stderr)
+        return {'rows': self.rows, 'seconds': elapsed, 'rows_per_s': self.rows / elapsed}
+
+def process_catalog(input_path, output_path, z_column='z', h0=H0_DEFAULT, omega_m=OMEGA_M_DEFAULT,
+                    omega_lambda=OMEGA_LAMBDA_DEFAULT, units=('mpc', 'gly'),
+                    chunk_size=DEFAULT_CHUNK_SIZE, workers=None, progress=True, derived=(), dtype='float64'):
+    """Verarbeitet einen Katalog blockweise und schreibt die Ergebnisse in Reihenfolge.
+
+    Fehler: CatalogError; ExportError, wenn für Parquet pyarrow fehlt.
+    """
+    if dtype not in DTYPES:
+        raise CatalogError(f"Unbekannter dtype: {dtype}")
+    unknown = [u for u in units if u not in UNIT_FACTORS]
+    if unknown:
+        raise CatalogError(f"Unbekannte Einheit(en): {', '.join(unknown)}")
+    unknown = [d for d in derived if d not in DERIVED_OUTPUTS]
+    if unknown:
+        raise CatalogError(f"Unbekannte abgeleitete Größe(n): {', '.join(unknown)}")
+    workers = workers or os.cpu_count() or 1
+    chunks = (iter_parquet_chunks if _is_parquet(input_path) else iter_csv_chunks)(input_path, z_column, chunk_size)
+    sink = ParquetSink(output_path, z_column) if _is_parquet(output_path) else CsvSink(output_path)
+    tracker = _Progress(progress)
+    args = (h0, omega_m, omega_lambda, tuple(units), tuple(derived), dtype)
+    try:
+        if workers == 1:
+            for meta, rows, z in chunks:
+                sink.write(meta, rows, compute_chunk(z, *args))
+                tracker.update(len(z))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for meta, rows, z in chunks:
+                    pending.append((meta, rows, pool.submit(compute_chunk, z, *args)))
+                    # Begrenztes Fenster: höchstens 2 Blöcke pro Worker gleichzeitig
+                    while len(pending) >= 2 * workers:
+                        meta_done, rows_done, future = pending.popleft()
+                        sink.write(meta_done, rows_done, future.result())
+                        tracker.update(len(rows_done))
+                while pending:
+                    meta_done, rows_done, future = pending.popleft()
+                    sink.write(meta_done, rows_done, future.result())
+                    tracker.update(len(rows_done))
+    finally:
+        sink.close()
+    return tracker.finish()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distanzen und Rückblickzeit für große Kataloge (CSV/Parquet).")
+    parser.add_argument("input", help="Eingabedatei (.csv oder .parquet)")
+    parser.add_argument("-o", "--output", default='-', help="Ausgabedatei (.csv/.parquet, '-' = stdout als CSV)")
+    parser.add_argument("--z-column", default='z', help="Name der Rotverschiebungsspalte")
+    parser.add_argument("--h0", type=float, default=H0_DEFAULT)
+    parser.add_argument("--omega-m", type=float, default=OMEGA_M_DEFAULT)
+    parser.add_argument("--omega-lambda", type=float, default=OMEGA_LAMBDA_DEFAULT)
+    parser.add_argument("--units", default='mpc,gly',
+                        help=f"Einheitenspalten, kommagetrennt ({', '.join(UNIT_FACTORS)})")
+    parser.add_argument("--dtype", default='float64', choices=list(DTYPES),
+                        help="Genauigkeit der Ausgabespalten (float32 halbiert den Speicher)")
+    parser.add_argument("--derived", default='',
+                        help=f"Zusätzliche abgeleitete Spalten, kommagetrennt ({', '.join(DERIVED_OUTPUTS)})")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--quiet", action='store_true', help="Keine Fortschrittsanzeige")
+    args = parser.parse_args(argv)
+
+    units = tuple(u.strip().lower() for u in args.units.split(',') if u.strip())
+    derived = tuple(d.strip() for d in args.derived.split(',') if d.strip())
+    try:
+        process_catalog(args.input, args.output, z_column=args.z_column, h0=args.h0,
+                        omega_m=args.omega_m, omega_lambda=args.omega_lambda, units=units,
+                        chunk_size=args.chunk_size, workers=args.workers, progress=not args.quiet,
+                        derived=derived, dtype=args.dtype)
+    except (CatalogError, ExportError) as e:
+        parser.exit(2, f"Fehler: {e}\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
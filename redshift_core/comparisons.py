@@ -0,0 +1,19 @@
+# --- Vergleichsbeispiele (liefern Übersetzungsschlüssel) ---
+
+def get_lookback_comparison(gyr):
+    """Gibt einen Vergleich für die Rückblickzeit zurück (als Schlüssel)."""
+    if gyr < 0.001: return "example_lookback_recent"
+    if gyr < 0.05: return "example_lookback_humans"
+    if gyr < 0.3: return "example_lookback_dinos"
+    if gyr < 1.0: return "example_lookback_multicellular"
+    if gyr < 5.0: return "example_lookback_earth"
+    return "example_lookback_early_univ"
+
+def get_comoving_comparison(mpc):
+    """Gibt einen Vergleich für die mitbewegte Distanz zurück (als Schlüssel)."""
+    if mpc < 5: return "example_comoving_local"
+    if mpc < 50: return "example_comoving_virgo"
+    if mpc < 200: return "example_comoving_coma"
+    if mpc < 1000: return "example_comoving_lss"
+    if mpc < 8000: return "example_comoving_quasars"
+    return "example_comoving_cmb"
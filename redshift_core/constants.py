@@ -0,0 +1,18 @@
+# --- Konstanten ---
+C_KM_PER_S = 299792.458
+KM_PER_MPC = 3.085677581491367e+19
+KM_PER_AU = 1.495978707e+8
+KM_PER_LY = 9.4607304725808e+12
+KM_PER_LS = C_KM_PER_S
+GYR_PER_YR = 1e9
+HUBBLE_TIME_GYR_KM_S_MPC = 977.8  # 1/H0 in Gyr für H0 = 1 km/s/Mpc
+
+# --- Standard Kosmologische Parameter (Planck 2018) ---
+H0_DEFAULT = 67.4
+OMEGA_M_DEFAULT = 0.315
+OMEGA_LAMBDA_DEFAULT = 0.685
+
+# --- Erweiterte Modelle (Standard: einfaches ΛCDM) ---
+OMEGA_R_DEFAULT = 0.0
+W0_DEFAULT = -1.0
+WA_DEFAULT = 0.0
@@ -0,0 +1,62 @@
+# --- Kurven D_C, D_L, D_A und Rückblickzeit über 0 <= z <= z_max ---
+# Alle Kurven stammen aus einer einzigen kumulativen Integration auf dem z-Gitter.
+# Die dimensionslosen Kurven werden pro (z_max, E(z)-Modell, Punkte) gecacht; H0 skaliert
+# nur noch. Für die Anzeige werden sie adaptiv ausgedünnt.
+from functools import lru_cache
+
+import numpy as np
+
+from .constants import C_KM_PER_S, HUBBLE_TIME_GYR_KM_S_MPC, OMEGA_R_DEFAULT, W0_DEFAULT, WA_DEFAULT
+from .integration import cumulative_integrals
+from .models import check_model_parameters, cosmology_model
+
+CURVE_POINTS = 10_000
+CURVE_CACHE_SIZE = 16
+DISPLAY_POINTS = 600
+
+@lru_cache(maxsize=CURVE_CACHE_SIZE)
+def _dimensionless_curves(z_max, model, n_points):
+    z = np.linspace(0.0, z_max, n_points)
+    int_dc, int_lt, _, _ = cumulative_integrals(z, model.inv_e)
+    int_dm = np.array(model.transverse(int_dc), dtype=np.float64)
+    for arr in (z, int_dc, int_dm, int_lt):
+        arr.setflags(write=False)  # geteilt über den Cache
+    return z, int_dc, int_dm, int_lt
+
+def compute_distance_curves(z_max, h0, omega_m, omega_lambda, n_points=CURVE_POINTS, omega_r=OMEGA_R_DEFAULT,
+                            w0=W0_DEFAULT, wa=WA_DEFAULT, curvature=False):
+    """Alle vier Kurven auf einem gleichmäßigen z-Gitter, gibt Dict mit Arrays zurück."""
+    if not all(isinstance(v, (int, float)) for v in (z_max, h0, omega_m, omega_lambda)) or z_max <= 0:
+        return {'error_msg': "error_invalid_input"}
+    model_error = check_model_parameters(omega_r, w0, wa, curvature)
+    if model_error == "error_invalid_input": return {'error_msg': model_error}
+    if h0 <= 0: return {'error_msg': "error_h0_positive"}
+    if omega_m < 0 or omega_lambda < 0 or model_error: return {'error_msg': "error_omega_negative"}
+    model = cosmology_model(float(omega_m), float(omega_lambda), omega_r, w0, wa, curvature)
+    z, int_dc, int_dm, int_lt = _dimensionless_curves(float(z_max), model, max(int(n_points), 2))
+    dh = C_KM_PER_S / h0
+    return {'z': z, 'comoving_mpc': dh * int_dc, 'luminosity_mpc': dh * int_dm * (1 + z),
+            'ang_diam_mpc': dh * int_dm / (1 + z),
+            'lookback_gyr': (HUBBLE_TIME_GYR_KM_S_MPC / h0) * int_lt, 'error_msg': None}
+
+def downsample_curve(x, ys, max_points=DISPLAY_POINTS):
+    """Indizes für die Anzeige: gleichmäßig entlang der Bogenlänge (normiert).
+
+    Dort, wo sich eine der Kurven stark ändert, bleiben mehr Punkte erhalten;
+    erster und letzter Punkt sind immer enthalten.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if x.size <= max_points:
+        return np.arange(x.size)
+    def normalized(v):
+        v = np.asarray(v, dtype=np.float64)
+        span = np.nanmax(v) - np.nanmin(v)
+        return (v - np.nanmin(v)) / (span if span > 0 else 1.0)
+    dx = np.diff(normalized(x))
+    segment = np.zeros_like(dx)
+    for y in ys:
+        segment = np.maximum(segment, np.hypot(dx, np.diff(normalized(y))))
+    arc = np.concatenate(([0.0], np.cumsum(np.nan_to_num(segment))))
+    targets = np.linspace(0.0, arc[-1], max_points)
+    idx = np.searchsorted(arc, targets, side='left')
+    return np.unique(np.concatenate(([0], np.clip(idx, 0, x.size - 1), [x.size - 1])))
@@ -0,0 +1,211 @@
+# --- Distanzberechnung (skalar und vektorisiert) ---
+import math
+
+import numpy as np
+
+from . import instrumentation
+from .constants import (C_KM_PER_S, HUBBLE_TIME_GYR_KM_S_MPC, OMEGA_R_DEFAULT, W0_DEFAULT,
+                        WA_DEFAULT)
+from .integrands import hubble_parameter_inv_integrand, lookback_time_integrand
+from .integration import analytic_flat_integrals, cumulative_integrals, is_flat
+from .models import LambdaCDM, check_model_parameters, cosmology_model
+from .tables import TABLE_Z_MAX, get_model_table, model_integrals
+
+# Fehler-Flags pro Element (Bitmaske), ersetzen den skalaren "warn_integration_accuracy"
+FLAG_OK = 0
+FLAG_BLUESHIFT = 1  # z < 0: alle Ausgaben wie bei z = 0 (Distanzen 0, Alter heute, H0, Modul -inf)
+FLAG_INVALID = 2
+FLAG_INTEGRATION = 4
+FLAG_AMBIGUOUS = 8  # inverse Berechnung: mehrere Rotverschiebungen zum Wert (geschlossenes Modell)
+
+INTEGRATION_WARNING_THRESHOLD = 1e-5
+
+def _quad_integral(integrand, redshift, omega_m, omega_lambda):
+  """quad-Integration von 0 bis z; zählt mit Instrumentierung Auswertungen und Fehlerschätzung."""
+  from scipy.integrate import quad  # lazy: scipy erst bei Bedarf laden
+  if not instrumentation.enabled:
+    return quad(integrand, 0, redshift, args=(omega_m, omega_lambda), limit=100)
+  value, err, info = quad(integrand, 0, redshift, args=(omega_m, omega_lambda), limit=100, full_output=1)[:3]
+  instrumentation.count('integrand_evaluations', info['neval'], integrand=integrand.__name__, path='quad')
+  instrumentation.count('quad_calls', integrand=integrand.__name__)
+  instrumentation.observe('quad_abserr', err, integrand=integrand.__name__)
+  return value, err
+
+def _validate_scalar(redshift, h0, omega_m, omega_lambda, model_params):
+  """Eingabeprüfung; gibt ein fertiges Ergebnis-Dict zurück oder None, wenn gerechnet werden muss."""
+  if not isinstance(redshift, (int, float)) or \
+     not isinstance(h0, (int, float)) or \
+     not isinstance(omega_m, (int, float)) or \
+     not isinstance(omega_lambda, (int, float)):
+       return {'error_msg': "error_invalid_input"}
+  model_error = check_model_parameters(*model_params)
+  if model_error == "error_invalid_input": return {'error_msg': model_error}
+  if redshift < 0:
+     return {'comoving_mpc': 0.0, 'luminosity_mpc': 0.0, 'ang_diam_mpc': 0.0, 'lookback_gyr': 0.0, 'error_msg': "warn_blueshift"}
+  if math.isclose(redshift, 0):
+      return {'comoving_mpc': 0.0, 'luminosity_mpc': 0.0, 'ang_diam_mpc': 0.0, 'lookback_gyr': 0.0, 'error_msg': None}
+  if h0 <= 0: return {'error_msg': "error_h0_positive"}
+  if omega_m < 0 or omega_lambda < 0 or model_error: return {'error_msg': "error_omega_negative"}
+  return None
+
+def calculate_lcdm_distances(redshift, h0, omega_m, omega_lambda, omega_r=OMEGA_R_DEFAULT, w0=W0_DEFAULT,
+                             wa=WA_DEFAULT, curvature=False):
+  """Berechnet Distanzen & Zeit, gibt Dict zurück.
+
+  omega_r, w0, wa, curvature wählen das E(z)-Modell (siehe models.cosmology_model);
+  mit curvature gehen D_L und D_A von der transversalen Distanz (sinh/sin) aus.
+  """
+  with instrumentation.stage('validate'):
+    early_result = _validate_scalar(redshift, h0, omega_m, omega_lambda, (omega_r, w0, wa, curvature))
+  if early_result is not None: return early_result
+
+  dh = C_KM_PER_S / h0
+  model = cosmology_model(omega_m, omega_lambda, omega_r, w0, wa, curvature)
+  integrate_timer = instrumentation.start_stage('integrate')
+  try:
+    if isinstance(model, LambdaCDM) and is_flat(omega_m, omega_lambda):
+      # Geschlossene Form (flaches ΛCDM), kein Integrationsfehler
+      instrumentation.count('distance_calls', path='analytic')
+      integral_dc, integral_lt = (float(v) for v in analytic_flat_integrals(redshift, omega_m, omega_lambda))
+      err_dc = err_lt = 0.0
+    elif redshift <= TABLE_Z_MAX and redshift <= (table := get_model_table(model)).z_max:
+      # Dimensionslose Tabelle (H0-unabhängig, gecacht pro Modell); oberhalb ihres z_max (z. B. Gitter
+      # mit kleinerem --z-max) wird live integriert statt über den letzten Knoten hinaus extrapoliert
+      instrumentation.count('distance_calls', path='table')
+      integral_dc, integral_lt = (float(v) for v in table.integrals(redshift))
+      err_dc = err_lt = table.max_abs_error
+    elif isinstance(model, LambdaCDM):
+      instrumentation.count('distance_calls', path='quad')
+      integral_dc, err_dc = _quad_integral(hubble_parameter_inv_integrand, redshift, omega_m, omega_lambda)
+      integral_lt, err_lt = _quad_integral(lookback_time_integrand, redshift, omega_m, omega_lambda)
+    else:
+      instrumentation.count('distance_calls', path='gauss_legendre')
+      integral_dc, integral_lt, err_dc, err_lt = (float(v[0]) for v in cumulative_integrals([redshift], model.inv_e))
+    if not (math.isfinite(integral_dc) and math.isfinite(integral_lt)):
+      raise ValueError("E(z)² <= 0 zwischen 0 und z (kein Urknall in diesem Modell)")
+    comoving_distance_mpc = dh * integral_dc
+    transverse_distance_mpc = dh * float(model.transverse(integral_dc))
+    hubble_time_gyr = HUBBLE_TIME_GYR_KM_S_MPC / h0
+    lookback_time_gyr = hubble_time_gyr * integral_lt
+    luminosity_distance_mpc = transverse_distance_mpc * (1 + redshift)
+    angular_diameter_distance_mpc = transverse_distance_mpc / (1 + redshift)
+
+    warning_msg_key = None
+    warning_msg_args = {}
+    if err_dc > INTEGRATION_WARNING_THRESHOLD or err_lt > INTEGRATION_WARNING_THRESHOLD:
+       warning_msg_key = "warn_integration_accuracy"
+       warning_msg_args = {'err_dc': err_dc, 'err_lt': err_lt}
+
+    return {'comoving_mpc': comoving_distance_mpc, 'luminosity_mpc': luminosity_distance_mpc,
+            'ang_diam_mpc': angular_diameter_distance_mpc, 'lookback_gyr': lookback_time_gyr,
+            'error_msg': None, 'integration_warning_key': warning_msg_key, 'integration_warning_args': warning_msg_args}
+  except ImportError: return {'error_msg': "error_dep_scipy"}
+  except Exception as e:
+        return {'error_msg': "error_calc_failed", 'error_args': {'e': e}}
+  finally:
+    instrumentation.stop_stage(integrate_timer)
+
+# --- Vektorisierte Berechnung aller Größen in einem Integrationsdurchlauf ---
+DISTANCE_OUTPUTS = ('comoving_mpc', 'luminosity_mpc', 'ang_diam_mpc', 'lookback_gyr')
+DERIVED_OUTPUTS = ('distance_modulus_mag', 'kpc_per_arcsec', 'diff_comoving_volume_mpc3_sr',
+                   'comoving_volume_gpc3', 'age_gyr', 'hubble_km_s_mpc', 'transverse_comoving_mpc')
+QUANTITY_OUTPUTS = DISTANCE_OUTPUTS + DERIVED_OUTPUTS
+ARCSEC_PER_RAD = 180.0 / math.pi * 3600.0
+
+def calculate_lcdm_quantities(redshifts, h0, omega_m, omega_lambda, outputs=QUANTITY_OUTPUTS, use_table=False,
+                              omega_r=OMEGA_R_DEFAULT, w0=W0_DEFAULT, wa=WA_DEFAULT, curvature=False):
+    """Alle gewünschten Größen für ein Array von z aus einem Integrationsdurchlauf.
+
+    E(z) und die kumulativen Integrale werden einmal berechnet und von allen
+    Ausgaben geteilt; nicht angeforderte Größen werden übersprungen. Gibt ein
+    Dict mit Arrays (in Eingabereihenfolge) und Flags pro Element zurück.
+    Mit use_table=True werden nicht flache Kosmologien wie im skalaren Pfad aus
+    der gecachten Tabelle interpoliert (schneller für kleine Arrays).
+    omega_r, w0, wa, curvature wählen das E(z)-Modell wie bei calculate_lcdm_distances.
+    Zeilen mit z < 0 tragen FLAG_BLUESHIFT und werden in allen Ausgaben wie z = 0
+    behandelt (wie der skalare Pfad mit "warn_blueshift").
+    """
+    if not isinstance(h0, (int, float)) or \
+       not isinstance(omega_m, (int, float)) or \
+       not isinstance(omega_lambda, (int, float)):
+        return {'error_msg': "error_invalid_input"}
+    model_error = check_model_parameters(omega_r, w0, wa, curvature)
+    if model_error == "error_invalid_input": return {'error_msg': model_error}
+    if h0 <= 0: return {'error_msg': "error_h0_positive"}
+    if omega_m < 0 or omega_lambda < 0 or model_error: return {'error_msg': "error_omega_negative"}
+    outputs = tuple(outputs)
+    if any(name not in QUANTITY_OUTPUTS for name in outputs):
+        return {'error_msg': "error_invalid_input"}
+    try:
+        z = np.asarray(redshifts, dtype=np.float64).ravel()
+    except (TypeError, ValueError):
+        return {'error_msg': "error_invalid_input"}
+    model = cosmology_model(omega_m, omega_lambda, omega_r, w0, wa, curvature)
+
+    integrate_timer = instrumentation.start_stage('integrate')
+    flags = np.zeros(z.shape, dtype=np.uint8)
+    invalid = ~np.isfinite(z)
+    blueshift = ~invalid & (z < 0)
+    flags[invalid] |= FLAG_INVALID
+    flags[blueshift] |= FLAG_BLUESHIFT
+    positive = ~invalid & (z > 0)
+
+    int_dc = np.zeros(z.shape)
+    int_lt = np.zeros(z.shape)
+    if any(name != 'hubble_km_s_mpc' for name in outputs):
+        pos_idx = np.flatnonzero(positive)
+        if isinstance(model, LambdaCDM) and is_flat(omega_m, omega_lambda):
+            # Geschlossene Form braucht keine Sortierung
+            int_dc[pos_idx], int_lt[pos_idx] = analytic_flat_integrals(z[pos_idx], omega_m, omega_lambda)
+        elif use_table:
+            int_dc[pos_idx], int_lt[pos_idx] = model_integrals(z[pos_idx], model)
+            if get_model_table(model).max_abs_error > INTEGRATION_WARNING_THRESHOLD:
+                flags[pos_idx] |= FLAG_INTEGRATION
+        else:
+            order = pos_idx[np.argsort(z[pos_idx], kind='stable')]
+            dc_sorted, lt_sorted, err_dc, err_lt = cumulative_integrals(z[order], model.inv_e)
+            int_dc[order] = dc_sorted
+            int_lt[order] = lt_sorted
+            inaccurate = (err_dc > INTEGRATION_WARNING_THRESHOLD) | (err_lt > INTEGRATION_WARNING_THRESHOLD)
+            flags[order[inaccurate]] |= FLAG_INTEGRATION
+        # Modelle ohne Urknall (E² <= 0 zwischen 0 und z) liefern NaN
+        unphysical = positive & ~(np.isfinite(int_dc) & np.isfinite(int_lt))
+        flags[unphysical] |= FLAG_INVALID
+        invalid = invalid | unphysical
+    instrumentation.stop_stage(integrate_timer)
+
+    convert_timer = instrumentation.start_stage('convert')
+    dh = C_KM_PER_S / h0
+    th = HUBBLE_TIME_GYR_KM_S_MPC / h0
+    zp1 = np.where(positive, 1 + z, 1.0)
+    comoving_mpc = dh * int_dc
+    transverse_mpc = dh * model.transverse(int_dc)  # = comoving_mpc, solange Ωk = 0
+    results = {}
+    for name in outputs:
+        if name == 'comoving_mpc': value = comoving_mpc
+        elif name == 'luminosity_mpc': value = transverse_mpc * zp1
+        elif name == 'ang_diam_mpc': value = transverse_mpc / zp1
+        elif name == 'lookback_gyr': value = th * int_lt
+        elif name == 'distance_modulus_mag':
+            with np.errstate(divide='ignore'):
+                value = 5.0 * np.log10(transverse_mpc * zp1) + 25.0
+        elif name == 'kpc_per_arcsec': value = transverse_mpc / zp1 * 1e3 / ARCSEC_PER_RAD
+        elif name == 'diff_comoving_volume_mpc3_sr':
+            value = dh * transverse_mpc**2 * model.inv_e(zp1)
+        elif name == 'comoving_volume_gpc3': value = (dh * 1e-3)**3 * model.comoving_volume(transverse_mpc / dh)
+        elif name == 'age_gyr': value = th * (model.age_integral() - int_lt)
+        elif name == 'transverse_comoving_mpc': value = np.array(transverse_mpc, dtype=np.float64)
+        else: value = h0 / model.inv_e(zp1)
+        value[invalid] = np.nan
+        results[name] = value
+    results['flags'] = flags
+    results['error_msg'] = None
+    instrumentation.stop_stage(convert_timer)
+    return results
+
+def calculate_lcdm_distances_batch(redshifts, h0, omega_m, omega_lambda):
+    """Vektorisierte Variante von calculate_lcdm_distances für ein Array von z.
+
+    Gibt ein Dict mit Arrays (in Eingabereihenfolge) und Flags pro Element zurück.
+    """
+    return calculate_lcdm_quantities(redshifts, h0, omega_m, omega_lambda, outputs=DISTANCE_OUTPUTS)
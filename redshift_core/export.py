@@ -0,0 +1,126 @@
+"""Spaltenweise Ergebnistabellen und ihr Export nach Arrow, Parquet und CSV.
+
+Eine Tabelle ist ein Dict Spaltenname -> numpy-Array gleicher Länge.
+``distance_table`` baut sie aus den Ergebnissen von calculate_lcdm_quantities
+oder compute_distance_curves: umgerechnet werden nur die angefragten Einheiten
+(im gewählten dtype), ausgeschriebene Zahlen als Text nur für ``text_units``.
+Die Schreibfunktionen arbeiten auf ganzen Spalten (CSV in Blöcken von
+CSV_CHUNK_ROWS Zeilen), ohne Python-Objekte je Zeile; Spalten dürfen auch
+pyarrow-Arrays sein (z.B. aus einer Parquet-Eingabe). pyarrow wird nur für
+Arrow und Parquet benötigt.
+"""
+import io
+
+import numpy as np
+
+from .units import UNIT_FACTORS, convert_columns, format_large_numbers
+
+DISTANCE_COLUMNS = ('comoving', 'luminosity', 'ang_diam')
+TEXT_SUFFIX = '_text'
+CSV_CHUNK_ROWS = 65_536
+EXPORT_FORMATS = {  # Format -> (Dateiendung, MIME-Typ)
+    'csv': ('csv', 'text/csv'),
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('arrow', 'application/vnd.apache.arrow.file'),
+}
+
+class ExportError(Exception):
+    """Fehler beim Aufbau oder Schreiben einer Ergebnistabelle."""
+
+def distance_table(results, units=('mpc', 'gly'), dtype=np.float64, text_units=(), derived=()):
+    """Tabelle aus Ergebnis-Arrays: z (falls vorhanden), Distanzen je Einheit, Rückblickzeit, derived, flags.
+
+    Spalten heißen '<Distanz>_<Einheit>', ausgeschriebene Zahlen '<Distanz>_<Einheit>_text'.
+    """
+    unknown = [u for u in tuple(units) + tuple(text_units) if u not in UNIT_FACTORS]
+    if unknown: raise ExportError(f"Unbekannte Einheit(en): {', '.join(unknown)}")
+    table = {}
+    if 'z' in results: table['z'] = np.asarray(results['z']).astype(dtype, copy=False)
+    for name in DISTANCE_COLUMNS:
+        columns = convert_columns(results[f'{name}_mpc'], tuple(dict.fromkeys(tuple(units) + tuple(text_units))), dtype)
+        for unit in units:
+            table[f'{name}_{unit}'] = columns[unit]
+        for unit in text_units:
+            table[f'{name}_{unit}{TEXT_SUFFIX}'] = format_large_numbers(columns[unit])
+    table['lookback_gyr'] = np.asarray(results['lookback_gyr']).astype(dtype, copy=False)
+    for name in derived:
+        table[name] = np.asarray(results[name]).astype(dtype, copy=False)
+    if 'flags' in results: table['flags'] = results['flags']
+    return table
+
+# --- Arrow/Parquet ---
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ExportError("Für Arrow und Parquet wird 'pyarrow' benötigt (pip install pyarrow).") from e
+    return pa, pq
+
+def to_arrow(table):
+    """pyarrow.Table aus den Spalten (Zahlen ohne Kopie, Text direkt aus dem Unicode-Array, Arrow-Arrays unverändert)."""
+    pa, _ = _import_pyarrow()
+    return pa.table({name: pa.array(column) for name, column in table.items()})
+
+def write_parquet(table, target):
+    _, pq = _import_pyarrow()
+    pq.write_table(to_arrow(table), target)
+
+def write_arrow(table, target):
+    """Arrow-IPC-Datei (Feather v2)."""
+    pa, _ = _import_pyarrow()
+    arrow_table = to_arrow(table)
+    with pa.ipc.new_file(target, arrow_table.schema) as writer:
+        writer.write_table(arrow_table)
+
+# --- CSV ---
+def _csv_bytes(column):
+    """Spalte als Bytes-Matrix (Zeilen × Breite, mit Nullbytes aufgefüllt); Text in Anführungszeichen (UTF-8)."""
+    if column.dtype.kind == 'U':
+        quoted = np.strings.add(np.strings.add('"', np.strings.replace(column, '"', '""')), '"')
+        text = np.strings.encode(quoted, 'utf-8')
+    else:
+        text = column.astype(bytes)  # kürzeste Darstellung des dtype (float64 wie repr)
+    return text.view(np.uint8).reshape(len(text), text.dtype.itemsize)
+
+def _write_csv_numpy(table, handle, header=True):
+    """Ohne pyarrow: jeder Block von Zeilen entsteht als eine Bytes-Matrix, nicht Zeile für Zeile."""
+    if header:
+        handle.write((','.join('"{}"'.format(name.replace('"', '""')) for name in table) + '\n').encode('utf-8'))
+    rows = len(next(iter(table.values()))) if table else 0
+    for start in range(0, rows, CSV_CHUNK_ROWS):
+        parts = []
+        for column in table.values():
+            parts += [_csv_bytes(column[start:start + CSV_CHUNK_ROWS]), b',']
+        parts[-1] = b'\n'
+        n = len(parts[0])
+        matrix = np.concatenate([np.full((n, 1), p[0], dtype=np.uint8) if isinstance(p, bytes) else p for p in parts],
+                                axis=1)
+        handle.write(matrix.tobytes().replace(b'\0', b''))  # Auffüllung fällt in einem Schritt weg
+
+def write_csv(table, target, header=True):
+    """CSV (mit Kopfzeile, falls header); Zahlen in der kürzesten Darstellung, die beim Einlesen denselben Wert ergibt.
+
+    Mit pyarrow schreibt dessen CSV-Writer (deutlich schnellere Zahlenformatierung), sonst numpy blockweise.
+    """
+    try:
+        pa, _ = _import_pyarrow()
+        import pyarrow.csv as pa_csv
+    except (ExportError, ImportError):
+        pa_csv = None
+    handle = open(target, 'wb') if isinstance(target, str) else target
+    try:
+        if pa_csv is None: _write_csv_numpy(table, handle, header)
+        else: pa_csv.write_csv(to_arrow(table), handle,
+                               pa_csv.WriteOptions(include_header=header, quoting_style='needed'))
+    finally:
+        if handle is not target: handle.close()
+
+WRITERS = {'csv': write_csv, 'parquet': write_parquet, 'arrow': write_arrow}
+
+def export_table(table, fmt):
+    """Tabelle als Bytes im Format fmt (siehe EXPORT_FORMATS), z. B. für einen Download."""
+    if fmt not in WRITERS: raise ExportError(f"Unbekanntes Format: {fmt}")
+    buffer = io.BytesIO()
+    WRITERS[fmt](table, buffer)
+    return buffer.getvalue()
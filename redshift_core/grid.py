@@ -0,0 +1,230 @@
+"""Vorberechnetes, speichergemapptes Kosmologie-Gitter für einen schnellen Kaltstart.
+
+Die Integrale hängen von (Ωm, ΩΛ) nur über den Materieanteil f = Ωm/(Ωm+ΩΛ) und
+den Faktor (Ωm+ΩΛ)^(-1/2) ab, denn E(z)² = (Ωm+ΩΛ)·(f(1+z)³ + 1 - f). Die Datei
+enthält deshalb beide Integrale für Ωm+ΩΛ = 1 auf einem Gitter in ln f (gleichmäßig)
+und x = ln(1+z) (wie die CosmologyTable); die ganze (Ωm, ΩΛ)-Ebene wird verlustfrei
+auf diese eine Achse abgebildet. Zur Laufzeit wird die Datei nur gemappt (Seiten-
+Cache wird von allen Prozessen geteilt), pro Kosmologie werden 4 (kubisch) bzw. 2
+(linear) Zeilen in ln f interpoliert und als CosmologyTable in den LRU-Cache
+gelegt. Außerhalb des Gitters wird wie bisher live integriert.
+
+Dateiformat: Magic, Länge des JSON-Headers (uint32, little endian), Header (Achsen,
+Version, Modell, Fehlerschranke), Daten als float64 ab einem 64-Byte-Offset mit der
+Form (2, Punkte in ln f, Punkte in x).
+
+Aufruf:  python -m redshift_core.grid precompute -o cosmology_grid.rsg
+         python -m redshift_core.grid info cosmology_grid.rsg
+"""
+import argparse
+import json
+import math
+import os
+import struct
+import sys
+import time
+import warnings
+
+import numpy as np
+
+from .integration import cumulative_integrals_for_parameters
+from .tables import TABLE_INTERVALS, TABLE_Z_MAX, CosmologyTable, table_cache
+
+GRID_MAGIC = b"RSGRID\n"
+GRID_VERSION = 1
+GRID_MODEL = "lcdm"
+GRID_ALIGNMENT = 64
+GRID_FRACTION_MIN = 1e-3  # kleinster Materieanteil Ωm/(Ωm+ΩΛ) im Gitter
+GRID_FRACTION_POINTS = 320
+GRID_TOTAL_MIN = 1e-3  # darunter ist das Epsilon in E(z) nicht mehr vernachlässigbar
+GRID_BLOCK = 32  # Gitterzeilen pro Integrationsblock beim Vorberechnen
+GRID_METHODS = ('cubic', 'linear')
+
+class GridError(Exception):
+    """Fehlerhafte oder inkompatible Gitterdatei."""
+
+def _fraction_axis(fraction_min, points):
+    return np.linspace(math.log(fraction_min), 0.0, points)
+
+def _integrate_rows(log_fractions, z):
+    """Beide Integrale für Ωm+ΩΛ = 1 und die gegebenen ln f; Form (2, len(ln f), len(z) + 1)."""
+    fraction = np.exp(log_fractions)
+    dc, lt = cumulative_integrals_for_parameters(z, fraction, 1.0 - fraction)
+    zeros = np.zeros((fraction.size, 1))
+    return np.stack((np.hstack((zeros, dc)), np.hstack((zeros, lt))))
+
+def _stencil(position, points, method):
+    """Erster Index und Gewichte der Lagrange-Interpolation an einer Gitterposition (in Schritten)."""
+    if method == 'linear':
+        start = min(max(int(position), 0), points - 2)
+        t = position - start
+        return start, np.array([1.0 - t, t])
+    start = min(max(int(position) - 1, 0), points - 4)
+    t = position - start  # Knoten bei 0, 1, 2, 3
+    return start, np.array([-(t - 1) * (t - 2) * (t - 3) / 6, t * (t - 2) * (t - 3) / 2,
+                            -t * (t - 1) * (t - 3) / 2, t * (t - 1) * (t - 2) / 6])
+
+def _interpolate_nodes(data, log_fraction_min, fraction_step, omega_m, omega_lambda, method):
+    """Beide Integrale auf den x-Knoten, interpoliert in ln f (ln I ist dort glatter als I)."""
+    total = omega_m + omega_lambda
+    position = (math.log(omega_m / total) - log_fraction_min) / fraction_step
+    start, weights = _stencil(position, data.shape[1], method)
+    rows = data[:, start:start + weights.size, 1:]  # bei gemappten Daten werden nur diese Seiten gelesen
+    values = np.exp(np.einsum('k,ikn->in', weights, np.log(rows))) / math.sqrt(total)
+    return np.hstack((np.zeros((2, 1)), values))  # I(0) = 0
+
+class CosmologyGrid:
+    """Gemappte Gitterdatei; liefert CosmologyTable-Objekte ohne Integration."""
+
+    def __init__(self, path, method='cubic'):
+        if method not in GRID_METHODS:
+            raise GridError(f"Unbekannte Interpolation '{method}' ({', '.join(GRID_METHODS)})")
+        self.path = path
+        self.method = method
+        try:
+            self.header, offset = read_header(path)
+            shape = tuple(self.header['shape'])
+            self.data = np.memmap(path, dtype=np.dtype(self.header['dtype']), mode='r', offset=offset, shape=shape)
+        except (KeyError, TypeError, ValueError, struct.error) as e:  # abgeschnitten oder Header unlesbar
+            raise GridError(f"'{path}' ist beschädigt: {e}") from e
+        self.log_fraction_min = self.header['log_fraction_min']
+        self.fraction_min = math.exp(self.log_fraction_min)
+        self.fraction_step = -self.log_fraction_min / (shape[1] - 1)
+        self.z_max = self.header['z_max']
+        self.intervals = self.header['intervals']
+        self.max_rel_error = self.header['max_rel_error_by_method'][method]
+
+    def contains(self, omega_m, omega_lambda):
+        total = omega_m + omega_lambda
+        return total >= GRID_TOTAL_MIN and omega_m >= self.fraction_min * total
+
+    def integrals_on_nodes(self, omega_m, omega_lambda):
+        """Beide Integrale auf den x-Knoten für (Ωm, ΩΛ) innerhalb des Gitters."""
+        return _interpolate_nodes(self.data, self.log_fraction_min, self.fraction_step,
+                                  omega_m, omega_lambda, self.method)
+
+    def table(self, omega_m, omega_lambda):
+        int_dc, int_lt = self.integrals_on_nodes(omega_m, omega_lambda)
+        abs_error = self.max_rel_error * max(int_dc[-1], int_lt[-1])
+        return CosmologyTable(omega_m, omega_lambda, z_max=self.z_max, intervals=self.intervals,
+                              integrals=(int_dc, int_lt), error=(abs_error, self.max_rel_error))
+
+# --- Datei lesen/schreiben ---
+def read_header(path):
+    """Liest den JSON-Header, gibt (Header, Datenoffset) zurück."""
+    with open(path, 'rb') as handle:
+        if handle.read(len(GRID_MAGIC)) != GRID_MAGIC:
+            raise GridError(f"'{path}' ist keine Gitterdatei.")
+        (length,) = struct.unpack('<I', handle.read(4))
+        header = json.loads(handle.read(length).decode('utf-8'))
+    if header.get('version') != GRID_VERSION or header.get('model') != GRID_MODEL:
+        raise GridError(f"Gitterversion/-modell {header.get('version')}/{header.get('model')} wird nicht "
+                        f"unterstützt (erwartet {GRID_VERSION}/{GRID_MODEL}).")
+    return header, header['data_offset']
+
+def _write(path, header, data):
+    prefix = len(GRID_MAGIC) + 4
+    offset = 0
+    while True:  # der Offset steht selbst im Header; konvergiert nach wenigen Schritten
+        encoded = json.dumps(dict(header, data_offset=offset), sort_keys=True).encode('utf-8')
+        needed = -(-(prefix + len(encoded)) // GRID_ALIGNMENT) * GRID_ALIGNMENT
+        if needed == offset: break
+        offset = needed
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as handle:
+        handle.write(GRID_MAGIC + struct.pack('<I', offset - prefix) + encoded.ljust(offset - prefix))
+        handle.write(np.ascontiguousarray(data, dtype='<f8').tobytes())
+    os.replace(tmp_path, path)  # Leser sehen nie eine halb geschriebene Datei
+
+def precompute_grid(path, fraction_min=GRID_FRACTION_MIN, fraction_points=GRID_FRACTION_POINTS,
+                    z_max=TABLE_Z_MAX, intervals=TABLE_INTERVALS, progress=False):
+    """Berechnet das Gitter, misst den Interpolationsfehler und schreibt die Datei."""
+    start = time.perf_counter()
+    x = np.linspace(0.0, math.log1p(z_max), intervals + 1)
+    z = np.expm1(x[1:])
+    axis = _fraction_axis(fraction_min, fraction_points)
+    data = np.empty((2, fraction_points, intervals + 1))
+    for first in range(0, fraction_points, GRID_BLOCK):
+        block = slice(first, first + GRID_BLOCK)
+        data[:, block] = _integrate_rows(axis[block], z)
+        if progress:
+            print(f"\r{min(first + GRID_BLOCK, fraction_points)}/{fraction_points} Zeilen", end='', file=sys.stderr)
+
+    # Fehlerschranke: Intervallmitten in ln f (dort ist der Interpolationsfehler maximal)
+    step = -axis[0] / (fraction_points - 1)
+    midpoints = 0.5 * (axis[:-1] + axis[1:])
+    reference = _integrate_rows(midpoints, z)[:, :, 1:]
+    errors = {}
+    for method in GRID_METHODS:
+        worst = 0.0
+        for k, log_f in enumerate(midpoints):
+            fraction = math.exp(log_f)
+            values = _interpolate_nodes(data, axis[0], step, fraction, 1.0 - fraction, method)[:, 1:]
+            worst = max(worst, float(np.max(np.abs(values / reference[:, k] - 1.0))))
+        errors[method] = worst
+    # Dazu kommt der Fehler der Hermite-Interpolation in x (wie bei live gebauten Tabellen)
+    hermite_error = max(CosmologyTable(math.exp(log_f), 1.0 - math.exp(log_f), z_max=z_max, intervals=intervals,
+                                       integrals=(data[0, k], data[1, k])).max_rel_error
+                        for k, log_f in enumerate(axis))
+    errors = {method: worst + hermite_error for method, worst in errors.items()}
+    header = {'version': GRID_VERSION, 'model': GRID_MODEL, 'dtype': '<f8', 'shape': list(data.shape),
+              'log_fraction_min': float(axis[0]), 'z_max': float(z_max), 'intervals': int(intervals),
+              'max_rel_error_by_method': errors, 'created': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    _write(path, header, data)
+    if progress:
+        print(f"\rFertig in {time.perf_counter() - start:.1f} s, max. rel. Fehler {errors}", file=sys.stderr)
+    return header
+
+# --- Laufzeit ---
+def load_grid(path, method='cubic'):
+    """Verwendet die Gitterdatei für alle neuen Tabellen (auch in anderen Modulen)."""
+    grid = CosmologyGrid(path, method=method)
+    table_cache.grid = grid
+    return grid
+
+def unload_grid():
+    table_cache.grid = None
+
+def active_grid():
+    return table_cache.grid
+
+def _load_grid_from_environment():
+    """REDSHIFT_GRID beim Import; eine fehlende oder beschädigte Datei darf den Import nicht verhindern."""
+    path = os.environ.get("REDSHIFT_GRID")
+    if not path: return
+    try:
+        load_grid(path, method=os.environ.get("REDSHIFT_GRID_METHOD", 'cubic'))
+    except (GridError, OSError) as e:
+        warnings.warn(f"REDSHIFT_GRID nicht geladen, Tabellen werden live berechnet: {e}", RuntimeWarning)
+
+_load_grid_from_environment()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vorberechnetes Kosmologie-Gitter erzeugen oder anzeigen.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('precompute', help="Gitterdatei schreiben")
+    build.add_argument("-o", "--output", default='cosmology_grid.rsg')
+    build.add_argument("--fraction-min", type=float, default=GRID_FRACTION_MIN,
+                       help="Kleinster Materieanteil Ωm/(Ωm+ΩΛ)")
+    build.add_argument("--fraction-points", type=int, default=GRID_FRACTION_POINTS)
+    build.add_argument("--z-max", type=float, default=TABLE_Z_MAX)
+    build.add_argument("--intervals", type=int, default=TABLE_INTERVALS)
+    info = commands.add_parser('info', help="Header einer Gitterdatei ausgeben")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'precompute':
+            if not 0 < args.fraction_min < 1 or args.fraction_points < 4:
+                parser.error("--fraction-min muss in (0, 1) liegen und --fraction-points >= 4 sein.")
+            header = precompute_grid(args.output, args.fraction_min, args.fraction_points,
+                                     args.z_max, args.intervals, progress=True)
+        else:
+            header, _ = read_header(args.path)
+    except GridError as e:
+        parser.exit(2, f"Fehler: {e}\n")
+    print(json.dumps(header, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
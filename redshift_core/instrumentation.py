@@ -0,0 +1,144 @@
+"""Optionale Instrumentierung der heißen Pfade (standardmäßig aus).
+
+Erfasst Zähler (Integrand-Auswertungen, quad-Aufrufe), Beobachtungen (quad-
+Fehlerschätzungen), Laufzeiten pro Stufe (validate, integrate, convert, format,
+render) und die Statistik registrierter Caches. Im ausgeschalteten Zustand
+kostet jeder Messpunkt nur eine Abfrage von ``enabled``.
+
+Einschalten mit ``enable()`` oder der Umgebungsvariablen
+``REDSHIFT_INSTRUMENTATION=1``; Export mit ``to_json()`` bzw. ``to_prometheus()``.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+METRIC_PREFIX = "redshift"
+
+enabled = os.environ.get("REDSHIFT_INSTRUMENTATION", "").lower() in ("1", "true", "yes", "on")
+
+_lock = threading.Lock()
+_counters = {}  # (name, labels) -> Wert
+_observations = {}  # (name, labels) -> [Anzahl, Summe, Maximum]
+_caches = {}  # Name -> Objekt mit hits/misses/evictions
+_NOOP = nullcontext()
+
+def enable():
+    global enabled
+    enabled = True
+
+def disable():
+    global enabled
+    enabled = False
+
+def reset():
+    """Löscht alle Zähler und Beobachtungen (registrierte Caches bleiben bestehen)."""
+    with _lock:
+        _counters.clear()
+        _observations.clear()
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+def count(name, n=1, **labels):
+    """Erhöht einen Zähler um n."""
+    if not enabled: return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + n
+
+def observe(name, value, **labels):
+    """Zeichnet einen Messwert auf (Anzahl, Summe, Maximum)."""
+    if not enabled: return
+    key = _key(name, labels)
+    value = float(value)
+    with _lock:
+        entry = _observations.setdefault(key, [0, 0.0, float('-inf')])
+        entry[0] += 1
+        entry[1] += value
+        entry[2] = max(entry[2], value)
+
+class _StageTimer:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+        self.start = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        stop_stage(self)
+        return False
+
+def stage(name):
+    """Kontextmanager, der die Laufzeit einer Stufe misst (ohne Instrumentierung ein No-op)."""
+    if not enabled: return _NOOP
+    return _StageTimer(name)
+
+def start_stage(name):
+    """Wie stage(), für Abschnitte, die sich nicht in einen with-Block fassen lassen."""
+    return _StageTimer(name) if enabled else None
+
+def stop_stage(timer):
+    if timer is None: return
+    observe('stage_seconds', time.perf_counter() - timer.start, stage=timer.name)
+
+def register_cache(name, cache):
+    """Meldet einen Cache an; er muss hits, misses und evictions als Attribute haben."""
+    with _lock:
+        _caches[name] = cache
+
+# --- Export ---
+def snapshot():
+    """Aktueller Stand aller Metriken als JSON-fähiges Dict."""
+    with _lock:
+        counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(_counters.items())]
+        observations = [{'name': name, 'labels': dict(labels), 'count': entry[0], 'sum': entry[1], 'max': entry[2]}
+                        for (name, labels), entry in sorted(_observations.items())]
+        caches = {name: {'hits': cache.hits, 'misses': cache.misses, 'evictions': cache.evictions,
+                         'size': len(cache) if hasattr(cache, '__len__') else None}
+                  for name, cache in sorted(_caches.items())}
+    return {'enabled': enabled, 'counters': counters, 'observations': observations, 'caches': caches}
+
+def to_json(indent=2):
+    return json.dumps(snapshot(), indent=indent)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels_text(labels):
+    if not labels: return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + "}"
+
+def to_prometheus(prefix=METRIC_PREFIX):
+    """Alle Metriken im Prometheus-Textformat (Zähler, Summaries mit _count/_sum, Maxima als Gauge)."""
+    data = snapshot()
+    families = {}  # Metrikname -> (Typ, Zeilen); Zeilen einer Metrik stehen zusammen
+    def emit(family, kind, sample, labels, value):
+        families.setdefault(family, (kind, []))[1].append(f"{sample}{_labels_text(labels)} {value!r}")
+
+    for entry in data['counters']:
+        name = f"{prefix}_{entry['name']}_total"
+        emit(name, "counter", name, entry['labels'], entry['value'])
+    for entry in data['observations']:
+        base = f"{prefix}_{entry['name']}"
+        emit(base, "summary", f"{base}_count", entry['labels'], entry['count'])
+        emit(base, "summary", f"{base}_sum", entry['labels'], entry['sum'])
+        emit(f"{base}_max", "gauge", f"{base}_max", entry['labels'], entry['max'])
+    for cache_name, stats in data['caches'].items():
+        labels = {'cache': cache_name}
+        for field in ('hits', 'misses', 'evictions'):
+            name = f"{prefix}_cache_{field}_total"
+            emit(name, "counter", name, labels, stats[field])
+        if stats['size'] is not None:
+            emit(f"{prefix}_cache_size", "gauge", f"{prefix}_cache_size", labels, stats['size'])
+
+    lines = []
+    for family, (kind, samples) in families.items():
+        lines.append(f"# TYPE {family} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,23 @@
+# --- Skalare Integranden (Referenz für quad) ---
+import math
+
+import numpy as np
+
+
+def hubble_parameter_inv_integrand(z, omega_m, omega_lambda):
+  epsilon = 1e-15
+  denominator = np.sqrt(omega_m * (1 + z)**3 + omega_lambda + epsilon)
+  if denominator < epsilon: return 0.0
+  return 1.0 / denominator
+
+def lookback_time_integrand(z, omega_m, omega_lambda):
+  epsilon = 1e-15
+  term_in_sqrt = omega_m * (1 + z)**3 + omega_lambda
+  term_in_sqrt = max(term_in_sqrt, 0)
+  denominator = (1 + z) * np.sqrt(term_in_sqrt + epsilon)
+  if math.isclose(z, 0):
+      denom_at_zero = np.sqrt(omega_m + omega_lambda + epsilon)
+      if denom_at_zero < epsilon: return 0.0
+      return 1.0 / denom_at_zero
+  if abs(denominator) < epsilon: return 0.0
+  return 1.0 / denominator
@@ -0,0 +1,180 @@
+# --- Vektorisierte Integration von 1/E(z) und 1/((1+z)E(z)) ---
+import math
+
+import numpy as np
+
+from . import instrumentation
+
+BATCH_PANEL_WIDTH = 0.25  # Maximale Panelbreite in x = ln(1+z)
+BATCH_PANEL_BLOCK = 1 << 16  # Panels pro Block (begrenzt den Speicherbedarf)
+_GL_NODES, _GL_WEIGHTS = np.polynomial.legendre.leggauss(8)
+_GL_NODES_LOW, _GL_WEIGHTS_LOW = np.polynomial.legendre.leggauss(4)
+
+def _inv_e_of_zp1(zp1, omega_m, omega_lambda):
+    """1/E(z) als Funktion von (1+z), vektorisiert (gleiches Epsilon wie der Integrand)."""
+    return 1.0 / np.sqrt(omega_m * zp1**3 + omega_lambda + 1e-15)
+
+def _lcdm_inv_e(omega_m, omega_lambda):
+    return lambda zp1: _inv_e_of_zp1(zp1, omega_m, omega_lambda)
+
+def _panel_sums(a, h, nodes, weights, inv_e_of_zp1):
+    """Gauss-Legendre-Summen pro Panel für beide Integranden in x = ln(1+z).
+
+    inv_e_of_zp1: vektorisierte Funktion (1+z) -> 1/E(z), z.B. ExpansionModel.inv_e.
+    """
+    xs = a[:, None] + (0.5 * h)[:, None] * (nodes + 1.0)
+    zp1 = np.exp(xs)
+    inv_e = inv_e_of_zp1(zp1)
+    if instrumentation.enabled:
+        instrumentation.count('integrand_evaluations', inv_e.size, path='gauss_legendre')
+    # dz/E = (1+z)/E dx  und  dz/((1+z)E) = 1/E dx
+    return 0.5 * h * ((zp1 * inv_e) @ weights), 0.5 * h * (inv_e @ weights)
+
+def cumulative_lcdm_integrals(z_sorted, omega_m, omega_lambda):
+    """Kumulative Integrale ∫1/E und ∫1/((1+z)E) von 0 bis z (z aufsteigend, >= 0).
+
+    Gibt (int_dc, int_lt, err_dc, err_lt) als Arrays zurück; die Fehler sind
+    die Differenz zu einer Regel niedrigerer Ordnung (konservative Schätzung).
+    """
+    return cumulative_integrals(z_sorted, _lcdm_inv_e(omega_m, omega_lambda))
+
+def cumulative_integrals(z_sorted, inv_e_of_zp1):
+    """Wie cumulative_lcdm_integrals für ein beliebiges 1/E(1+z) (z.B. ExpansionModel.inv_e)."""
+    z_sorted = np.asarray(z_sorted, dtype=np.float64)
+    n = z_sorted.size
+    if n == 0:
+        empty = np.zeros(0)
+        return empty, empty.copy(), empty.copy(), empty.copy()
+    edges = np.concatenate(([0.0], np.log1p(z_sorted)))
+    widths = np.diff(edges)
+    n_panels = np.maximum(np.ceil(widths / BATCH_PANEL_WIDTH).astype(np.int64), 1)
+    interval_idx = np.repeat(np.arange(n), n_panels)
+    first_panel = np.cumsum(n_panels) - n_panels
+    panel_pos = np.arange(interval_idx.size) - first_panel[interval_idx]
+
+    total = interval_idx.size
+    dc_hi = np.empty(total)
+    lt_hi = np.empty(total)
+    dc_err = np.empty(total)
+    lt_err = np.empty(total)
+    for start in range(0, total, BATCH_PANEL_BLOCK):
+        sl = slice(start, start + BATCH_PANEL_BLOCK)
+        idx = interval_idx[sl]
+        h = widths[idx] / n_panels[idx]
+        a = edges[idx] + panel_pos[sl] * h
+        dc_hi[sl], lt_hi[sl] = _panel_sums(a, h, _GL_NODES, _GL_WEIGHTS, inv_e_of_zp1)
+        dc_lo, lt_lo = _panel_sums(a, h, _GL_NODES_LOW, _GL_WEIGHTS_LOW, inv_e_of_zp1)
+        dc_err[sl] = np.abs(dc_hi[sl] - dc_lo)
+        lt_err[sl] = np.abs(lt_hi[sl] - lt_lo)
+
+    def per_interval(values):
+        return np.cumsum(np.bincount(interval_idx, weights=values, minlength=n))
+    return per_interval(dc_hi), per_interval(lt_hi), per_interval(dc_err), per_interval(lt_err)
+
+def cumulative_integrals_for_parameters(z_sorted, omega_m, omega_lambda):
+    """Wie cumulative_lcdm_integrals, aber für viele (Ωm, ΩΛ) gleichzeitig.
+
+    omega_m/omega_lambda sind 1D-Arrays gleicher Länge S; Ergebnis sind zwei
+    Arrays der Form (S, len(z_sorted)). Alle Parametersätze teilen sich das
+    Stützstellengitter, ausgewertet wird per Broadcasting.
+    """
+    om = np.asarray(omega_m, dtype=np.float64).reshape(-1, 1, 1)
+    ol = np.asarray(omega_lambda, dtype=np.float64).reshape(-1, 1, 1)
+    return cumulative_integrals_for_sets(z_sorted, _lcdm_inv_e(om, ol), om.shape[0])
+
+def cumulative_integrals_for_sets(z_sorted, inv_e_of_zp1, n_sets):
+    """Wie cumulative_integrals für n_sets Parametersätze gleichzeitig.
+
+    inv_e_of_zp1 muss für (1+z) der Form (P, K) ein Array (n_sets, P, K) liefern,
+    z.B. ein Modell, dessen Parameter die Form (n_sets, 1, 1) haben.
+    """
+    z_sorted = np.asarray(z_sorted, dtype=np.float64)
+    n = z_sorted.size
+    if n == 0:
+        return np.zeros((n_sets, 0)), np.zeros((n_sets, 0))
+    edges = np.concatenate(([0.0], np.log1p(z_sorted)))
+    widths = np.diff(edges)
+    n_panels = np.maximum(np.ceil(widths / BATCH_PANEL_WIDTH).astype(np.int64), 1)
+    interval_idx = np.repeat(np.arange(n), n_panels)
+    first_panel = np.cumsum(n_panels) - n_panels
+    h = widths[interval_idx] / n_panels[interval_idx]
+    a = edges[interval_idx] + (np.arange(interval_idx.size) - first_panel[interval_idx]) * h
+    dc_panels, lt_panels = _panel_sums(a, h, _GL_NODES, _GL_WEIGHTS, inv_e_of_zp1)
+    dc_panels = np.broadcast_to(dc_panels, (n_sets,) + dc_panels.shape[-1:])
+    lt_panels = np.broadcast_to(lt_panels, (n_sets,) + lt_panels.shape[-1:])
+    dc = np.cumsum(np.add.reduceat(dc_panels, first_panel, axis=1), axis=1)
+    lt = np.cumsum(np.add.reduceat(lt_panels, first_panel, axis=1), axis=1)
+    return dc, lt
+
+AGE_PANELS = 16
+
+def age_integral(omega_m, omega_lambda):
+    """∫dz/((1+z)E) von 0 bis ∞, d.h. das heutige Weltalter in Einheiten von 1/H0.
+
+    Mit a = 1/(1+z) = u² wird der Integrand 2u²/sqrt(Ωm + ΩΛu⁶) auf [0, 1] glatt
+    und lässt sich mit fester Gauss-Legendre-Regel integrieren.
+    """
+    if omega_m == 0:
+        return math.inf
+    edges = np.linspace(0.0, 1.0, AGE_PANELS + 1)
+    h = np.diff(edges)
+    u = edges[:-1, None] + (0.5 * h)[:, None] * (_GL_NODES + 1.0)
+    integrand = 2.0 * u**2 / np.sqrt(omega_m + (omega_lambda + 1e-15) * u**6)
+    return float(np.sum(0.5 * h * (integrand @ _GL_WEIGHTS)))
+
+def age_integral_of(inv_e_of_zp1):
+    """Wie age_integral für ein beliebiges 1/E(1+z); Integrand 2/u · 1/E bei 1+z = u⁻².
+
+    Glatt, solange Materie oder Strahlung bei hohem z dominiert. Bei Parametern
+    der Form (S, 1, 1) ist das Ergebnis ein Array der Länge S.
+    """
+    edges = np.linspace(0.0, 1.0, AGE_PANELS + 1)
+    h = np.diff(edges)
+    u = edges[:-1, None] + (0.5 * h)[:, None] * (_GL_NODES + 1.0)
+    integrand = 2.0 / u * inv_e_of_zp1(u**-2.0)
+    values = np.sum(0.5 * h[:, None] * integrand, axis=-2) @ _GL_WEIGHTS
+    return float(values) if np.ndim(values) == 0 else values.ravel()
+
+# --- Geschlossene Form für flaches ΛCDM (schneller Pfad) ---
+FLAT_TOLERANCE = 1e-6  # |Ωm + ΩΛ - 1| unterhalb dieser Schwelle gilt als flach
+ANALYTIC_SMALL_Z = 0.1  # darunter Gauss-Legendre statt Differenz (Auslöschung)
+
+def is_flat(omega_m, omega_lambda):
+    """True, wenn der analytische Pfad für flaches ΛCDM verwendet werden kann."""
+    return abs(omega_m + omega_lambda - 1.0) < FLAT_TOLERANCE
+
+def analytic_flat_integrals(z, omega_m, omega_lambda):
+    """∫dz/E und ∫dz/((1+z)E) von 0 bis z in geschlossener Form, vektorisiert.
+
+    Rückblickzeit über arcsinh, mitbewegte Distanz über die hypergeometrische
+    Funktion 2F1(1/3, 1/2; 4/3; -Ωm(1+z)³/ΩΛ). Für kleine z wird die Differenz
+    zweier fast gleicher Werte durch eine 8-Punkt-Gauss-Legendre-Regel ersetzt.
+    """
+    z = np.asarray(z, dtype=np.float64)
+    instrumentation.count('closed_form_evaluations', z.size)
+    zp1 = 1.0 + z
+    if omega_lambda == 0:
+        dc = 2.0 / math.sqrt(omega_m) * (1.0 - zp1**-0.5)
+        lt = 2.0 / (3.0 * math.sqrt(omega_m)) * (1.0 - zp1**-1.5)
+    elif omega_m == 0:
+        dc = z / math.sqrt(omega_lambda)
+        lt = np.log1p(z) / math.sqrt(omega_lambda)
+    else:
+        from scipy.special import hyp2f1  # lazy: scipy erst bei Bedarf laden
+        ratio = omega_m / omega_lambda
+        def f(s): return s * hyp2f1(1.0 / 3.0, 0.5, 4.0 / 3.0, -ratio * s**3)
+        dc = (f(zp1) - f(1.0)) / math.sqrt(omega_lambda)
+        a = math.sqrt(omega_lambda / omega_m)
+        lt = 2.0 / (3.0 * math.sqrt(omega_lambda)) * (math.asinh(a) - np.arcsinh(a * zp1**-1.5))
+
+    small = z < ANALYTIC_SMALL_Z
+    if np.any(small):
+        dc = np.array(dc, dtype=np.float64, ndmin=1).reshape(-1)
+        lt = np.array(lt, dtype=np.float64, ndmin=1).reshape(-1)
+        flat_small = small.reshape(-1)
+        h = np.log1p(z.reshape(-1)[flat_small])
+        dc[flat_small], lt[flat_small] = _panel_sums(np.zeros_like(h), h, _GL_NODES, _GL_WEIGHTS,
+                                                     _lcdm_inv_e(omega_m, omega_lambda))
+        dc = dc.reshape(z.shape)
+        lt = lt.reshape(z.shape)
+    return dc, lt
@@ -0,0 +1,127 @@
+# --- Inverse Berechnung: Rotverschiebung aus Distanz oder Rückblickzeit ---
+# Startwerte kommen aus den gecachten Tabellen (searchsorted auf dem Gitter in
+# x = ln(1+z)), danach folgt ein vektorisiertes, durch das Gitterintervall
+# abgesichertes Newton-Verfahren (Bisektion, falls ein Schritt das Intervall verlässt).
+# Mitbewegte Distanz und Rückblickzeit steigen immer monoton; die Leuchtkraftdistanz
+# geschlossener Modelle (sin-Zweig) kann wieder fallen. Hat ein Wert dort mehr als
+# eine Lösung, wird kein Zweig ausgewählt: das Element wird NaN mit FLAG_AMBIGUOUS
+# (bei skalarer Eingabe meldet der Aufruf error_inverse_ambiguous).
+import numpy as np
+
+from .constants import C_KM_PER_S, HUBBLE_TIME_GYR_KM_S_MPC, OMEGA_R_DEFAULT, W0_DEFAULT, WA_DEFAULT
+from .distances import FLAG_AMBIGUOUS, FLAG_INVALID
+from .models import check_model_parameters, cosmology_model
+from .tables import get_model_table, model_integrals
+
+INVERSE_MAX_ITER = 30
+INVERSE_X_TOL = 1e-13
+
+def _target_on_grid(kind, table, x_grid):
+    if kind == 'comoving': return table.int_dc
+    if kind == 'luminosity': return table.model.transverse(table.int_dc) * np.exp(x_grid)
+    return table.int_lt
+
+def _residual_and_slope(kind, x, target, model):
+    """f(x) und df/dx für die Newton-Iteration in x = ln(1+z)."""
+    z = np.expm1(x)
+    zp1 = 1.0 + z
+    int_dc, int_lt = model_integrals(z, model)
+    inv_e = model.inv_e(zp1)
+    if kind == 'comoving':
+        return int_dc - target, zp1 * inv_e
+    if kind == 'luminosity':
+        int_dm = model.transverse(int_dc)
+        return zp1 * int_dm - target, zp1 * int_dm + zp1**2 * inv_e * model.transverse_slope(int_dc)
+    return int_lt - target, inv_e
+
+def _root_counts(grid_target, y):
+    """Anzahl der Gitterintervalle, in denen die Tabelle den Wert y erreicht (lo < y <= hi)."""
+    lo = np.fmin(grid_target[:-1], grid_target[1:])
+    hi = np.fmax(grid_target[:-1], grid_target[1:])
+    finite = np.isfinite(grid_target[:-1]) & np.isfinite(grid_target[1:])
+    lo, hi = np.sort(lo[finite]), np.sort(hi[finite])
+    return np.searchsorted(lo, y, side='left') - np.searchsorted(hi, y, side='left')
+
+def _invert(kind, values, scale, model):
+    y = np.asarray(values, dtype=np.float64).ravel() / scale
+    redshift = np.full(y.shape, np.nan)
+    flags = np.zeros(y.shape, dtype=np.uint8)
+    table = get_model_table(model)
+    x_grid = np.linspace(0.0, table.x_max, table.int_dc.size)
+    grid_target = _target_on_grid(kind, table, x_grid)
+
+    # Außerhalb des tabellierten Bereichs (oder ungültig): NaN + Flag
+    if np.all(np.diff(grid_target) > 0):
+        valid = np.isfinite(y) & (y >= 0) & (y <= grid_target[-1])
+    else:
+        counts = np.where(np.isfinite(y) & (y > 0), _root_counts(grid_target, np.nan_to_num(y)), 0)
+        ambiguous = counts > 1
+        if ambiguous.any() and np.ndim(values) == 0: return {'error_msg': "error_inverse_ambiguous"}
+        flags[ambiguous] |= FLAG_AMBIGUOUS
+        valid = (y == 0) | (counts == 1)
+        # Einzige Lösung: erstes Gitterintervall, in dem das laufende Maximum y erreicht
+        grid_target = np.fmax.accumulate(grid_target)
+    flags[~valid & (flags == 0)] |= FLAG_INVALID
+    redshift[valid & (y == 0)] = 0.0
+    active = np.flatnonzero(valid & (y > 0))
+    if active.size == 0:
+        return {'redshift': redshift, 'flags': flags, 'error_msg': None}
+
+    target = y[active]
+    hi_idx = np.clip(np.searchsorted(grid_target, target, side='left'), 1, x_grid.size - 1)
+    lo = x_grid[hi_idx - 1]
+    hi = x_grid[hi_idx]
+    # Lineare Interpolation im Gitterintervall als Startwert
+    g_lo = grid_target[hi_idx - 1]
+    g_hi = grid_target[hi_idx]
+    x = lo + (hi - lo) * (target - g_lo) / np.where(g_hi > g_lo, g_hi - g_lo, 1.0)
+
+    todo = np.arange(target.size)
+    for _ in range(INVERSE_MAX_ITER):
+        f, slope = _residual_and_slope(kind, x[todo], target[todo], model)
+        # Intervall verkleinern, dann Newton-Schritt oder Bisektion
+        lo[todo] = np.where(f < 0, x[todo], lo[todo])
+        hi[todo] = np.where(f > 0, x[todo], hi[todo])
+        x_new = x[todo] - f / slope
+        outside = ~((x_new > lo[todo]) & (x_new < hi[todo]))
+        x_new = np.where(outside, 0.5 * (lo[todo] + hi[todo]), x_new)
+        step = np.abs(x_new - x[todo])
+        x[todo] = x_new
+        todo = todo[step > INVERSE_X_TOL * x_new]
+        if todo.size == 0:
+            break
+    redshift[active] = np.expm1(x)
+    return {'redshift': redshift, 'flags': flags, 'error_msg': None}
+
+def _check_params(h0, omega_m, omega_lambda, model_params):
+    if not isinstance(h0, (int, float)) or \
+       not isinstance(omega_m, (int, float)) or \
+       not isinstance(omega_lambda, (int, float)):
+        return "error_invalid_input"
+    model_error = check_model_parameters(*model_params)
+    if model_error == "error_invalid_input": return model_error
+    if h0 <= 0: return "error_h0_positive"
+    if omega_m < 0 or omega_lambda < 0 or model_error: return "error_omega_negative"
+    return None
+
+def _inverse(kind, values, scale_per_h0, h0, omega_m, omega_lambda, omega_r, w0, wa, curvature):
+    error = _check_params(h0, omega_m, omega_lambda, (omega_r, w0, wa, curvature))
+    if error: return {'error_msg': error}
+    model = cosmology_model(omega_m, omega_lambda, omega_r, w0, wa, curvature)
+    return _invert(kind, values, scale_per_h0 / h0, model)
+
+def redshift_from_comoving_distance(comoving_mpc, h0, omega_m, omega_lambda, omega_r=OMEGA_R_DEFAULT,
+                                    w0=W0_DEFAULT, wa=WA_DEFAULT, curvature=False):
+    """Rotverschiebung zu mitbewegten Distanzen [Mpc], vektorisiert; Dict mit 'redshift' und 'flags'."""
+    return _inverse('comoving', comoving_mpc, C_KM_PER_S, h0, omega_m, omega_lambda, omega_r, w0, wa, curvature)
+
+def redshift_from_luminosity_distance(luminosity_mpc, h0, omega_m, omega_lambda, omega_r=OMEGA_R_DEFAULT,
+                                      w0=W0_DEFAULT, wa=WA_DEFAULT, curvature=False):
+    """Rotverschiebung zu Leuchtkraftdistanzen [Mpc], vektorisiert; Dict mit 'redshift' und 'flags'."""
+    return _inverse('luminosity', luminosity_mpc, C_KM_PER_S, h0, omega_m, omega_lambda, omega_r, w0, wa, curvature)
+
+def redshift_from_lookback_time(lookback_gyr, h0, omega_m, omega_lambda, omega_r=OMEGA_R_DEFAULT,
+                                w0=W0_DEFAULT, wa=WA_DEFAULT, curvature=False):
+    """Rotverschiebung zu Rückblickzeiten [Gyr], vektorisiert; Dict mit 'redshift' und 'flags'."""
+    return _inverse('lookback', lookback_gyr, HUBBLE_TIME_GYR_KM_S_MPC, h0, omega_m, omega_lambda,
+                    omega_r, w0, wa, curvature)
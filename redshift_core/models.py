@@ -0,0 +1,189 @@
+# --- E(z)-Modelle: Schnittstelle für Integration, Tabellen und Caches ---
+# Ein Modell liefert 1/E als vektorisierte Funktion von (1+z) und die Krümmung Ωk
+# für die transversale Distanz. Die kumulative Integration, die Tabellen und ihr
+# LRU-Cache arbeiten nur über diese Schnittstelle, neue Modelle leiten von
+# ExpansionModel ab. Entspricht ein Modell exakt dem einfachen ΛCDM (ohne Ωr, Ωk
+# und mit w = -1), bleiben der analytische Pfad und das vorberechnete Gitter aktiv.
+import math
+
+import numpy as np
+
+from .constants import OMEGA_R_DEFAULT, W0_DEFAULT, WA_DEFAULT
+from .integration import FLAT_TOLERANCE, _inv_e_of_zp1, age_integral, age_integral_of
+
+SERIES_THRESHOLD = 1e-4  # |Ωk|·y² darunter: Reihenentwicklung statt Differenz (Auslöschung)
+
+class ExpansionModel:
+    """Basisklasse: Dichteparameter heute, 1/E(1+z) und Krümmung.
+
+    Unterklassen setzen omega_m, omega_lambda, omega_r, omega_k und implementieren
+    inv_e() sowie parameters(). Parameter dürfen Arrays sein (Broadcasting über
+    Stichproben); Cache-Schlüssel gibt es nur für skalare Parameter.
+    """
+    omega_m = 0.0
+    omega_lambda = 0.0
+    omega_r = 0.0
+    omega_k = 0.0
+
+    def inv_e(self, zp1):
+        """1/E(z) als Funktion von (1+z), vektorisiert."""
+        raise NotImplementedError
+
+    def parameters(self):
+        """Alle Parameter als Tupel (bestimmt Cache-Schlüssel und Gleichheit)."""
+        raise NotImplementedError
+
+    @property
+    def key(self):
+        return (type(self).__name__,) + tuple(float(p) for p in self.parameters())
+
+    def lcdm_parameters(self):
+        """(Ωm, ΩΛ), wenn das Modell dem einfachen ΛCDM entspricht, sonst None."""
+        return None
+
+    def age_integral(self):
+        """∫dz/((1+z)E) von 0 bis ∞ (Weltalter in Einheiten von 1/H0)."""
+        if np.all(np.asarray(self.omega_m) == 0) and np.all(np.asarray(self.omega_r) == 0):
+            return math.inf
+        return age_integral_of(self.inv_e)
+
+    def transverse(self, int_dc):
+        """Transversale mitbewegte Distanz aus ∫dz/E (in Einheiten von c/H0)."""
+        omega_k = np.asarray(self.omega_k, dtype=np.float64)
+        if not np.any(omega_k):
+            return int_dc
+        root = np.sqrt(np.abs(omega_k))
+        scale = np.where(root > 0, root, 1.0)
+        with np.errstate(over='ignore'):
+            return np.where(omega_k > 0, np.sinh(scale * int_dc) / scale,
+                            np.where(omega_k < 0, np.sin(scale * int_dc) / scale, int_dc))
+
+    def transverse_slope(self, int_dc):
+        """Ableitung der transversalen Distanz nach ∫dz/E (cosh bzw. cos, flach 1)."""
+        omega_k = np.asarray(self.omega_k, dtype=np.float64)
+        if not np.any(omega_k):
+            return np.ones_like(int_dc)
+        root = np.sqrt(np.abs(omega_k))
+        with np.errstate(over='ignore'):
+            return np.where(omega_k > 0, np.cosh(root * int_dc), np.cos(root * int_dc))
+
+    def comoving_volume(self, transverse):
+        """Mitbewegtes Volumen bis z in Einheiten von (c/H0)³ (Hogg 1999, Gl. 29)."""
+        y = np.asarray(transverse, dtype=np.float64)
+        omega_k = np.asarray(self.omega_k, dtype=np.float64)
+        if not np.any(omega_k):
+            return 4.0 / 3.0 * math.pi * y**3
+        k = np.where(omega_k != 0, omega_k, 1.0)
+        root = np.sqrt(np.abs(k))
+        with np.errstate(invalid='ignore'):
+            inverse = np.where(k > 0, np.arcsinh(root * y), np.arcsin(np.minimum(root * y, 1.0))) / root
+            exact = (y * np.sqrt(1.0 + k * y**2) - inverse) / (2.0 * k)
+        ky2 = k * y**2
+        series = y**3 * (1.0 / 3.0 - ky2 / 10.0 + 3.0 * ky2**2 / 56.0)
+        bracket = np.where(np.abs(ky2) < SERIES_THRESHOLD, series, exact)
+        return 4.0 * math.pi * np.where(omega_k == 0, y**3 / 3.0, bracket)
+
+    def validate(self):
+        """Fehlerschlüssel oder None."""
+        if np.any(np.asarray(self.omega_m) < 0) or np.any(np.asarray(self.omega_lambda) < 0) or \
+           np.any(np.asarray(self.omega_r) < 0):
+            return "error_omega_negative"
+        return None
+
+    def __eq__(self, other):
+        return isinstance(other, ExpansionModel) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"{type(self).__name__}{self.parameters()}"
+
+class LambdaCDM(ExpansionModel):
+    """E² = Ωm(1+z)³ + ΩΛ ohne Krümmungsterm (bisheriges Verhalten aller (Ωm, ΩΛ)-Funktionen)."""
+
+    def __init__(self, omega_m, omega_lambda):
+        self.omega_m = omega_m
+        self.omega_lambda = omega_lambda
+
+    def inv_e(self, zp1):
+        return _inv_e_of_zp1(zp1, self.omega_m, self.omega_lambda)
+
+    def parameters(self):
+        return (self.omega_m, self.omega_lambda)
+
+    def lcdm_parameters(self):
+        return (float(self.omega_m), float(self.omega_lambda))
+
+    def age_integral(self):
+        return age_integral(self.omega_m, self.omega_lambda)
+
+    def transverse(self, int_dc):
+        return int_dc  # Ωk = 0 (skalarer Pfad ohne numpy-Overhead)
+
+class W0WaCDM(ExpansionModel):
+    """Strahlung, Krümmung und Dunkle Energie mit w(a) = w0 + wa(1 - a) (CPL).
+
+    E² = Ωr(1+z)⁴ + Ωm(1+z)³ + Ωk(1+z)² + ΩΛ(1+z)^(3(1+w0+wa)) exp(-3wa z/(1+z)),
+    mit Ωk = 1 - Ωm - ΩΛ - Ωr, wenn curvature gesetzt ist, sonst Ωk = 0.
+    Wo E² <= 0 wird (kein Urknall), ist 1/E NaN.
+    """
+
+    def __init__(self, omega_m, omega_lambda, omega_r=OMEGA_R_DEFAULT, w0=W0_DEFAULT, wa=WA_DEFAULT,
+                 curvature=True):
+        self.omega_m = omega_m
+        self.omega_lambda = omega_lambda
+        self.omega_r = omega_r
+        self.w0 = w0
+        self.wa = wa
+        self.curvature = bool(curvature)
+        omega_k = 1.0 - np.asarray(omega_m) - np.asarray(omega_lambda) - np.asarray(omega_r) if curvature else 0.0
+        omega_k = np.where(np.abs(omega_k) < FLAT_TOLERANCE, 0.0, omega_k)
+        self.omega_k = float(omega_k) if omega_k.ndim == 0 else omega_k
+
+    def inv_e(self, zp1):
+        e2 = self.omega_m * zp1**3 + 1e-15
+        if np.any(self.omega_r): e2 = e2 + self.omega_r * zp1**4
+        if np.any(self.omega_k): e2 = e2 + self.omega_k * zp1**2
+        if np.any(self.wa) or np.any(np.asarray(self.w0) != -1.0):
+            e2 = e2 + self.omega_lambda * zp1**(3.0 * (1.0 + self.w0 + self.wa)) * np.exp(-3.0 * self.wa * (1.0 - 1.0 / zp1))
+        else:
+            e2 = e2 + self.omega_lambda
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(e2 > 0, 1.0 / np.sqrt(np.maximum(e2, 1e-300)), np.nan)
+
+    def parameters(self):
+        return (self.omega_m, self.omega_lambda, self.omega_r, self.w0, self.wa, self.curvature)
+
+    def lcdm_parameters(self):
+        if self.omega_r == 0 and self.omega_k == 0 and self.w0 == -1.0 and self.wa == 0:
+            return (float(self.omega_m), float(self.omega_lambda))
+        return None
+
+    def validate(self):
+        error = super().validate()
+        if error: return error
+        if not (np.all(np.isfinite(self.w0)) and np.all(np.isfinite(self.wa))):
+            return "error_invalid_input"
+        return None
+
+def check_model_parameters(omega_r, w0, wa, curvature):
+    """Typprüfung der zusätzlichen Modellparameter; Fehlerschlüssel oder None."""
+    if not isinstance(omega_r, (int, float)) or not isinstance(w0, (int, float)) or \
+       not isinstance(wa, (int, float)) or not isinstance(curvature, bool) or \
+       isinstance(omega_r, bool) or isinstance(w0, bool) or isinstance(wa, bool):
+        return "error_invalid_input"
+    if not (math.isfinite(w0) and math.isfinite(wa)): return "error_invalid_input"
+    if omega_r < 0: return "error_omega_negative"
+    return None
+
+def cosmology_model(omega_m, omega_lambda, omega_r=OMEGA_R_DEFAULT, w0=W0_DEFAULT, wa=WA_DEFAULT, curvature=False):
+    """Passendes Modell zu den Parametern: LambdaCDM, wenn nichts darüber hinaus gesetzt ist.
+
+    Ohne curvature wird wie bisher Ωk = 0 angenommen (flache Geometrie, kein
+    Krümmungsterm in E); mit curvature gilt Ωk = 1 - Ωm - ΩΛ - Ωr.
+    """
+    if omega_r == 0 and w0 == -1.0 and wa == 0 and isinstance(omega_m, (int, float)) and \
+       isinstance(omega_lambda, (int, float)) and (not curvature or abs(1.0 - omega_m - omega_lambda) < FLAT_TOLERANCE):
+        return LambdaCDM(float(omega_m), float(omega_lambda))
+    return W0WaCDM(omega_m, omega_lambda, omega_r=omega_r, w0=w0, wa=wa, curvature=curvature)
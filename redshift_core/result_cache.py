@@ -0,0 +1,303 @@
+"""Begrenzter Ergebniscache mit quantisierten Schlüsseln, optional prozessübergreifend.
+
+Schlüssel sind der Funktionsname und die Argumente, Gleitkommazahlen darin auf
+``digits`` signifikante Stellen gerundet (Standard 10). Nahezu gleiche Eingaben
+wie 0.03403 und 0.034030000001 treffen so denselben Eintrag (außer eine
+Rundungsgrenze liegt genau dazwischen). Berechnet wird
+immer mit den gerundeten Argumenten, ein Eintrag hängt also nicht davon ab,
+welche Eingabe ihn zuerst angelegt hat.
+
+Toleranz: Die Eingaben weichen relativ höchstens um 0.5·10^(1-digits) ab
+(5e-10 bei 10 Stellen). Distanzen und Zeiten hängen höchstens etwa linear von
+z, H0 und den Dichteparametern ab (Elastizität je Parameter <= 2), die
+gecachten Werte weichen deshalb relativ um weniger als VALUE_TOLERANCE = 1e-8
+von der Rechnung mit den ungerundeten Eingaben ab. Ausgenommen sind Nullstellen,
+etwa D_M nahe dem Antipoden eines geschlossenen Universums. Geprüft wird das von
+``benchmarks/bench_cache.py``.
+
+Speicher: ``MemoryStore`` (pro Prozess) oder ``DiskStore`` (SQLite-Datei, von
+allen Prozessen und Sitzungen geteilt). Beide verdrängen nach LRU, sobald
+``max_entries`` oder ``max_bytes`` (Größe der serialisierten Werte) überschritten
+ist, und verwerfen Einträge, die älter als ``ttl`` Sekunden sind.
+
+Werte werden als JSON gespeichert, nicht gepickelt: wer die geteilte SQLite-Datei
+schreiben kann, soll damit keinen Code in den lesenden Prozessen ausführen können.
+JSON-fremde Werte werden markiert (numpy-Arrays und -Skalare als dtype, Form und
+Rohdaten in Base64, dazu Bytes und Tupel); Ergebnisse mit anderen Objekten (etwa
+einer Exception in 'error_args') werden berechnet, aber nicht gecacht.
+
+Konfiguration über die Umgebung (``cache_from_environment``): REDSHIFT_CACHE
+(Pfad der SQLite-Datei, ohne: im Speicher), REDSHIFT_CACHE_MAX_MB (64),
+REDSHIFT_CACHE_MAX_ENTRIES (100000), REDSHIFT_CACHE_TTL (Sekunden, 86400,
+0 = unbegrenzt) und REDSHIFT_CACHE_DIGITS (10).
+"""
+import base64
+import functools
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+CACHE_VERSION = 2  # Teil jedes Schlüssels; erhöhen, wenn sich Ergebnisse oder ihr Format ändern
+CACHE_DIGITS = 10
+CACHE_MAX_BYTES = 64 * 2**20
+CACHE_MAX_ENTRIES = 100_000
+CACHE_TTL = 86_400.0
+VALUE_TOLERANCE = 1e-8  # relative Abweichung gecachter Werte (siehe oben)
+ACCESS_RESOLUTION = 1.0  # s; DiskStore schreibt den Zugriffszeitpunkt höchstens so oft (LRU-Auflösung)
+
+def quantize(value, digits=CACHE_DIGITS):
+    """Rundet Gleitkommazahlen (auch in Tupeln und Listen) auf digits signifikante Stellen; hashbares Ergebnis."""
+    if isinstance(value, bool) or value is None or isinstance(value, (int, str, bytes)):
+        return value
+    if isinstance(value, float):
+        return float(f"{value:.{digits - 1}e}") if math.isfinite(value) else value
+    if isinstance(value, (tuple, list)):
+        return tuple(quantize(v, digits) for v in value)
+    if hasattr(value, 'dtype') and getattr(value, 'ndim', None) == 0:  # numpy-Skalar
+        return quantize(value.item(), digits)
+    raise TypeError(f"Nicht cachebares Argument: {type(value).__name__}")
+
+# --- Serialisierung der Werte (JSON mit Markierungen statt pickle) ---
+_ARRAY_KINDS = 'biufcSU'  # Zahlen und Text fester Breite; keine Objekt-Arrays
+_TAGS = ('__ndarray__', '__bytes__', '__tuple__', '__dict__')
+
+def _to_json(value):
+    if isinstance(value, (np.ndarray, np.generic)):
+        array = np.asarray(value)
+        if array.dtype.kind not in _ARRAY_KINDS:
+            raise TypeError(f"Nicht cachebarer dtype: {array.dtype}")
+        shape = list(array.shape) if isinstance(value, np.ndarray) else None
+        return {'__ndarray__': [array.dtype.str, shape, base64.b64encode(np.ascontiguousarray(array)).decode('ascii')]}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, bytes):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, tuple):
+        return {'__tuple__': [_to_json(v) for v in value]}
+    if isinstance(value, list):
+        return [_to_json(v) for v in value]
+    if isinstance(value, dict) and all(isinstance(k, str) for k in value):
+        encoded = {k: _to_json(v) for k, v in value.items()}
+        return {'__dict__': encoded} if len(value) == 1 and next(iter(value)) in _TAGS else encoded
+    raise TypeError(f"Nicht cachebarer Wert: {type(value).__name__}")
+
+def _from_json(value):
+    if isinstance(value, list):
+        return [_from_json(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if len(value) == 1:
+        tag, content = next(iter(value.items()))
+        if tag == '__ndarray__':
+            dtype, shape, data = content
+            dtype = np.dtype(dtype)
+            if dtype.kind not in _ARRAY_KINDS: raise ValueError(f"Ungültiger dtype im Cache: {dtype}")
+            array = np.frombuffer(base64.b64decode(data), dtype=dtype)
+            return array[0] if shape is None else array.reshape(shape).copy()
+        if tag == '__bytes__': return base64.b64decode(content)
+        if tag == '__tuple__': return tuple(_from_json(v) for v in content)
+        if tag == '__dict__': return {k: _from_json(v) for k, v in content.items()}
+    return {k: _from_json(v) for k, v in value.items()}
+
+def encode_value(value):
+    """Wert als JSON-Bytes; TypeError für Objekte ohne sichere Darstellung."""
+    return json.dumps(_to_json(value), separators=(',', ':')).encode('utf-8')
+
+def decode_value(data):
+    """Umkehrung von encode_value (erzeugt nur Zahlen, Text, Listen, Dicts, Tupel, Bytes und numpy-Arrays)."""
+    return _from_json(json.loads(data))
+
+class MemoryStore:
+    """LRU-Speicher im Prozess; Werte als serialisierte Bytes (Aufrufer erhalten Kopien)."""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # Schlüssel -> (angelegt, Bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, now):
+        """(Bytes oder None, abgelaufen)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None: return None, False
+            if self.ttl and now - entry[0] > self.ttl:
+                self._remove(key)
+                return None, True
+            self._entries.move_to_end(key)
+            return entry[1], False
+
+    def put(self, key, data, now):
+        """Legt einen Eintrag an; gibt die Anzahl verdrängter Einträge zurück."""
+        with self._lock:
+            if key in self._entries: self._remove(key)
+            self._entries[key] = (now, data)
+            self._bytes += len(data)
+            evicted = 0
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                evicted += 1
+            return evicted
+
+    def _remove(self, key):
+        self._bytes -= len(self._entries.pop(key)[1])
+
+    def usage(self):
+        """(Einträge, Bytes)."""
+        with self._lock:
+            return len(self._entries), self._bytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+class DiskStore:
+    """LRU-Speicher in einer SQLite-Datei (WAL), geteilt von allen Prozessen, die sie öffnen."""
+
+    def __init__(self, path, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL):
+        self.path = os.fspath(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS entries (key BLOB PRIMARY KEY, value BLOB NOT NULL, "
+                         "size INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+
+    @staticmethod
+    def _key(key):
+        # quantisierte Schlüssel enthalten nur Zahlen, Text, Bytes, None und Tupel: repr ist eindeutig
+        return hashlib.blake2b(repr(key).encode('utf-8'), digest_size=16).digest()
+
+    def get(self, key, now):
+        key = self._key(key)
+        with self._lock:
+            row = self._db.execute("SELECT value, created, accessed FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None: return None, False
+            if self.ttl and now - row[1] > self.ttl:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None, True
+            if now - row[2] > ACCESS_RESOLUTION:
+                self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            return row[0], False
+
+    def put(self, key, data, now):
+        key = self._key(key)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)", (key, data, len(data), now, now))
+                count, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+                evicted = 0
+                while count > self.max_entries or size > self.max_bytes:
+                    # älteste Zugriffe zuerst, bis beide Grenzen eingehalten sind
+                    oldest = self._db.execute("SELECT key, size FROM entries ORDER BY accessed LIMIT ?",
+                                              (max(count - self.max_entries, 16),)).fetchall()
+                    for old_key, old_size in oldest:
+                        if count <= self.max_entries and size <= self.max_bytes: break
+                        self._db.execute("DELETE FROM entries WHERE key = ?", (old_key,))
+                        count, size, evicted = count - 1, size - old_size, evicted + 1
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            return evicted
+
+    def usage(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+class ResultCache:
+    """Ergebniscache mit quantisierten Schlüsseln über einem MemoryStore oder DiskStore.
+
+    hits/misses/evictions/expirations zählen die Zugriffe dieses Objekts (bei
+    einem DiskStore also pro Prozess); usage() gibt den Stand des Speichers.
+    """
+
+    def __init__(self, store=None, digits=CACHE_DIGITS):
+        self.store = MemoryStore() if store is None else store
+        self.digits = digits
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def input_tolerance(self):
+        """Größte relative Abweichung zwischen Eingabe und gerundeter Eingabe."""
+        return 0.5 * 10.0 ** (1 - self.digits)
+
+    def get_or_compute(self, name, args, compute):
+        """Ergebnis von compute(*gerundete args) aus dem Cache oder neu berechnet (nicht serialisierbare nur berechnet)."""
+        args = quantize(tuple(args), self.digits)
+        key = (CACHE_VERSION, name, args)
+        data, expired = self.store.get(key, time.time())
+        if expired: self.expirations += 1
+        if data is not None:
+            self.hits += 1
+            return decode_value(data)
+        self.misses += 1
+        result = compute(*args)
+        try:
+            data = encode_value(result)
+        except TypeError:
+            return result
+        self.evictions += self.store.put(key, data, time.time())
+        return result
+
+    def memoize(self, fn=None, *, name=None):
+        """Dekorator: Aufrufe mit Positionsargumenten laufen über den Cache."""
+        if fn is None:
+            return functools.partial(self.memoize, name=name)
+        key_name = name or f"{fn.__module__}.{fn.__qualname__}"
+        @functools.wraps(fn)
+        def cached(*args):
+            return self.get_or_compute(key_name, args, fn)
+        return cached
+
+    def usage(self):
+        return self.store.usage()
+
+    def stats(self):
+        entries, size = self.usage()
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'expirations': self.expirations, 'entries': entries, 'bytes': size,
+                'max_entries': self.store.max_entries, 'max_bytes': self.store.max_bytes, 'ttl': self.store.ttl,
+                'digits': self.digits, 'input_tolerance': self.input_tolerance, 'value_tolerance': VALUE_TOLERANCE,
+                'shared': isinstance(self.store, DiskStore)}
+
+    def clear(self):
+        self.store.clear()
+
+    def __len__(self):
+        return self.usage()[0]
+
+def cache_from_environment(environ=os.environ):
+    """ResultCache nach REDSHIFT_CACHE* (siehe Modulbeschreibung)."""
+    limits = {'max_entries': int(environ.get("REDSHIFT_CACHE_MAX_ENTRIES", CACHE_MAX_ENTRIES)),
+              'max_bytes': int(float(environ.get("REDSHIFT_CACHE_MAX_MB", CACHE_MAX_BYTES / 2**20)) * 2**20),
+              'ttl': float(environ.get("REDSHIFT_CACHE_TTL", CACHE_TTL))}
+    path = environ.get("REDSHIFT_CACHE")
+    store = DiskStore(path, **limits) if path else MemoryStore(**limits)
+    return ResultCache(store, digits=int(environ.get("REDSHIFT_CACHE_DIGITS", CACHE_DIGITS)))
@@ -0,0 +1,340 @@
+"""Lokaler JSON-HTTP-Dienst für Distanzen und Rückblickzeit (asyncio, nur Standardbibliothek).
+
+Endpunkte:
+  GET  /health                 Lebenszeichen
+  GET  /stats                  Zähler des Dienstes und Tabellen-Caches der Worker
+  GET  /v1/distances?z=1.5&h0=70&omega_m=0.3&omega_lambda=0.7&outputs=comoving_mpc,age_gyr
+  POST /v1/distances           {"z": 1.5, "h0": 70, ...}
+  POST /v1/distances/batch     {"z": [0.1, 0.5, 1.5], "h0": 70, ...}
+
+Gleichzeitige Anfragen für dieselbe Kosmologie (H0, Ωm, ΩΛ) werden zu einer
+vektorisierten Auswertung mit calculate_lcdm_quantities zusammengefasst. Die
+Rechnung und das JSON-Kodieren laufen in Worker-Prozessen, die Ereignisschleife
+wird nie blockiert. Jede (Ωm, ΩΛ) wird immer demselben Worker zugeordnet, damit
+ihre Tabelle nur einmal gebaut wird und im Cache dieses Workers bleibt; mit
+REDSHIFT_GRID teilen sich alle Worker zusätzlich das gemappte Gitter. Stirbt ein
+Worker-Prozess, wird sein Executor ersetzt und die betroffene Auswertung einmal
+wiederholt; scheitert sie erneut, erhält nur sie den Fehler (503).
+
+Aufruf:  python -m redshift_core.server [--host 127.0.0.1] [--port 8750] [--workers 4]
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from .constants import H0_DEFAULT, OMEGA_LAMBDA_DEFAULT, OMEGA_M_DEFAULT
+from .distances import DISTANCE_OUTPUTS, QUANTITY_OUTPUTS, calculate_lcdm_quantities
+from .tables import table_cache
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8750
+DEFAULT_COALESCE_WINDOW = 0.001  # s; Wartezeit, bis eine Sammelauswertung startet
+DEFAULT_MAX_BATCH = 100_000  # Rotverschiebungen pro Batch-Anfrage
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_HEADER_LINES = 100
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class RequestError(Exception):
+    """Ungültige Anfrage; wird als JSON-Fehler mit HTTP-Status beantwortet."""
+
+    def __init__(self, error_msg, status=400, detail=None):
+        super().__init__(error_msg)
+        self.status = status
+        self.payload = {'error_msg': error_msg}
+        if detail: self.payload['detail'] = detail
+
+# --- Worker (laufen in den Prozessen des Pools) ---
+def _json_values(values):
+    """Array -> Liste für JSON; nicht endliche Werte werden zu null."""
+    if values.dtype.kind == 'f' and not np.isfinite(values).all():
+        return [v if math.isfinite(v) else None for v in values.tolist()]
+    return values.tolist()
+
+def _evaluate(z, h0, omega_m, omega_lambda, outputs, parts):
+    """Eine Sammelauswertung; gibt pro Teilanfrage den fertig kodierten JSON-Body zurück.
+
+    parts: Liste von (Anzahl z, angeforderte Ausgaben, Einzelwert?) in der Reihenfolge von z.
+    """
+    results = calculate_lcdm_quantities(z, h0, omega_m, omega_lambda, outputs=outputs, use_table=True)
+    if results.get('error_msg'):
+        raise RuntimeError(results['error_msg'])
+    bodies = []
+    start = 0
+    for count, requested, single in parts:
+        part = slice(start, start + count)
+        start += count
+        payload = {'h0': h0, 'omega_m': omega_m, 'omega_lambda': omega_lambda}
+        for name in ('z',) + tuple(requested) + ('flags',):
+            values = _json_values((z if name == 'z' else results[name])[part])
+            payload[name] = values[0] if single else values
+        bodies.append(json.dumps(payload, allow_nan=False).encode('utf-8'))
+    return bodies
+
+def _cache_stats():
+    return {'tables': len(table_cache), 'hits': table_cache.hits, 'misses': table_cache.misses,
+            'evictions': table_cache.evictions, 'pid': os.getpid()}
+
+# --- Anfragen zerlegen ---
+def _number(params, name, default):
+    value = params.get(name, default)
+    if isinstance(value, str):
+        try: value = float(value)
+        except ValueError: raise RequestError("error_invalid_input", detail=f"'{name}' ist keine Zahl") from None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise RequestError("error_invalid_input", detail=f"'{name}' ist keine Zahl")
+    return float(value)
+
+def parse_query(params, batch, max_batch=DEFAULT_MAX_BATCH):
+    """Prüft die Parameter einer Anfrage; gibt (z-Array, H0, Ωm, ΩΛ, Ausgaben) zurück."""
+    if not isinstance(params, dict):
+        raise RequestError("error_invalid_input", detail="JSON-Objekt erwartet")
+    h0 = _number(params, 'h0', H0_DEFAULT)
+    omega_m = _number(params, 'omega_m', OMEGA_M_DEFAULT)
+    omega_lambda = _number(params, 'omega_lambda', OMEGA_LAMBDA_DEFAULT)
+    if h0 <= 0: raise RequestError("error_h0_positive")
+    if omega_m < 0 or omega_lambda < 0: raise RequestError("error_omega_negative")
+
+    outputs = params.get('outputs', DISTANCE_OUTPUTS)
+    if isinstance(outputs, str):
+        outputs = [name.strip() for name in outputs.split(',') if name.strip()]
+    if not isinstance(outputs, (list, tuple)) or not outputs or \
+       any(not isinstance(name, str) or name not in QUANTITY_OUTPUTS for name in outputs):
+        raise RequestError("error_invalid_input", detail=f"'outputs' aus {', '.join(QUANTITY_OUTPUTS)}")
+
+    if 'z' not in params:
+        raise RequestError("error_invalid_input", detail="'z' fehlt")
+    if batch:
+        z = np.asarray(params['z'])
+        if z.ndim != 1 or z.size == 0 or z.dtype.kind not in 'iuf':
+            raise RequestError("error_invalid_input", detail="'z' muss eine nicht leere Zahlenliste sein")
+        if z.size > max_batch:
+            raise RequestError("error_invalid_input", status=413, detail=f"höchstens {max_batch} Werte pro Batch")
+    else:
+        z = np.array([_number(params, 'z', None)])
+    return z.astype(np.float64), h0, omega_m, omega_lambda, tuple(dict.fromkeys(outputs))
+
+# --- Zusammenfassen gleichzeitiger Anfragen ---
+class _Pending:
+    """Gesammelte Teilanfragen einer Kosmologie bis zur nächsten Auswertung."""
+    __slots__ = ('redshifts', 'parts', 'futures')
+
+    def __init__(self):
+        self.redshifts = []
+        self.parts = []
+        self.futures = []
+
+class DistanceServer:
+    """asyncio-HTTP-Server mit Zusammenfassung pro Kosmologie und Prozesspool."""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None,
+                 coalesce_window=DEFAULT_COALESCE_WINDOW, max_batch=DEFAULT_MAX_BATCH):
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.coalesce_window = coalesce_window
+        self.max_batch = max_batch
+        self._executors = []
+        self._pending = {}  # (H0, Ωm, ΩΛ) -> _Pending
+        self._server = None
+        self.stats = {'requests': 0, 'errors': 0, 'evaluations': 0, 'coalesced_requests': 0,
+                      'max_requests_per_evaluation': 0, 'redshifts': 0, 'worker_restarts': 0}
+
+    async def start(self):
+        # Ein Prozess pro Executor, damit jede Kosmologie fest einem Worker (und seinem Cache) zugeordnet ist
+        self._executors = [ProcessPoolExecutor(max_workers=1) for _ in range(self.workers)]
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(ex, _cache_stats) for ex in self._executors))  # Prozesse vorstarten
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for executor in self._executors:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    def _slot_for(self, omega_m, omega_lambda):
+        return hash((omega_m, omega_lambda)) % len(self._executors)
+
+    def _replace_executor(self, slot, broken):
+        if self._executors[slot] is not broken: return  # schon ersetzt (mehrere Aufrufe waren betroffen)
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executors[slot] = ProcessPoolExecutor(max_workers=1)
+        self.stats['worker_restarts'] += 1
+
+    async def _run(self, slot, fn, *args):
+        """fn(*args) im Worker des Platzes slot; nach einem Absturz (BrokenProcessPool) einmal auf einem neuen Worker."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self._executors[slot]
+            try:
+                return await loop.run_in_executor(executor, fn, *args)
+            except BrokenProcessPool:
+                self._replace_executor(slot, executor)
+                if attempt: raise
+
+    def submit(self, z, h0, omega_m, omega_lambda, outputs, single):
+        """Reiht eine Teilanfrage ein; das Future liefert den JSON-Body."""
+        key = (h0, omega_m, omega_lambda)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _Pending()
+            asyncio.get_running_loop().create_task(self._flush(key))
+        future = asyncio.get_running_loop().create_future()
+        pending.redshifts.append(z)
+        pending.parts.append((z.size, outputs, single))
+        pending.futures.append(future)
+        return future
+
+    async def _flush(self, key):
+        await asyncio.sleep(self.coalesce_window)
+        pending = self._pending.pop(key)  # spätere Anfragen sammeln sich in der nächsten Auswertung
+        h0, omega_m, omega_lambda = key
+        z = pending.redshifts[0] if len(pending.redshifts) == 1 else np.concatenate(pending.redshifts)
+        outputs = tuple(dict.fromkeys(name for _, requested, _ in pending.parts for name in requested))
+        count = len(pending.futures)
+        self.stats['evaluations'] += 1
+        self.stats['redshifts'] += z.size
+        self.stats['max_requests_per_evaluation'] = max(self.stats['max_requests_per_evaluation'], count)
+        if count > 1: self.stats['coalesced_requests'] += count
+        try:
+            bodies = await self._run(self._slot_for(omega_m, omega_lambda), _evaluate,
+                                     z, h0, omega_m, omega_lambda, outputs, pending.parts)
+        except Exception as e:  # auch BrokenProcessPool: alle Teilanfragen dieser Auswertung erhalten den Fehler
+            for future in pending.futures:
+                if not future.done(): future.set_exception(e)
+            return
+        for future, body in zip(pending.futures, bodies):
+            if not future.done(): future.set_result(body)
+
+    # --- HTTP ---
+    async def _dispatch(self, method, target, body):
+        url = urlsplit(target)
+        if url.path == '/health':
+            return 200, b'{"status": "ok"}'
+        if url.path == '/stats':
+            caches = await asyncio.gather(*(self._run(slot, _cache_stats) for slot in range(len(self._executors))))
+            return 200, json.dumps({**self.stats, 'workers': self.workers, 'table_caches': caches}).encode('utf-8')
+        if url.path not in ('/v1/distances', '/v1/distances/batch'):
+            raise RequestError("error_not_found", status=404)
+        batch = url.path.endswith('/batch')
+        if method == 'POST':
+            try: params = json.loads(body or b'{}')
+            except ValueError: raise RequestError("error_invalid_input", detail="ungültiges JSON") from None
+        elif method == 'GET' and not batch:
+            params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        else:
+            raise RequestError("error_method_not_allowed", status=405)
+        z, h0, omega_m, omega_lambda, outputs = parse_query(params, batch, self.max_batch)
+        return 200, await self.submit(z, h0, omega_m, omega_lambda, outputs, single=not batch)
+
+    async def _respond(self, method, target, body):
+        self.stats['requests'] += 1
+        try:
+            return await self._dispatch(method, target, body)
+        except RequestError as e:
+            self.stats['errors'] += 1
+            return e.status, json.dumps(e.payload).encode('utf-8')
+        except BrokenProcessPool:
+            self.stats['errors'] += 1
+            return 503, b'{"error_msg": "error_calc_failed"}'
+        except Exception as e:
+            self.stats['errors'] += 1
+            return 500, json.dumps({'error_msg': "error_calc_failed", 'detail': str(e)}).encode('utf-8')
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:  # HTTP/1.1 keep-alive: Anfragen einer Verbindung nacheinander
+                request_line = await reader.readline()
+                if not request_line.strip(): break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._write(writer, 400, b'{"error_msg": "error_invalid_input"}', keep_alive=False)
+                    break
+                headers = {}
+                for _ in range(MAX_HEADER_LINES):
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''): break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0) or 0)
+                if length > MAX_BODY_BYTES:
+                    await self._write(writer, 413, b'{"error_msg": "error_invalid_input"}', keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                status, payload = await self._respond(method.upper(), target, body)
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                await self._write(writer, status, payload, keep_alive)
+                if not keep_alive: break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _write(writer, status, payload, keep_alive):
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + payload)
+        await writer.drain()
+
+async def _serve(args):
+    server = DistanceServer(args.host, args.port, workers=args.workers,
+                            coalesce_window=args.coalesce_ms / 1000.0, max_batch=args.max_batch)
+    await server.start()
+    # SIGTERM/SIGINT beenden den Dienst geordnet: Server schließen und alle Worker-Prozesse herunterfahren
+    # (sonst laufen die Kindprozesse der Executoren verwaist weiter)
+    loop = asyncio.get_running_loop()
+    serving = asyncio.ensure_future(server.serve_forever())
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try: loop.add_signal_handler(sig, serving.cancel)
+        except (NotImplementedError, RuntimeError): pass  # z. B. Windows: nur KeyboardInterrupt
+    print(f"Lauscht auf http://{server.host}:{server.port} ({server.workers} Worker)", file=sys.stderr, flush=True)
+    try:
+        await serving
+    except asyncio.CancelledError:
+        pass
+    finally:
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try: loop.remove_signal_handler(sig)
+            except (NotImplementedError, RuntimeError): pass
+        await server.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lokaler JSON-HTTP-Dienst für Distanzen und Rückblickzeit.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="0 = freien Port wählen")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--coalesce-ms", type=float, default=DEFAULT_COALESCE_WINDOW * 1000.0,
+                        help="Sammelfenster für gleichzeitige Anfragen derselben Kosmologie")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH)
+    args = parser.parse_args(argv)
+    if args.coalesce_ms < 0 or args.max_batch < 1:
+        parser.error("--coalesce-ms muss >= 0 und --max-batch >= 1 sein.")
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
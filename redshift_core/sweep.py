@@ -0,0 +1,336 @@
+"""Parallele Parameter-Sweeps über (H0, Ωm, ΩΛ, z).
+
+Die dimensionslosen Integrale hängen nicht von H0 ab: Die Ωm×ΩΛ-Ebene wird in
+Kacheln zerlegt, die ein Prozesspool mit cumulative_integrals_for_parameters
+berechnet. Jeder Worker schreibt direkt in zwei Würfel (Ωm, ΩΛ, z), die als
+.npy-Memmaps auf Dateien liegen (mit ``out`` im Zielverzeichnis, sonst in einem
+temporären Verzeichnis, das nach dem Sweep gelöscht wird; die Abbildung bleibt
+gültig). Zurückgegeben wird nur der Kachelbereich, es wird also nichts gepickelt
+und das Ergebnis nicht kopiert. H0 wird erst am Ende analytisch per Broadcasting
+angewendet (SweepResult.quantity).
+
+Lange Sweeps können mit ``checkpoint=<Verzeichnis>`` periodisch gesichert und
+nach einem Abbruch fortgesetzt werden.
+
+Aufruf:  python -m redshift_core.sweep --h0 60:80:21 --omega-m 0.1:0.5:81 \\
+             --omega-lambda 0.5:0.9:81 --z 0:5:1001 -o sweep_out
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from .constants import C_KM_PER_S, HUBBLE_TIME_GYR_KM_S_MPC
+from .distances import DISTANCE_OUTPUTS
+from .integration import cumulative_integrals_for_parameters
+
+SWEEP_TILE_BYTES = 64 << 20  # grober Speicherbedarf pro Kachel im Worker
+SWEEP_TASKS_PER_WORKER = 8
+SWEEP_CHECKPOINT_INTERVAL = 60.0  # Sekunden
+CHECKPOINT_VERSION = 1
+CUBE_NAMES = ('int_dc', 'int_lt')
+
+class SweepError(Exception):
+    """Ungültige Sweep-Parameter oder unpassender Checkpoint."""
+
+class SweepResult:
+    """Dimensionslose Würfel (Ωm, ΩΛ, z) plus Achsen; Distanzen erst per H0-Broadcast."""
+
+    def __init__(self, h0, omega_m, omega_lambda, z, int_dc, int_lt, stats):
+        self.h0 = h0
+        self.omega_m = omega_m
+        self.omega_lambda = omega_lambda
+        self.z = z
+        self.int_dc = int_dc
+        self.int_lt = int_lt
+        self.stats = stats
+
+    @property
+    def shape(self):
+        """Form der vollen Würfel (H0, Ωm, ΩΛ, z)."""
+        return (self.h0.size,) + self.int_dc.shape
+
+    def quantity(self, name, out=None):
+        """Würfel (H0, Ωm, ΩΛ, z) einer Ausgabe aus DISTANCE_OUTPUTS; out z.B. ein np.memmap."""
+        if name not in DISTANCE_OUTPUTS:
+            raise SweepError(f"Unbekannte Ausgabe '{name}' ({', '.join(DISTANCE_OUTPUTS)})")
+        if out is None:
+            out = np.empty(self.shape)
+        for k, h0 in enumerate(self.h0):  # pro H0-Schicht, ohne Zwischenwürfel
+            if name == 'lookback_gyr':
+                np.multiply(self.int_lt, HUBBLE_TIME_GYR_KM_S_MPC / h0, out=out[k])
+                continue
+            np.multiply(self.int_dc, C_KM_PER_S / h0, out=out[k])
+            if name == 'luminosity_mpc': out[k] *= 1.0 + self.z
+            elif name == 'ang_diam_mpc': out[k] /= 1.0 + self.z
+        return out
+
+# --- Worker ---
+_worker_state = {}
+
+def _set_state(cubes, plane_cells, z, omega_m, omega_lambda):
+    order = np.argsort(z, kind='stable')
+    _worker_state.update(**_views(cubes, plane_cells, z.size), order=order, z_sorted=z[order],
+                         omega_m=omega_m, omega_lambda=omega_lambda)
+
+def _init_worker(paths, plane_cells, z, omega_m, omega_lambda):
+    cubes = [np.load(path, mmap_mode='r+') for path in paths]
+    _set_state(cubes, plane_cells, z, omega_m, omega_lambda)
+
+def _views(cubes, plane_cells, n_z):
+    """Würfel (Ωm, ΩΛ, z) als flache Ebene (Zellen, z) ohne Kopie."""
+    return {name: cube.reshape(plane_cells, n_z) for name, cube in zip(CUBE_NAMES, cubes)}
+
+def _compute_tile(start, stop):
+    """Berechnet die Zellen [start, stop) der flachen Ωm×ΩΛ-Ebene und schreibt sie in den Würfel."""
+    state = _worker_state
+    dc, lt = cumulative_integrals_for_parameters(state['z_sorted'], state['omega_m'][start:stop],
+                                                 state['omega_lambda'][start:stop])
+    state['int_dc'][start:stop, state['order']] = dc
+    state['int_lt'][start:stop, state['order']] = lt
+    return start, stop
+
+# --- Checkpoint ---
+class _Checkpoint:
+    """Würfel als .npy-Memmaps plus Maske erledigter Kacheln; nur neue Kacheln werden geschrieben."""
+
+    def __init__(self, directory, plane_cells, z, omega_m, omega_lambda, n_tiles):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        digest = hashlib.sha256()
+        for arr in (omega_m, omega_lambda, z):
+            digest.update(np.ascontiguousarray(arr, dtype=np.float64).tobytes())
+        meta = {'version': CHECKPOINT_VERSION, 'plane_cells': plane_cells, 'n_z': int(z.size),
+                'n_tiles': n_tiles, 'axes_sha256': digest.hexdigest()}
+        meta_path = os.path.join(directory, 'meta.json')
+        shape = (plane_cells, z.size)
+        if os.path.exists(meta_path):
+            with open(meta_path) as handle:
+                if json.load(handle) != meta:
+                    raise SweepError(f"Checkpoint in '{directory}' gehört zu einem anderen Sweep.")
+            self.done = np.load(self._path('done.npy'))
+            mode = 'r+'
+        else:
+            self.done = np.zeros(n_tiles, dtype=bool)
+            mode = 'w+'
+        self.cubes = [np.lib.format.open_memmap(self._path(f'{name}.npy'), mode=mode, dtype=np.float64, shape=shape)
+                      for name in ('int_dc', 'int_lt')]
+        if mode == 'w+':
+            with open(meta_path, 'w') as handle:
+                json.dump(meta, handle)
+            self._save_done()
+        self.last_save = time.monotonic()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _save_done(self):
+        tmp_path = self._path('done.tmp.npy')
+        np.save(tmp_path, self.done)
+        os.replace(tmp_path, self._path('done.npy'))  # Maske erst nach den Daten aktualisieren
+
+    def restore(self, targets, tiles):
+        for tile, (start, stop) in enumerate(tiles):
+            if self.done[tile]:
+                for cube, target in zip(self.cubes, targets):
+                    target[start:stop] = cube[start:stop]
+
+    def save(self, sources, tiles, finished):
+        for tile in finished:
+            start, stop = tiles[tile]
+            for cube, source in zip(self.cubes, sources):
+                cube[start:stop] = source[start:stop]
+        for cube in self.cubes:
+            cube.flush()
+        self.done[list(finished)] = True
+        self._save_done()
+        self.last_save = time.monotonic()
+
+# --- Fortschritt ---
+class _Progress:
+    def __init__(self, enabled, total_cells):
+        self.enabled = enabled
+        self.total_cells = total_cells
+        self.cells = 0
+        self.start = time.perf_counter()
+
+    def update(self, cells):
+        self.cells += cells
+        if self.enabled:
+            elapsed = max(time.perf_counter() - self.start, 1e-9)
+            print(f"\r{self.cells:,}/{self.total_cells:,} Zellen, {self.cells / elapsed:,.0f} Zellen/s",
+                  end='', file=sys.stderr)
+
+    def finish(self, h0_count):
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        stats = {'cells': self.cells, 'seconds': elapsed, 'cells_per_s': self.cells / elapsed,
+                 'cube_cells': self.total_cells * h0_count,
+                 'cube_cells_per_s': self.total_cells * h0_count / elapsed}
+        if self.enabled:
+            print(f"\rFertig: {self.cells:,} Zellen in {elapsed:.2f} s ({stats['cells_per_s']:,.0f} Zellen/s, "
+                  f"mit H0: {stats['cube_cells_per_s']:,.0f} Zellen/s)", file=sys.stderr)
+        return stats
+
+# --- Sweep ---
+def _as_axis(values, name):
+    arr = np.atleast_1d(np.asarray(values, dtype=np.float64)).ravel()
+    if arr.size == 0 or not np.all(np.isfinite(arr)):
+        raise SweepError(f"Achse '{name}' ist leer oder enthält ungültige Werte.")
+    return arr
+
+def _tile_size(plane_cells, n_z, workers):
+    per_cell = 8 * 8 * 4 * (n_z + 64)  # Stützstellen pro Zelle inkl. Zwischenergebnisse
+    by_memory = max(1, SWEEP_TILE_BYTES // per_cell)
+    by_balance = max(1, math.ceil(plane_cells / (workers * SWEEP_TASKS_PER_WORKER)))
+    return int(min(by_memory, by_balance))
+
+def run_sweep(h0, omega_m, omega_lambda, z, workers=None, tile_size=None, checkpoint=None,
+              checkpoint_interval=SWEEP_CHECKPOINT_INTERVAL, progress=True, out=None):
+    """Berechnet den Sweep über alle Kombinationen der Achsen, gibt ein SweepResult zurück.
+
+    out: Verzeichnis, in dem int_dc.npy und int_lt.npy direkt entstehen (die Würfel
+    des Ergebnisses sind Memmaps darauf); ohne out in einem temporären Verzeichnis.
+    """
+    h0 = _as_axis(h0, 'h0')
+    omega_m = _as_axis(omega_m, 'omega_m')
+    omega_lambda = _as_axis(omega_lambda, 'omega_lambda')
+    z = _as_axis(z, 'z')
+    if np.any(h0 <= 0): raise SweepError("H0 muss positiv sein.")
+    if np.any(omega_m < 0) or np.any(omega_lambda < 0): raise SweepError("Ωm und ΩΛ dürfen nicht negativ sein.")
+    if np.any(z < 0): raise SweepError("z darf nicht negativ sein.")
+
+    workers = workers or os.cpu_count() or 1
+    om_plane, ol_plane = (arr.ravel() for arr in np.meshgrid(omega_m, omega_lambda, indexing='ij'))
+    plane_cells = om_plane.size
+    tile_size = tile_size or _tile_size(plane_cells, z.size, workers)
+    tiles = [(start, min(start + tile_size, plane_cells)) for start in range(0, plane_cells, tile_size)]
+
+    directory = out if out is not None else tempfile.mkdtemp(prefix='redshift-sweep-')
+    os.makedirs(directory, exist_ok=True)
+    paths = [os.path.join(directory, f'{name}.npy') for name in CUBE_NAMES]
+    try:
+        cubes = [np.lib.format.open_memmap(path, mode='w+', dtype=np.float64,
+                                           shape=(omega_m.size, omega_lambda.size, z.size)) for path in paths]
+        views = _views(cubes, plane_cells, z.size)
+        targets = (views['int_dc'], views['int_lt'])
+        state = _Checkpoint(checkpoint, plane_cells, z, om_plane, ol_plane, len(tiles)) if checkpoint else None
+        pending_tiles = list(range(len(tiles)))
+        if state is not None:
+            state.restore(targets, tiles)
+            pending_tiles = [k for k in pending_tiles if not state.done[k]]
+        tracker = _Progress(progress, sum(stop - start for start, stop in (tiles[k] for k in pending_tiles)) * z.size)
+        finished = []
+
+        def tile_done(tile):
+            start, stop = tiles[tile]
+            tracker.update((stop - start) * z.size)
+            finished.append(tile)
+            if state is not None and time.monotonic() - state.last_save >= checkpoint_interval:
+                state.save(targets, tiles, finished)
+                finished.clear()
+
+        try:
+            if workers == 1:
+                _set_state(cubes, plane_cells, z, om_plane, ol_plane)
+                try:
+                    for tile in pending_tiles:
+                        _compute_tile(*tiles[tile])
+                        tile_done(tile)
+                finally:
+                    _worker_state.clear()
+            else:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                         initargs=(paths, plane_cells, z, om_plane, ol_plane)) as pool:
+                    futures = {pool.submit(_compute_tile, *tiles[tile]): tile for tile in pending_tiles}
+                    while futures:
+                        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()  # Fehler im Worker hier weiterreichen
+                            tile_done(futures.pop(future))
+        finally:
+            # Auch bei Abbruch (z.B. Strg+C) alle fertigen Kacheln sichern
+            if state is not None and finished:
+                state.save(targets, tiles, finished)
+
+        for cube in cubes:
+            cube.flush()
+    finally:
+        # Temporäre Dateien: die Abbildungen bleiben bis zur letzten View gültig (unter Windows bleibt
+        # das Verzeichnis stehen, solange die Dateien abgebildet sind)
+        if out is None: shutil.rmtree(directory, ignore_errors=True)
+    return SweepResult(h0, omega_m, omega_lambda, z, cubes[0], cubes[1], tracker.finish(h0.size))
+
+# --- Kommandozeile ---
+def parse_axis(text):
+    """'start:stop:anzahl' (linear), 'start:stop:anzahl:log' (logarithmisch) oder 'a,b,c'."""
+    parts = text.split(':')
+    try:
+        if len(parts) == 1:
+            return np.array([float(v) for v in text.split(',') if v.strip()])
+        if len(parts) in (3, 4):
+            start, stop, num = float(parts[0]), float(parts[1]), int(parts[2])
+            if len(parts) == 4 and parts[3] == 'log':
+                return np.geomspace(start, stop, num)
+            if len(parts) == 3:
+                return np.linspace(start, stop, num)
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError(f"Ungültige Achse '{text}'")
+
+def write_result(result, directory, outputs):
+    """Schreibt Achsen, dimensionslose Würfel und die gewünschten Ausgaben als .npy (speicherschonend)."""
+    os.makedirs(directory, exist_ok=True)
+    np.savez(os.path.join(directory, 'axes.npz'), h0=result.h0, omega_m=result.omega_m,
+             omega_lambda=result.omega_lambda, z=result.z)
+    for name in CUBE_NAMES:
+        path = os.path.join(directory, f'{name}.npy')
+        cube = getattr(result, name)
+        filename = getattr(cube, 'filename', None)
+        if filename and os.path.exists(path) and os.path.samefile(filename, path):
+            continue  # mit run_sweep(out=directory) schon an Ort und Stelle
+        np.save(path, cube)
+    for name in outputs:
+        out = np.lib.format.open_memmap(os.path.join(directory, f'{name}.npy'), mode='w+',
+                                        dtype=np.float64, shape=result.shape)
+        result.quantity(name, out=out)
+        out.flush()
+        del out
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Paralleler Sweep über (H0, Ωm, ΩΛ, z).")
+    for flag in ("--h0", "--omega-m", "--omega-lambda", "--z"):
+        parser.add_argument(flag, type=parse_axis, required=True, help="start:stop:anzahl[:log] oder a,b,c")
+    parser.add_argument("-o", "--output", required=True, help="Ausgabeverzeichnis (.npy-Dateien)")
+    parser.add_argument("--outputs", default='comoving_mpc,lookback_gyr',
+                        help=f"Ausgabewürfel, kommagetrennt ({', '.join(DISTANCE_OUTPUTS)}); leer = nur Integrale")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--tile-size", type=int, default=None, help="Zellen der Ωm×ΩΛ-Ebene pro Aufgabe")
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint-Verzeichnis (Fortsetzen nach Abbruch)")
+    parser.add_argument("--checkpoint-interval", type=float, default=SWEEP_CHECKPOINT_INTERVAL, help="Sekunden")
+    parser.add_argument("--quiet", action='store_true', help="Keine Fortschrittsanzeige")
+    args = parser.parse_args(argv)
+
+    outputs = tuple(o.strip() for o in args.outputs.split(',') if o.strip())
+    unknown = [o for o in outputs if o not in DISTANCE_OUTPUTS]
+    if unknown:
+        parser.error(f"Unbekannte Ausgabe(n): {', '.join(unknown)}")
+    try:
+        result = run_sweep(args.h0, args.omega_m, args.omega_lambda, args.z, workers=args.workers,
+                           tile_size=args.tile_size, checkpoint=args.checkpoint,
+                           checkpoint_interval=args.checkpoint_interval, progress=not args.quiet, out=args.output)
+    except SweepError as e:
+        parser.exit(2, f"Fehler: {e}\n")
+    write_result(result, args.output, outputs)
+    print(json.dumps(result.stats))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+# --- Monte-Carlo-Fehlerfortpflanzung über Stichproben der kosmologischen Parameter ---
+# Alle Stichproben (H0, Ωm, ΩΛ) werden gemeinsam per Broadcasting integriert
+# (cumulative_integrals_for_parameters bzw. ein Modell mit Parameterarrays); H0 skaliert
+# die dimensionslosen Integrale nur noch. Objekte und Stichproben werden blockweise verarbeitet, damit der
+# Speicherbedarf begrenzt bleibt: ein Objektblock umfasst höchstens MAX_BLOCK_VALUES Werte
+# (Stichproben × Rotverschiebungen) je Zwischenarray, bei vielen Stichproben also entsprechend weniger Objekte.
+import numpy as np
+
+from .constants import C_KM_PER_S, HUBBLE_TIME_GYR_KM_S_MPC, OMEGA_R_DEFAULT, W0_DEFAULT, WA_DEFAULT
+from .integration import cumulative_integrals_for_parameters, cumulative_integrals_for_sets
+from .models import W0WaCDM, check_model_parameters
+
+UNCERTAINTY_OUTPUTS = ('comoving_mpc', 'luminosity_mpc', 'ang_diam_mpc', 'lookback_gyr')
+SAMPLE_BLOCK = 4096  # Stichproben pro Integrationsblock
+OBJECT_BLOCK = 256  # Rotverschiebungen pro Quantilblock (höchstens)
+MAX_BLOCK_VALUES = 2**21  # Stichproben × Rotverschiebungen je Quantilblock (16 MB je float64-Zwischenarray)
+MAX_SAMPLING_ROUNDS = 100
+DEFAULT_CREDIBLE_LEVEL = 0.68
+
+def sample_cosmology(means, covariance, n_samples, seed=None):
+    """Zieht (H0, Ωm, ΩΛ)-Stichproben aus einer Normalverteilung.
+
+    Unphysikalische Stichproben (H0 <= 0 oder negative Ω) werden verworfen und
+    neu gezogen (abgeschnittene Normalverteilung). Wird n_samples auch nach
+    MAX_SAMPLING_ROUNDS Runden nicht erreicht, folgt ein ValueError.
+    """
+    rng = np.random.default_rng(seed)
+    means = np.asarray(means, dtype=np.float64)
+    covariance = np.asarray(covariance, dtype=np.float64)
+    accepted = []
+    n_accepted = 0
+    for _ in range(MAX_SAMPLING_ROUNDS):
+        draw = rng.multivariate_normal(means, covariance, size=max(n_samples - n_accepted, 16) * 2)
+        draw = draw[(draw[:, 0] > 0) & (draw[:, 1] >= 0) & (draw[:, 2] >= 0)]
+        accepted.append(draw)
+        n_accepted += len(draw)
+        if n_accepted >= n_samples:
+            break
+    if n_accepted < n_samples:
+        raise ValueError(f"Nur {n_accepted} von {n_samples} Stichproben physikalisch (H0 > 0, Ω >= 0); "
+                         "Mittelwerte und Kovarianz prüfen.")
+    samples = np.concatenate(accepted)[:n_samples]
+    return samples[:, 0], samples[:, 1], samples[:, 2]
+
+def evaluate_samples(redshifts, h0, omega_m, omega_lambda, omega_r=OMEGA_R_DEFAULT, w0=W0_DEFAULT,
+                     wa=WA_DEFAULT, curvature=False):
+    """Alle Ausgaben für jede Stichprobe und jedes z; Arrays der Form (S, N).
+
+    Ωr, w0, wa und curvature gelten für alle Stichproben; Ωk folgt mit curvature
+    pro Stichprobe aus 1 - Ωm - ΩΛ - Ωr.
+    """
+    z = np.asarray(redshifts, dtype=np.float64).ravel()
+    h0 = np.asarray(h0, dtype=np.float64).ravel()
+    positive = np.isfinite(z) & (z > 0)
+    pos_idx = np.flatnonzero(positive)
+    order = pos_idx[np.argsort(z[pos_idx])]
+
+    plain = omega_r == 0 and w0 == -1.0 and wa == 0 and not curvature
+    int_dc = np.zeros((h0.size, z.size))
+    int_dm = int_dc if plain else np.zeros((h0.size, z.size))
+    int_lt = np.zeros((h0.size, z.size))
+    for start in range(0, h0.size, SAMPLE_BLOCK):
+        sl = slice(start, start + SAMPLE_BLOCK)
+        if plain:
+            dc, lt = cumulative_integrals_for_parameters(z[order], omega_m[sl], omega_lambda[sl])
+        else:
+            model = W0WaCDM(omega_m[sl].reshape(-1, 1, 1), omega_lambda[sl].reshape(-1, 1, 1),
+                            omega_r=omega_r, w0=w0, wa=wa, curvature=curvature)
+            dc, lt = cumulative_integrals_for_sets(z[order], model.inv_e, omega_m[sl].size)
+            int_dm[sl, order] = model.transverse(dc[:, None, :])[:, 0, :]
+        int_dc[sl, order] = dc
+        int_lt[sl, order] = lt
+
+    dh = (C_KM_PER_S / h0)[:, None]
+    comoving = dh * int_dc
+    transverse = comoving if plain else dh * int_dm
+    zp1 = np.where(positive, 1.0 + z, 1.0)
+    outputs = {'comoving_mpc': comoving, 'luminosity_mpc': transverse * zp1,
+               'ang_diam_mpc': transverse / zp1,
+               'lookback_gyr': (HUBBLE_TIME_GYR_KM_S_MPC / h0)[:, None] * int_lt}
+    invalid = ~np.isfinite(z)
+    for arr in outputs.values():
+        arr[:, invalid] = np.nan
+    return outputs
+
+def propagate_uncertainty(redshifts, h0, omega_m, omega_lambda, credible_level=DEFAULT_CREDIBLE_LEVEL,
+                          omega_r=OMEGA_R_DEFAULT, w0=W0_DEFAULT, wa=WA_DEFAULT, curvature=False):
+    """Median und Glaubwürdigkeitsintervall aller Ausgaben über die Parameterstichproben.
+
+    Gibt ein Dict zurück: pro Ausgabe ein Dict mit 'median', 'lower', 'upper'
+    (Arrays der Länge N) sowie 'n_samples' und 'error_msg'.
+    """
+    model_error = check_model_parameters(omega_r, w0, wa, curvature)
+    if model_error: return {'error_msg': model_error}
+    try:
+        h0 = np.asarray(h0, dtype=np.float64).ravel()
+        omega_m = np.asarray(omega_m, dtype=np.float64).ravel()
+        omega_lambda = np.asarray(omega_lambda, dtype=np.float64).ravel()
+        z = np.asarray(redshifts, dtype=np.float64).ravel()
+    except (TypeError, ValueError):
+        return {'error_msg': "error_invalid_input"}
+    if not (h0.size == omega_m.size == omega_lambda.size) or h0.size == 0:
+        return {'error_msg': "error_invalid_input"}
+    if np.any(h0 <= 0): return {'error_msg': "error_h0_positive"}
+    if np.any(omega_m < 0) or np.any(omega_lambda < 0): return {'error_msg': "error_omega_negative"}
+    if not isinstance(credible_level, (int, float)) or isinstance(credible_level, bool) or \
+       not 0 < credible_level < 1:
+        return {'error_msg': "error_invalid_input"}
+
+    quantiles = [0.5 - credible_level / 2, 0.5, 0.5 + credible_level / 2]
+    results = {name: {'median': np.empty(z.size), 'lower': np.empty(z.size), 'upper': np.empty(z.size)}
+               for name in UNCERTAINTY_OUTPUTS}
+    # Blöcke in aufsteigender z-Reihenfolge: jeder Block integriert nur bis zu seinem größten z
+    block = max(1, min(OBJECT_BLOCK, MAX_BLOCK_VALUES // h0.size))
+    order = np.argsort(z)
+    for start in range(0, z.size, block):
+        idx = order[start:start + block]
+        outputs = evaluate_samples(z[idx], h0, omega_m, omega_lambda, omega_r, w0, wa, curvature)
+        for name, values in outputs.items():
+            lower, median, upper = np.quantile(values, quantiles, axis=0)
+            results[name]['lower'][idx] = lower
+            results[name]['median'][idx] = median
+            results[name]['upper'][idx] = upper
+        del outputs
+    results['n_samples'] = h0.size
+    results['credible_level'] = credible_level
+    results['error_msg'] = None
+    return results
+
+def propagate_uncertainty_gaussian(redshifts, means, covariance, n_samples=10_000,
+                                   credible_level=DEFAULT_CREDIBLE_LEVEL, seed=None, **model_params):
+    """Wie propagate_uncertainty, mit Stichproben aus Mittelwerten und Kovarianzmatrix.
+
+    model_params: omega_r, w0, wa, curvature wie bei propagate_uncertainty.
+    """
+    try:
+        h0, omega_m, omega_lambda = sample_cosmology(means, covariance, n_samples, seed=seed)
+    except (ValueError, np.linalg.LinAlgError):
+        return {'error_msg': "error_invalid_input"}
+    return propagate_uncertainty(redshifts, h0, omega_m, omega_lambda, credible_level=credible_level,
+                                 **model_params)
@@ -0,0 +1,123 @@
+# --- Einheitenumrechnungsfunktionen ---
+# Die Funktionen arbeiten mit Skalaren und numpy-Arrays gleichermaßen (ohne Verzweigung auf d == 0).
+import math
+
+import numpy as np
+
+from .constants import KM_PER_AU, KM_PER_LS, KM_PER_LY, KM_PER_MPC
+
+KM_PER_GLY = KM_PER_LY * 1e9
+
+def convert_mpc_to_km(d): return d * KM_PER_MPC
+def convert_km_to_au(d): return d / KM_PER_AU
+def convert_km_to_ly(d): return d / KM_PER_LY
+def convert_km_to_ls(d): return d / KM_PER_LS
+def convert_mpc_to_gly(d): return convert_mpc_to_km(d) / KM_PER_GLY
+
+# --- Spaltenweise Umrechnung ---
+# Alle Umrechnungen sind linear: ein Faktor je Einheit, ausgehend von Mpc.
+UNIT_FACTORS = {
+    'mpc': 1.0,
+    'gly': KM_PER_MPC / KM_PER_GLY,
+    'km': KM_PER_MPC,
+    'ly': KM_PER_MPC / KM_PER_LY,
+    'au': KM_PER_MPC / KM_PER_AU,
+    'ls': KM_PER_MPC / KM_PER_LS,
+}
+
+def convert_columns(mpc, units=('mpc',), dtype=np.float64):
+    """Dict Einheit -> Array für ein Array von Distanzen in Mpc; nur die angefragten Einheiten.
+
+    Gerechnet wird in float64 und direkt in ein Array vom Typ dtype geschrieben
+    (float32 halbiert den Speicher, relative Genauigkeit dann etwa 6e-8).
+    """
+    mpc = np.asarray(mpc, dtype=np.float64)
+    unknown = [u for u in units if u not in UNIT_FACTORS]
+    if unknown: raise ValueError(f"Unbekannte Einheit(en): {', '.join(unknown)}")
+    columns = {}
+    for unit in units:
+        out = np.empty(mpc.shape, dtype=dtype)
+        np.multiply(mpc, UNIT_FACTORS[unit], out=out, casting='same_kind')
+        columns[unit] = out
+    return columns
+
+# --- Formatierungsfunktion ---
+def format_large_number(number):
+    if number == 0: return "0"
+    if not np.isfinite(number): return str(number)
+    try:
+        formatted = f"{number:,.0f}".replace(",", " ")
+        return formatted
+    except (ValueError, TypeError): return str(number)
+
+_LIMB = 10**9  # Dezimalstellen in Blöcken zu 9 Ziffern (int64 ohne Überlauf bei Verschiebung um 30 Bit)
+_POW10 = 10 ** np.arange(8, -1, -1, dtype=np.uint32)
+
+def _integer_limbs(values, n_limbs):
+    """Nichtnegative, ganzzahlige float64 exakt als Blöcke zur Basis 10^9 (Zeilen, höchster Block zuerst).
+
+    v = m·2^e mit m < 2^53: m wird um höchstens 30 Bit je Schritt verschoben
+    (für Distanzen in km reicht ein Schritt).
+    """
+    mantissa, exponent = np.frexp(values)
+    m = (mantissa * 2.0**53).astype(np.int64)
+    shift = exponent.astype(np.int64) - 53
+    m = np.where(shift < 0, m >> np.minimum(-shift, 63), m)  # ganzzahlige Werte unter 2^53
+    shift = np.maximum(shift, 0)
+    limbs = np.zeros((n_limbs, values.size), dtype=np.int64)
+    limbs[0], limbs[1] = m % _LIMB, m // _LIMB
+    while np.any(shift > 0):
+        step = np.minimum(shift, 30)
+        carry = 0
+        for i in range(n_limbs):
+            v = (limbs[i] << step) + carry
+            limbs[i], carry = v % _LIMB, v // _LIMB
+        shift -= step
+    return limbs[::-1].T
+
+def _format_integers(values, negative, n_limbs):
+    """Text für nichtnegative, ganzzahlige float64 mit höchstens 9·n_limbs Stellen (Codepunkt-Matrix).
+
+    Je Block 9 Ziffern in drei Dreiergruppen mit Leerzeichen dahinter; die Blockzahl
+    lässt immer mindestens eine führende Stelle frei (Platz für das Vorzeichen).
+    """
+    limbs = _integer_limbs(values, n_limbs).astype(np.uint32)
+    digits = np.empty((values.size, n_limbs, 9), dtype=np.uint32)
+    for k, power in enumerate(_POW10):
+        digits[:, :, k] = limbs // power % 10
+    digits = digits.reshape(values.size, -1)
+    significant = np.logical_or.accumulate(digits != 0, axis=1)
+    significant[:, -1] = True
+    chars = np.full((values.size, n_limbs, 3, 4), ord(' '), dtype=np.uint32)
+    chars[..., :3] = np.where(significant, digits + ord('0'), ord(' ')).reshape(values.size, n_limbs, 3, 3)
+    chars = chars.reshape(values.size, -1)[:, :-1]
+    first = np.argmax(significant, axis=1)
+    column = first + first // 3
+    chars[np.flatnonzero(negative), column[negative] - 1] = ord('-')
+    start = int((column - negative).min())
+    return np.strings.lstrip(np.ascontiguousarray(chars[:, start:]).view(f'U{chars.shape[1] - start}')[:, 0])
+
+def format_large_numbers(values):
+    """format_large_number für ganze Arrays: Unicode-Array mit identischem Text, ohne Python-Aufruf je Wert.
+
+    Die Ziffern werden exakt aus der Binärdarstellung bestimmt und als Matrix von
+    Codepunkten (Ziffern, Leerzeichen als Tausendertrenner, Vorzeichen) aufgebaut,
+    gruppiert nach der nötigen Stellenzahl.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    shape, values = values.shape, values.reshape(-1)
+    finite = np.isfinite(values)
+    rounded = np.rint(np.where(finite, np.abs(values), 0.0))
+    negative = np.signbit(values) & (values != 0) & finite
+    shift = np.maximum(np.frexp(rounded)[1].astype(np.int64) - 53, 0)
+    n_limbs = 2 + np.ceil(shift * (math.log10(2) / 9)).astype(np.int64)
+    if values.size and (n_limbs == n_limbs[0]).all():
+        text = _format_integers(rounded, negative, int(n_limbs[0]))
+    else:
+        parts = {n: np.flatnonzero(n_limbs == n) for n in np.unique(n_limbs)}
+        parts = {n: (rows, _format_integers(rounded[rows], negative[rows], int(n))) for n, rows in parts.items()}
+        text = np.empty(values.size, dtype=f"U{max([p.dtype.itemsize // 4 for _, p in parts.values()], default=1)}")
+        for rows, part in parts.values(): text[rows] = part
+    if not finite.all():
+        text = np.where(finite, text, values.astype(str))
+    return text.reshape(shape)